@@ -1,74 +1,146 @@
 #!/usr/bin/env python3
 """
 Create silent placeholder WAV files for testing the sentence feature.
-These are 2-second silent audio files in the correct format.
-Replace with real audio files later using generate_audio_files.py
+Each placeholder lasts roughly as long as its sentence would take to say,
+in the correct format. Replace with real audio files later using
+generate_audio_files.py
+
+Every distinct (duration, sample rate) file is built once as a zeroed
+buffer and written with a single call; with --link, identical placeholders
+are hardlinked to the first copy instead of being written again.
+
+Usage:
+    python3 create_placeholder_audio.py [--link] [--duration SECONDS] [--input SENTENCES_AUDIO_BATCH.json]
 """
 
+import argparse
+import io
 import json
 import os
+import time
 import wave
-import struct
-
-def create_silent_wav(output_path, duration_seconds=2):
-    """Create a silent WAV file with correct specifications."""
-    sample_rate = 44100  # 44.1 kHz
-    num_channels = 1     # Mono
-    sample_width = 2     # 16-bit
-
+from functools import lru_cache
+
+# Configuration
+SAMPLE_RATE = 44100  # 44.1 kHz
+WORDS_PER_SECOND = 2.5  # Unhurried reading pace for kids
+PADDING_SECONDS = 0.5  # Lead-in/out a real recording would have
+MIN_SECONDS = 1.0
+MAX_SECONDS = 10.0
+DURATION_STEP = 0.25  # Durations are rounded to this, so placeholders share buffers
+
+@lru_cache(maxsize=None)
+def silent_wav_bytes(duration_seconds, sample_rate=SAMPLE_RATE):
+    """Complete 16-bit mono WAV file of silence, built once per (duration, rate)."""
     num_frames = int(sample_rate * duration_seconds)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav_file:
+        wav_file.setnchannels(1)   # Mono
+        wav_file.setsampwidth(2)   # 16-bit
+        wav_file.setframerate(sample_rate)
+        wav_file.writeframes(bytes(num_frames * 2))
+    return buffer.getvalue()
+
+def placeholder_duration(text):
+    """Seconds a placeholder for text should last, rounded to DURATION_STEP."""
+    seconds = len(text.split()) / WORDS_PER_SECOND + PADDING_SECONDS
+    seconds = round(seconds / DURATION_STEP) * DURATION_STEP
+    return min(max(seconds, MIN_SECONDS), MAX_SECONDS)
 
+def create_silent_wav(output_path, duration_seconds=2, sample_rate=SAMPLE_RATE):
+    """Create a silent WAV file with correct specifications."""
     # Create directory if needed
     os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-    # Write WAV file
-    with wave.open(output_path, 'w') as wav_file:
-        wav_file.setnchannels(num_channels)
-        wav_file.setsampwidth(sample_width)
-        wav_file.setframerate(sample_rate)
+    with open(output_path, 'wb') as f:
+        f.write(silent_wav_bytes(duration_seconds, sample_rate))
+
+def link_or_create(output_path, duration_seconds, sample_rate, originals):
+    """
+    Hardlink output_path to an identical placeholder already written in this
+    run, or write it and remember it. Tools that later rewrite a file replace
+    it with a new one, so a regenerated clip never changes its former twins.
+    """
+    key = (duration_seconds, sample_rate)
+    original = originals.get(key)
+    if original is not None:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        try:
+            os.link(original, output_path)
+            return True
+        except OSError:
+            pass  # Filesystem without hardlinks - fall back to a copy
 
-        # Write silent frames (all zeros)
-        for _ in range(num_frames):
-            # Write a silent sample (value 0)
-            wav_file.writeframes(struct.pack('<h', 0))
+    create_silent_wav(output_path, duration_seconds, sample_rate)
+    originals[key] = output_path
+    return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Create silent placeholder sentence audio")
+    parser.add_argument("--input", default="SENTENCES_AUDIO_BATCH.json", help="sentence batch file")
+    parser.add_argument("--duration", type=float,
+                        help="fixed length in seconds (default: sized from each sentence)")
+    parser.add_argument("--rate", type=int, default=SAMPLE_RATE, help=f"sample rate (default: {SAMPLE_RATE})")
+    parser.add_argument("--link", action="store_true", help="hardlink identical placeholders instead of copying")
+    args = parser.parse_args()
+
     print("🎵 Creating placeholder audio files for testing...")
     print("⚠️  Note: These are silent files for testing only\n")
 
     # Load sentence data
-    with open("SENTENCES_AUDIO_BATCH.json", "r") as f:
+    with open(args.input, "r") as f:
         data = json.load(f)
 
     sentences = data["sentences"]
     base_dir = "spelling-bee iOS App/Resources/Audio/Lisa/sentences"
 
     created = 0
+    linked = 0
     skipped = 0
+    bytes_written = 0
+    originals = {}
+    start_time = time.time()
 
     for i, sentence in enumerate(sentences, start=1):
         output_path = os.path.join(base_dir, sentence["outputFile"])
 
-        # Skip if already exists
-        if os.path.exists(output_path):
+        # Skip if it (or real MP3 audio for the same sentence) already exists
+        stem = os.path.splitext(output_path)[0]
+        if os.path.exists(f"{stem}.wav") or os.path.exists(f"{stem}.mp3"):
             skipped += 1
             continue
 
+        duration = args.duration or placeholder_duration(sentence["text"])
+
         # Create silent audio file
         try:
-            create_silent_wav(output_path, duration_seconds=2)
+            if args.link:
+                was_linked = link_or_create(output_path, duration, args.rate, originals)
+            else:
+                create_silent_wav(output_path, duration, args.rate)
+                was_linked = False
+            if was_linked:
+                linked += 1
+            else:
+                bytes_written += len(silent_wav_bytes(duration, args.rate))
             created += 1
 
             # Progress indicator
-            if created % 50 == 0:
+            if created % 500 == 0:
                 print(f"[{i}/{len(sentences)}] Created {created} files...")
         except Exception as e:
             print(f"❌ Failed to create {output_path}: {e}")
 
+    elapsed = time.time() - start_time
+
     print(f"\n{'='*60}")
     print(f"✅ Created {created} placeholder audio files")
+    if args.link:
+        print(f"🔗 Hardlinked {linked} of them to identical placeholders")
     print(f"⏭️  Skipped {skipped} existing files")
     print(f"📁 Total: {len(sentences)} files")
+    print(f"💾 Wrote {bytes_written / 1024 / 1024:.1f} MB from {silent_wav_bytes.cache_info().currsize} distinct buffers")
+    print(f"⏱️  {elapsed * 1000:.0f} ms")
     print(f"{'='*60}\n")
     print(f"⚠️  IMPORTANT: These are silent placeholders for testing only!")
     print(f"📝 Generate real audio with: python3 generate_audio_files.py")
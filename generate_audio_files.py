@@ -3,25 +3,60 @@
 Helper script to generate audio files from SENTENCES_AUDIO_BATCH.json
 using text-to-speech services like ElevenLabs, Play.ht, or Google Cloud TTS.
 
+Requests run concurrently over one keep-alive HTTP session and are throttled
+to the vendor's requests-per-second and characters-per-minute quotas.
+
 Usage:
-    1. Install required packages: pip install requests
+    1. Install required packages: pip install aiohttp
     2. Set your API key as environment variable
     3. Run: python3 generate_audio_files.py
 """
 
+import argparse
+import asyncio
 import json
 import os
 import sys
 import time
 from pathlib import Path
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from tts_cache import SynthesisCache
+from audio_metrics import is_finished_render
+from cloud_tts import CircuitBreaker, CloudTTSEngine, RetryPolicy, SynthesisError
+from build_manifest import MANIFEST_FILE, BuildManifest
+from sharding import in_shard, parse_shard, shard_path, write_receipt
+
 # Configuration
 API_SERVICE = "elevenlabs"  # Options: "elevenlabs", "playht", "google"
 API_KEY = os.environ.get("TTS_API_KEY", "")
 VOICE_ID = "lisa"  # Voice identifier for the service
 OUTPUT_BASE_DIR = "spelling-bee iOS App/Resources/Audio/Lisa/sentences"
-BATCH_SIZE = 10  # Number of files to generate before pausing
-PAUSE_SECONDS = 2  # Pause between batches to avoid rate limits
+ELEVENLABS_BASE_URL = os.environ.get("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io")  # Point at a stub server to test
+ELEVENLABS_MODEL_ID = "eleven_monolingual_v1"
+ELEVENLABS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.75
+}
+GOOGLE_SAMPLE_RATE = 44100
+
+# Throughput limits - match these to your plan's quota
+MAX_IN_FLIGHT = int(os.environ.get("TTS_MAX_IN_FLIGHT", "4"))  # Concurrent requests
+REQUESTS_PER_SECOND = float(os.environ.get("TTS_REQUESTS_PER_SECOND", "2"))
+CHARACTERS_PER_MINUTE = int(os.environ.get("TTS_CHARACTERS_PER_MINUTE", "20000"))
+
+# Transient failures (429/5xx/timeouts) are retried; a run of them pauses the whole pipeline
+MAX_ATTEMPTS = 6  # Per file, including the first try
+MAX_BACKOFF_SECONDS = 60
+BREAKER_FAILURE_THRESHOLD = 5  # Consecutive transient failures before pausing
+BREAKER_COOLDOWN_SECONDS = 30
+
+# Everything besides the text that changes the rendered audio, per service
+SERVICE_PARAMS = {
+    "elevenlabs": {"model_id": ELEVENLABS_MODEL_ID, "voice_settings": ELEVENLABS_VOICE_SETTINGS},
+    "playht": {},
+    "google": {"language_code": "en-US", "sample_rate_hertz": GOOGLE_SAMPLE_RATE}
+}
 
 def load_sentences():
     """Load sentences from JSON file."""
@@ -29,14 +64,12 @@ def load_sentences():
         data = json.load(f)
     return data["sentences"]
 
-def generate_audio_elevenlabs(text, output_path, voice_id):
+async def generate_audio_elevenlabs(session, text, voice_id):
     """
     Generate audio using ElevenLabs API.
-    Requires: pip install requests
+    Requires: pip install aiohttp
     """
-    import requests
-
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+    url = f"{ELEVENLABS_BASE_URL}/v1/text-to-speech/{voice_id}"
     headers = {
         "Accept": "audio/wav",
         "Content-Type": "application/json",
@@ -44,46 +77,50 @@ def generate_audio_elevenlabs(text, output_path, voice_id):
     }
     data = {
         "text": text,
-        "model_id": "eleven_monolingual_v1",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.75
-        }
+        "model_id": ELEVENLABS_MODEL_ID,
+        "voice_settings": ELEVENLABS_VOICE_SETTINGS
     }
 
-    response = requests.post(url, json=data, headers=headers)
-
-    if response.status_code == 200:
-        with open(output_path, "wb") as f:
-            f.write(response.content)
-        return True
-    else:
-        print(f"   ❌ Error: {response.status_code} - {response.text}")
-        return False
+    async with session.post(url, json=data, headers=headers) as response:
+        body = await response.read()
+        if response.status != 200:
+            raise SynthesisError(
+                f"{response.status} - {body.decode('utf-8', errors='replace')}",
+                status=response.status,
+                headers=dict(response.headers)
+            )
+        return body
 
-def generate_audio_playht(text, output_path, voice_id):
+async def generate_audio_playht(session, text, voice_id):
     """
     Generate audio using Play.ht API.
-    Requires: pip install requests
+    Requires: pip install aiohttp
     """
-    import requests
-
     # Note: This is a placeholder. Adjust according to Play.ht's actual API
-    print(f"   ℹ️  Play.ht integration not implemented yet")
-    return False
+    raise SynthesisError("Play.ht integration not implemented yet")
+
+_google_client = None
 
-def generate_audio_google(text, output_path, voice_name):
+def google_client():
     """
-    Generate audio using Google Cloud Text-to-Speech.
+    The TextToSpeechClient every request of the run shares (one pooled gRPC channel).
     Requires: pip install google-cloud-texttospeech
     """
-    try:
-        from google.cloud import texttospeech
-    except ImportError:
-        print("   ❌ google-cloud-texttospeech not installed")
-        return False
+    global _google_client
+    if _google_client is None:
+        try:
+            from google.cloud import texttospeech
+        except ImportError:
+            raise SynthesisError("google-cloud-texttospeech not installed")
+        _google_client = texttospeech.TextToSpeechClient()
+    return _google_client
+
+def google_synthesize(text, voice_name):
+    """Generate audio using Google Cloud Text-to-Speech."""
+    from google.cloud import texttospeech
+    from google.api_core.exceptions import GoogleAPICallError
 
-    client = texttospeech.TextToSpeechClient()
+    client = google_client()
 
     synthesis_input = texttospeech.SynthesisInput(text=text)
     voice = texttospeech.VoiceSelectionParams(
@@ -92,24 +129,52 @@ def generate_audio_google(text, output_path, voice_name):
     )
     audio_config = texttospeech.AudioConfig(
         audio_encoding=texttospeech.AudioEncoding.LINEAR16,
-        sample_rate_hertz=44100
+        sample_rate_hertz=GOOGLE_SAMPLE_RATE
     )
 
-    response = client.synthesize_speech(
-        input=synthesis_input, voice=voice, audio_config=audio_config
-    )
+    try:
+        response = client.synthesize_speech(
+            input=synthesis_input, voice=voice, audio_config=audio_config
+        )
+    except GoogleAPICallError as e:
+        # e.code is the HTTP status (429, 503, ...), so retries work the same as for ElevenLabs
+        raise SynthesisError(str(e), status=e.code)
+    return response.audio_content
+
+async def generate_audio_google(session, text, voice_name):
+    """The Google client is synchronous, so run it on a worker thread."""
+    return await asyncio.to_thread(google_synthesize, text, voice_name)
 
-    with open(output_path, "wb") as f:
-        f.write(response.audio_content)
-    return True
+SERVICES = {
+    "elevenlabs": generate_audio_elevenlabs,
+    "playht": generate_audio_playht,
+    "google": generate_audio_google
+}
 
 def main():
     """Main generation loop."""
+    parser = argparse.ArgumentParser(description="Generate sentence audio with a cloud TTS service")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="only generate this node's share of the files (e.g. 2/4); see scripts/sharding.py")
+    args = parser.parse_args()
+
     if not API_KEY and API_SERVICE != "google":
         print("❌ Error: TTS_API_KEY environment variable not set")
         print("   Set it with: export TTS_API_KEY='your-api-key-here'")
         sys.exit(1)
 
+    if API_SERVICE not in SERVICES:
+        print(f"❌ Unknown service: {API_SERVICE}")
+        sys.exit(1)
+
+    if API_SERVICE == "google":
+        # Created once, before the worker threads start sharing it
+        try:
+            google_client()
+        except SynthesisError as e:
+            print(f"❌ Error: {e}")
+            sys.exit(1)
+
     sentences = load_sentences()
     total = len(sentences)
 
@@ -117,62 +182,92 @@ def main():
     print(f"   Service: {API_SERVICE}")
     print(f"   Total files: {total}")
     print(f"   Output directory: {OUTPUT_BASE_DIR}")
+    print(f"   In flight: {MAX_IN_FLIGHT} | {REQUESTS_PER_SECOND} req/s | {CHARACTERS_PER_MINUTE} chars/min")
     print()
 
     # Check if output directory exists
     Path(OUTPUT_BASE_DIR).mkdir(parents=True, exist_ok=True)
 
+    cache = SynthesisCache()
+    manifest = BuildManifest(MANIFEST_FILE, shard_path(MANIFEST_FILE, args.shard))
+    params = SERVICE_PARAMS.get(API_SERVICE, {})
     generated = 0
-    skipped = 0
     failed = 0
 
-    for i, sentence in enumerate(sentences, start=1):
-        word = sentence["word"]
-        text = sentence["text"]
-        output_file = sentence["outputFile"]
-        output_path = os.path.join("spelling-bee iOS App/Resources/Audio/Lisa/sentences", output_file)
-
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    # Only sentences whose text, service or voice changed need rendering. Files
+    # that predate the manifest are adopted rather than paid for again - unless
+    # they are silent placeholders.
+    signature_params = dict(params, voice=VOICE_ID)
+    all_items = [
+        (sentence["outputFile"], BuildManifest.signature(sentence["text"], API_SERVICE, signature_params),
+         os.path.join(OUTPUT_BASE_DIR, sentence["outputFile"]))
+        for sentence in sentences
+    ]
+    items = [item for item in all_items if in_shard(item[2], args.shard)]
+    if args.shard:
+        print(f"🧩 Shard {args.shard.index}/{args.shard.count}: {len(items)} of {total} sentences")
+    stale, current = manifest.plan(items, adopt_existing=is_finished_render)
+    skipped = len(current)
+    by_output_file = {sentence["outputFile"]: sentence for sentence in sentences}
 
-        # Skip if file already exists
-        if os.path.exists(output_path):
-            print(f"[{i}/{total}] ⏭️  Skipping (exists): {output_file}")
-            skipped += 1
+    # Resolve identical earlier renders before touching the network
+    jobs = []
+    for output_file, signature, output_path in stale:
+        sentence = by_output_file[output_file]
+        cache_key = cache.key(API_SERVICE, VOICE_ID, sentence["text"], **params)
+        if cache.fetch(cache_key, output_path):
+            manifest.record(output_file, signature, output_path)
+            generated += 1
             continue
 
-        print(f"[{i}/{total}] 🎵 Generating: {word} (sentence {sentence['sentenceNumber']})")
-        print(f"   Text: {text}")
-
-        # Generate audio based on service
-        success = False
-        if API_SERVICE == "elevenlabs":
-            success = generate_audio_elevenlabs(text, output_path, VOICE_ID)
-        elif API_SERVICE == "playht":
-            success = generate_audio_playht(text, output_path, VOICE_ID)
-        elif API_SERVICE == "google":
-            success = generate_audio_google(text, output_path, VOICE_ID)
-        else:
-            print(f"   ❌ Unknown service: {API_SERVICE}")
-            sys.exit(1)
+        jobs.append((sentence["text"], output_path, cache_key, sentence, signature))
+
+    print(f"⏭️  Skipped {skipped} up-to-date files, reused {generated} cached renders")
+    print(f"🎵 Synthesizing {len(jobs)} files...")
+    print()
+
+    request = SERVICES[API_SERVICE]
+    engine = CloudTTSEngine(
+        lambda session, text: request(session, text, VOICE_ID),
+        concurrency=MAX_IN_FLIGHT,
+        requests_per_second=REQUESTS_PER_SECOND,
+        characters_per_minute=CHARACTERS_PER_MINUTE,
+        retry=RetryPolicy(max_attempts=MAX_ATTEMPTS, max_delay=MAX_BACKOFF_SECONDS),
+        breaker=CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_COOLDOWN_SECONDS)
+    )
+
+    done = 0
+    start_time = time.time()
 
-        if success:
+    def on_done(job, error):
+        nonlocal done, generated, failed
+        _, output_path, cache_key, sentence, signature = job
+        done += 1
+        label = f"{sentence['word']} (sentence {sentence['sentenceNumber']})"
+        if error is None:
+            cache.store(cache_key, output_path)
+            manifest.record(sentence["outputFile"], signature, output_path)
             generated += 1
-            print(f"   ✅ Saved: {output_path}")
+            print(f"[{done}/{len(jobs)}] ✅ {label}")
         else:
             failed += 1
+            print(f"[{done}/{len(jobs)}] ❌ {label}: {error}")
 
-        # Pause after batch to avoid rate limits
-        if (i % BATCH_SIZE == 0) and (i < total):
-            print(f"\n⏸️  Pausing for {PAUSE_SECONDS}s to avoid rate limits...\n")
-            time.sleep(PAUSE_SECONDS)
+    asyncio.run(engine.run(jobs, on_done))
+    manifest.save()
+    if args.shard:
+        write_receipt("generate_audio_files", args.shard, [item[2] for item in all_items], failed, MANIFEST_FILE)
+    elapsed = time.time() - start_time
 
     print("\n" + "="*60)
     print(f"📊 Summary:")
     print(f"   ✅ Generated: {generated}")
     print(f"   ⏭️  Skipped: {skipped}")
     print(f"   ❌ Failed: {failed}")
+    print(f"   🔁 Retries: {engine.retries}")
     print(f"   📁 Total: {total}")
+    print(f"   📦 Synthesis cache: {cache.summary()}")
+    print(f"   ⏱️  Time: {elapsed:.1f}s")
     print("="*60)
 
 if __name__ == "__main__":
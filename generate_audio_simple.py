@@ -1,14 +1,28 @@
 #!/usr/bin/env python3
 """
 Generate audio files using gTTS (Google Text-to-Speech) - Free, no authentication required.
-Saves as MP3 files which iOS AVAudioPlayer supports.
+Saves as real PCM WAV when pydub is available (decoded in memory), otherwise
+as MP3 files which iOS AVAudioPlayer supports.
 """
 
+import argparse
+import io
 import json
 import os
 import sys
 import time
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from tts_cache import SynthesisCache
+from audio_io import HAS_PYDUB
+from audio_metrics import is_finished_render
+from audio_output import FORMAT_MANIFEST, FormatManifest, remove_siblings, write_declared
+from build_manifest import MANIFEST_FILE, BuildManifest
+from job_journal import JobJournal
+from sharding import in_shard, parse_shard, shard_path, write_receipt
+
+JOURNAL_FILE = "SENTENCES_AUDIO_JOURNAL.jsonl"
+
 try:
     from gtts import gTTS
 except ImportError:
@@ -17,18 +31,25 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "gtts", "--quiet"])
     from gtts import gTTS
 
-def generate_audio_gtts(text, output_path):
-    """Generate audio using gTTS and save as MP3."""
+def synthesize(text, path):
+    """Render text with gTTS in memory and write it in the format path's extension declares."""
+    buffer = io.BytesIO()
+    gTTS(text=text, lang='en', slow=False).write_to_fp(buffer)
+    write_declared(path, buffer.getvalue())
+
+def generate_audio_gtts(text, audio_path, cache):
+    """Generate audio using gTTS and save it as audio_path."""
     try:
         # Create directory if needed
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        os.makedirs(os.path.dirname(audio_path), exist_ok=True)
 
-        # Generate TTS
-        tts = gTTS(text=text, lang='en', slow=False)
-
-        # Save as MP3 (change extension)
-        mp3_path = output_path.replace('.wav', '.mp3')
-        tts.save(mp3_path)
+        # Reuse an identical earlier render
+        fmt = os.path.splitext(audio_path)[1][1:]
+        cache.render(
+            "gtts", "en", text, audio_path,
+            lambda path: synthesize(text, path),
+            slow=False, format=fmt
+        )
 
         return True
 
@@ -37,10 +58,18 @@ def generate_audio_gtts(text, output_path):
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate sentence audio with gTTS")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="only generate this node's share of the files (e.g. 2/4); see scripts/sharding.py")
+    args = parser.parse_args()
+
     print("🎙️  Audio Generation using gTTS (Free)")
     print("=" * 60)
-    print("⚠️  Note: Files will be saved as MP3 (iOS supports this)")
-    print("   For WAV format, install: brew install ffmpeg")
+    if HAS_PYDUB:
+        print("✅ Files will be saved as WAV (decoded in memory via pydub)")
+    else:
+        print("⚠️  Note: Files will be saved as MP3 (iOS supports this)")
+        print("   For WAV format, install: pip install pydub && brew install ffmpeg")
     print("=" * 60)
     print()
 
@@ -55,67 +84,105 @@ def main():
     print(f"📁 Output directory: {base_dir}")
     print()
 
-    # First, remove all existing placeholder files
-    print("🗑️  Removing placeholder files...")
-    removed = 0
-    for sentence in sentences:
-        wav_path = os.path.join(base_dir, sentence["outputFile"])
-        mp3_path = wav_path.replace('.wav', '.mp3')
-
-        if os.path.exists(wav_path):
-            os.remove(wav_path)
-            removed += 1
-        if os.path.exists(mp3_path):
-            os.remove(mp3_path)
-            removed += 1
-
-    print(f"   Removed {removed} files\n")
-
+    # Only sentences whose text (or engine settings) changed need regenerating;
+    # switching between MP3 and WAV output changes every signature
+    fmt = "wav" if HAS_PYDUB else "mp3"
+    manifest = BuildManifest(MANIFEST_FILE, shard_path(MANIFEST_FILE, args.shard))
+    formats = FormatManifest(FORMAT_MANIFEST, shard_path(FORMAT_MANIFEST, args.shard))
+    all_items = [
+        (sentence["outputFile"],
+         BuildManifest.signature(sentence["text"], "gtts", {"lang": "en", "slow": False, "format": fmt}),
+         os.path.splitext(os.path.join(base_dir, sentence["outputFile"]))[0] + f".{fmt}")
+        for sentence in sentences
+    ]
+    # Shard on the declared outputFile, not the .wav/.mp3 path - it must be the same on every node
+    items = [item for item in all_items if in_shard(os.path.join(base_dir, item[0]), args.shard)]
+    if args.shard:
+        print(f"🧩 Shard {args.shard.index}/{args.shard.count}: {len(items)} of {len(all_items)} sentences\n")
+    # Clips that predate the manifest are adopted rather than re-synthesized - unless they are silent placeholders
+    stale, current = manifest.plan(items, adopt_existing=is_finished_render)
+    by_output_file = {sentence["outputFile"]: sentence for sentence in sentences}
+
+    # Files an interrupted run finished are in the journal but may not have reached the manifest
+    journal = JobJournal(shard_path(JOURNAL_FILE, args.shard))
+    resumed = {
+        output_file for output_file, signature, audio_path in stale
+        if journal.is_done(audio_path, signature["text_hash"])
+    }
+    for output_file, signature, audio_path in stale:
+        if output_file in resumed:
+            manifest.record(output_file, signature, audio_path)
+            formats.record(audio_path)
+    stale = [item for item in stale if item[0] not in resumed]
+    if resumed:
+        print(f"📓 Resuming: {len(resumed)} files completed by an interrupted run")
+
+    print(f"⏭️  {len(current) + len(resumed)} files up to date, {len(stale)} to generate\n")
+
+    # Outdated files stay in place until their replacement is written, so a failed run leaves no gaps
+    cache = SynthesisCache()
     generated = 0
     failed = 0
+    removed = 0
     start_time = time.time()
 
     print("🎵 Generating audio files...")
-    print("   This will take 15-30 minutes for all 720 files")
+    print(f"   {len(stale)} of {len(sentences)} files need generating")
     print("   Progress updates every 10 files\n")
 
-    for i, sentence in enumerate(sentences, start=1):
+    for i, (output_file, signature, audio_path) in enumerate(stale, start=1):
+        sentence = by_output_file[output_file]
         word = sentence["word"]
         text = sentence["text"]
-        output_file = sentence["outputFile"]
-        output_path = os.path.join(base_dir, output_file)
 
         # Progress indicator
         if i % 10 == 0:
             elapsed = time.time() - start_time
             rate = i / elapsed if elapsed > 0 else 0
-            remaining = (len(sentences) - i) / rate if rate > 0 else 0
+            remaining = (len(stale) - i) / rate if rate > 0 else 0
             remaining_min = remaining / 60
 
-            print(f"[{i}/{len(sentences)}] Generated: {generated} | Failed: {failed} | "
+            print(f"[{i}/{len(stale)}] Generated: {generated} | Failed: {failed} | "
                   f"ETA: {remaining_min:.1f} min")
 
         # Generate audio
-        success = generate_audio_gtts(text, output_path)
+        success = generate_audio_gtts(text, audio_path, cache)
 
         if success:
+            journal.mark_done(audio_path, signature["text_hash"])
+            manifest.record(output_file, signature, audio_path)
+            formats.record(audio_path)
+            # The other format's copy (a .wav placeholder would be played first) goes only now
+            for old_path in remove_siblings(audio_path):
+                formats.forget(old_path)
+                removed += 1
             generated += 1
         else:
             failed += 1
             print(f"   ⚠️  Failed: {word} - {text[:50]}")
 
+    # The manifest now holds everything the journal did
+    manifest.save()
+    formats.save()
+    journal.clear()
+    if args.shard:
+        expected = [os.path.join(base_dir, item[0]) for item in all_items]
+        write_receipt("generate_audio_simple", args.shard, expected, failed, MANIFEST_FILE, FORMAT_MANIFEST)
     elapsed_total = time.time() - start_time
 
     print()
     print("=" * 60)
     print(f"📊 Summary:")
     print(f"   ✅ Generated: {generated}")
+    print(f"   ⏭️  Up to date: {len(current) + len(resumed)}")
     print(f"   ❌ Failed: {failed}")
-    print(f"   📁 Total: {len(sentences)}")
+    print(f"   🗑️  Replaced other-format copies: {removed}")
+    print(f"   📁 Total: {len(items)}")
     print(f"   ⏱️  Time: {elapsed_total/60:.1f} minutes")
+    print(f"   📦 Synthesis cache: {cache.summary()}")
     print("=" * 60)
     print()
-    print("📝 Files are in MP3 format (iOS AVAudioPlayer supports this)")
+    print(f"📝 Files are in {fmt.upper()} format - see {formats.path} for every file's real format")
     print()
     print("🎉 Done! You can now test the sentence feature in the app.")
 
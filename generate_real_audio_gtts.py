@@ -6,10 +6,19 @@ This uses the free Google Translate TTS API.
 For better quality, use generate_audio_files.py with ElevenLabs or Google Cloud TTS.
 """
 
+import argparse
+import io
 import json
 import os
 import sys
-from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from tts_cache import SynthesisCache
+from audio_io import HAS_PYDUB
+from audio_metrics import is_finished_render
+from audio_output import FORMAT_MANIFEST, FormatManifest, remove_siblings, write_declared
+from build_manifest import MANIFEST_FILE, BuildManifest
+from sharding import in_shard, parse_shard, shard_path, write_receipt
 
 try:
     from gtts import gTTS
@@ -19,68 +28,41 @@ except ImportError:
     subprocess.check_call([sys.executable, "-m", "pip", "install", "gtts", "--quiet"])
     from gtts import gTTS
 
-try:
-    from pydub import AudioSegment
-    HAS_PYDUB = True
-except ImportError:
+SAMPLE_RATE = 44100  # WAV output: mono, 44.1 kHz, 16-bit
+
+if not HAS_PYDUB:
     print("⚠️  pydub not installed. Audio will be in MP3 format.")
     print("   To convert to WAV, install: pip install pydub")
-    HAS_PYDUB = False
 
-def convert_mp3_to_wav(mp3_path, wav_path):
-    """Convert MP3 to WAV with correct specifications."""
-    if not HAS_PYDUB:
-        # Just rename if we can't convert
-        os.rename(mp3_path, wav_path.replace('.wav', '.mp3'))
-        return False
+def synthesize(text, path):
+    """Render text with gTTS in memory and write it in the format path's extension declares."""
+    buffer = io.BytesIO()
+    gTTS(text=text, lang='en', slow=False).write_to_fp(buffer)
+    write_declared(path, buffer.getvalue(), SAMPLE_RATE if path.endswith('.wav') else None)
 
-    try:
-        # Load MP3
-        audio = AudioSegment.from_mp3(mp3_path)
-
-        # Convert to mono, 44.1kHz, 16-bit
-        audio = audio.set_channels(1)  # Mono
-        audio = audio.set_frame_rate(44100)  # 44.1 kHz
-        audio = audio.set_sample_width(2)  # 16-bit
-
-        # Export as WAV
-        audio.export(wav_path, format="wav")
-
-        # Remove temporary MP3
-        os.remove(mp3_path)
-        return True
-    except Exception as e:
-        print(f"   ⚠️  Conversion failed: {e}")
-        return False
-
-def generate_audio_gtts(text, output_path):
-    """Generate audio using gTTS."""
+def generate_audio_gtts(text, audio_path, cache):
+    """Generate audio using gTTS and save it as audio_path (.wav, or .mp3 without pydub)."""
     try:
         # Create directory if needed
-        os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-        # Generate TTS
-        tts = gTTS(text=text, lang='en', slow=False)
+        os.makedirs(os.path.dirname(audio_path), exist_ok=True)
 
-        # Save as MP3 first
-        temp_mp3 = output_path.replace('.wav', '_temp.mp3')
-        tts.save(temp_mp3)
-
-        # Convert to WAV if possible
-        if HAS_PYDUB:
-            success = convert_mp3_to_wav(temp_mp3, output_path)
-            return success
+        if audio_path.endswith('.wav'):
+            params = {"slow": False, "format": "wav", "sample_rate": SAMPLE_RATE}
         else:
-            # Keep as MP3
-            final_path = output_path.replace('.wav', '.mp3')
-            os.rename(temp_mp3, final_path)
-            return True
+            params = {"slow": False}
+        cache.render("gtts", "en", text, audio_path, lambda path: synthesize(text, path), **params)
+        return True
 
     except Exception as e:
         print(f"   ❌ Error: {e}")
         return False
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate sentence audio with gTTS, converted to WAV")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="only generate this node's share of the files (e.g. 2/4); see scripts/sharding.py")
+    args = parser.parse_args()
+
     print("🎙️  Audio Generation using gTTS (Free)")
     print("=" * 60)
     print("⚠️  Note: gTTS provides basic quality TTS for free")
@@ -99,47 +81,76 @@ def main():
     print(f"📁 Output directory: {base_dir}")
     print()
 
-    # First, remove all existing placeholder files
-    print("🗑️  Removing placeholder files...")
-    removed = 0
-    for sentence in sentences:
-        wav_path = os.path.join(base_dir, sentence["outputFile"])
-        if os.path.exists(wav_path):
-            os.remove(wav_path)
-            removed += 1
-    print(f"   Removed {removed} placeholder files\n")
-
+    # Only sentences whose text (or output format) changed need regenerating
+    if HAS_PYDUB:
+        params, extension = {"lang": "en", "slow": False, "format": "wav", "sample_rate": 44100}, '.wav'
+    else:
+        params, extension = {"lang": "en", "slow": False, "format": "mp3"}, '.mp3'
+
+    manifest = BuildManifest(MANIFEST_FILE, shard_path(MANIFEST_FILE, args.shard))
+    formats = FormatManifest(FORMAT_MANIFEST, shard_path(FORMAT_MANIFEST, args.shard))
+    all_items = [
+        (sentence["outputFile"],
+         BuildManifest.signature(sentence["text"], "gtts", params),
+         os.path.join(base_dir, sentence["outputFile"]).replace('.wav', extension))
+        for sentence in sentences
+    ]
+    # Shard on the declared outputFile, not the .wav/.mp3 path - it must be the same on every node
+    items = [item for item in all_items if in_shard(os.path.join(base_dir, item[0]), args.shard)]
+    if args.shard:
+        print(f"🧩 Shard {args.shard.index}/{args.shard.count}: {len(items)} of {len(all_items)} sentences\n")
+    # Clips that predate the manifest are adopted rather than re-synthesized - unless they are silent placeholders
+    stale, current = manifest.plan(items, adopt_existing=is_finished_render)
+    by_output_file = {sentence["outputFile"]: sentence for sentence in sentences}
+
+    print(f"⏭️  {len(current)} files up to date, {len(stale)} to generate\n")
+
+    # Outdated files stay in place until their replacement is written, so a failed run leaves no gaps
+    cache = SynthesisCache()
     generated = 0
     failed = 0
+    removed = 0
 
     print("🎵 Generating audio files...")
-    print("   This will take 15-30 minutes for all 720 files")
+    print(f"   {len(stale)} of {len(sentences)} files need generating")
     print()
 
-    for i, sentence in enumerate(sentences, start=1):
-        word = sentence["word"]
-        text = sentence["text"]
-        output_file = sentence["outputFile"]
-        output_path = os.path.join(base_dir, output_file)
+    for i, (output_file, signature, actual_path) in enumerate(stale, start=1):
+        text = by_output_file[output_file]["text"]
 
         # Progress indicator
         if i % 10 == 0:
-            print(f"[{i}/{len(sentences)}] Generated {generated}, Failed {failed}")
+            print(f"[{i}/{len(stale)}] Generated {generated}, Failed {failed}")
 
         # Generate audio
-        success = generate_audio_gtts(text, output_path)
+        success = generate_audio_gtts(text, actual_path, cache)
 
         if success:
+            manifest.record(output_file, signature, actual_path)
+            formats.record(actual_path)
+            # The other format's copy (a .wav placeholder would be played first) goes only now
+            for old_path in remove_siblings(actual_path):
+                formats.forget(old_path)
+                removed += 1
             generated += 1
         else:
             failed += 1
 
+    manifest.save()
+    formats.save()
+    if args.shard:
+        expected = [os.path.join(base_dir, item[0]) for item in all_items]
+        write_receipt("generate_real_audio_gtts", args.shard, expected, failed, MANIFEST_FILE, FORMAT_MANIFEST)
+
     print()
     print("=" * 60)
     print(f"📊 Summary:")
     print(f"   ✅ Generated: {generated}")
+    print(f"   ⏭️  Up to date: {len(current)}")
     print(f"   ❌ Failed: {failed}")
-    print(f"   📁 Total: {len(sentences)}")
+    print(f"   🗑️  Replaced other-format copies: {removed}")
+    print(f"   📁 Total: {len(items)}")
+    print(f"   📦 Synthesis cache: {cache.summary()}")
     print("=" * 60)
     print()
 
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Compile the list of every audio clip the app expects into one indexed file.
+
+Generators, validators, the sprite packer and the completeness checker used
+to rebuild this list themselves from word_bank.json, SENTENCES_AUDIO_BATCH.json
+and their own copies of the feedback and instruction tables. The compiler
+reads those sources once and writes EXPECTED_ASSETS.json: one entry per clip,
+keyed by its path relative to Resources/Audio without extension
+("Lisa/words/difficulty_1/cat"), with category, voice, source text, text
+hash and target format, plus a per-category index of the keys.
+
+The feedback and instruction tables live here and nowhere else. The file
+records the size and mtime of its source files (and a hash of the tables,
+computed once at compile time), and load_manifest() recompiles it whenever
+a source changed - so tools can always just load it, for the price of two
+stats.
+
+Usage:
+    python asset_manifest.py            # compile (if stale) and summarize
+    python asset_manifest.py --force    # recompile regardless
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from collections import defaultdict
+
+from audio_output import declared_format
+from build_manifest import text_hash
+from sharding import REPO_ROOT
+
+# Configuration
+MANIFEST_FILE = str(REPO_ROOT / "EXPECTED_ASSETS.json")
+WORD_BANK_FILE = str(REPO_ROOT / "scripts" / "word_bank.json")
+SENTENCES_FILE = str(REPO_ROOT / "SENTENCES_AUDIO_BATCH.json")
+MANIFEST_VERSION = 2
+VOICES = ["Lisa"]  # Voices AudioPlaybackService plays
+
+FEEDBACK_MAP = {
+    'success': [
+        ('Great job!', 'great_job'),
+        ('Excellent!', 'excellent'),
+        ('You got it!', 'you_got_it'),
+        ('Perfect!', 'perfect'),
+        ('Amazing!', 'amazing'),
+        ('Wonderful!', 'wonderful')
+    ],
+    'encouragement': [
+        ('Nice try!', 'nice_try'),
+        ('Almost there!', 'almost_there'),
+        ('Keep trying!', 'keep_trying'),
+        ("Don't give up!", 'dont_give_up')
+    ],
+    'system': [
+        ('The correct spelling is', 'correct_spelling_is'),
+        ('Congratulations! You completed the level!', 'level_complete')
+    ]
+}
+
+INSTRUCTIONS = [
+    ('Listen carefully!', 'listen_carefully'),
+    ('Spell the word out loud', 'spell_out_loud'),
+    ('Say each letter', 'say_each_letter'),
+    ('Tap to speak', 'tap_to_speak'),
+    ('Type the spelling', 'type_spelling')
+]
+
+
+def load_word_bank(path=WORD_BANK_FILE):
+    with open(path, 'r') as f:
+        return {int(k): v for k, v in json.load(f).items()}
+
+
+# Hash of the tables above - part of every manifest's sources, computed once per process
+TABLES_HASH = hashlib.sha256(f"{VOICES}|{FEEDBACK_MAP}|{INSTRUCTIONS}".encode("utf-8")).hexdigest()
+
+
+def source_stamp(word_bank_path=WORD_BANK_FILE, sentences_path=SENTENCES_FILE):
+    """What the manifest is compiled from: the tables' hash and each source file's [size, mtime] (None if absent)"""
+    files = {}
+    for path in (word_bank_path, sentences_path):
+        try:
+            stat = os.stat(path)
+            files[os.path.basename(path)] = [stat.st_size, stat.st_mtime_ns]
+        except FileNotFoundError:
+            files[os.path.basename(path)] = None
+    return {"tables": TABLES_HASH, "files": files}
+
+
+def source_clips(word_bank, sentences):
+    """(category, clip path relative to a voice root with extension, text) for every expected clip"""
+    for difficulty, words in sorted(word_bank.items()):
+        for word in words:
+            yield 'words', f"words/difficulty_{difficulty}/{word}.wav", word
+            # What an engine is asked to say when spelling clips aren't composed from letters
+            yield 'spelling', f"spelling/difficulty_{difficulty}/{word}_spelled.wav", ", ".join(word.upper())
+    for letter in "ABCDEFGHIJKLMNOPQRSTUVWXYZ":
+        yield 'letters', f"letters/{letter.lower()}.wav", letter
+    for category, messages in FEEDBACK_MAP.items():
+        for text, filename in messages:
+            yield 'feedback', f"feedback/{category}/{filename}.wav", text
+    for text, filename in INSTRUCTIONS:
+        yield 'instructions', f"instructions/{filename}.wav", text
+    for sentence in sentences:
+        yield 'sentences', f"sentences/{sentence['outputFile']}", sentence['text']
+
+
+def compile_manifest(word_bank_path=WORD_BANK_FILE, sentences_path=SENTENCES_FILE):
+    """The manifest as a JSON-ready dict. A missing sentence batch just leaves sentences out."""
+    # Stamped before reading, so a source edited mid-compile makes the result stale, not current
+    sources = source_stamp(word_bank_path, sentences_path)
+    word_bank = load_word_bank(word_bank_path)
+    sentences = []
+    if os.path.exists(sentences_path):
+        with open(sentences_path, 'r', encoding='utf-8') as f:
+            sentences = json.load(f)["sentences"]
+
+    clips = {}
+    categories = defaultdict(list)
+    for voice in VOICES:
+        for category, relative, text in source_clips(word_bank, sentences):
+            name = os.path.splitext(relative)[0]
+            key = f"{voice}/{name}"
+            clips[key] = {"category": category, "voice": voice, "name": name, "text": text,
+                          "text_hash": text_hash(text), "format": declared_format(relative)}
+            categories[category].append(key)
+
+    return {"version": MANIFEST_VERSION, "sources": sources,
+            "voices": VOICES, "has_sentences": bool(sentences), "clips": clips,
+            "categories": dict(categories)}
+
+
+class AssetManifest:
+    """Expected clips, keyed by path relative to Resources/Audio without extension"""
+
+    def __init__(self, data, path=MANIFEST_FILE):
+        self.path = path
+        self.voices = data["voices"]
+        self.has_sentences = data["has_sentences"]
+        self.clips = data["clips"]
+        self.categories = data["categories"]
+
+    def __contains__(self, key):
+        return key in self.clips
+
+    def __getitem__(self, key):
+        return self.clips[key]
+
+    def __len__(self):
+        return len(self.clips)
+
+    def keys(self, category):
+        return self.categories.get(category, [])
+
+    def names(self, category):
+        """Clip names of a category relative to any voice root - the same set for every voice"""
+        return {self.clips[key]["name"] for key in self.keys(category)}
+
+    def clips_of(self, category, voice=None):
+        """Entries of a category for one voice (default: the first), in source order"""
+        voice = voice or self.voices[0]
+        return [self.clips[key] for key in self.keys(category) if self.clips[key]["voice"] == voice]
+
+
+def clip_path(clip):
+    """File a manifest entry is rendered to, relative to Resources/Audio ("Lisa/words/difficulty_1/cat.wav")"""
+    return f"{clip['voice']}/{clip['name']}.{clip['format']}"
+
+
+def spelled_word(clip):
+    """The word a spelling entry spells out ("spelling/difficulty_1/cat_spelled" -> "cat")"""
+    return os.path.basename(clip["name"])[:-len("_spelled")]
+
+
+def load_manifest(path=MANIFEST_FILE, force=False):
+    """
+    The compiled manifest, recompiled first if its sources changed (or force).
+    Raises FileNotFoundError if word_bank.json hasn't been exported yet.
+    """
+    data = None
+    if not force and os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != MANIFEST_VERSION or data.get("sources") != source_stamp():
+            data = None
+
+    if data is None:
+        data = compile_manifest()
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(temp_path, path)
+    return AssetManifest(data, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the expected-asset manifest")
+    parser.add_argument("--force", action="store_true", help="recompile even if the sources are unchanged")
+    args = parser.parse_args()
+
+    try:
+        manifest = load_manifest(force=args.force)
+    except FileNotFoundError:
+        print(f"❌ {WORD_BANK_FILE} not found!")
+        print("   Please run: python export_word_bank.py")
+        exit(1)
+
+    print(f"📋 Expected assets: {manifest.path}")
+    print(f"   Voices: {', '.join(manifest.voices)}")
+    for category, keys in manifest.categories.items():
+        print(f"   {category:<13} {len(keys):5d}")
+    print(f"   Total: {len(manifest)}")
+    if not manifest.has_sentences:
+        print(f"   ⚠️  {SENTENCES_FILE} not found - no sentence clips listed")
+
+
+if __name__ == "__main__":
+    main()
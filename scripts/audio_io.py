@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""
+NumPy helpers for reading and writing the bundle's audio clips.
+Samples are handled as mono float32 in [-1.0, 1.0].
+
+PCM and IMA ADPCM WAV are handled natively. Many clips are really MP3 (gTTS
+output, some saved under a .wav name); those are decoded and re-encoded
+through pydub when it is installed.
+"""
+
+import io
+import os
+import struct
+import wave
+from pathlib import Path
+
+import numpy as np
+
+try:
+    from pydub import AudioSegment
+    HAS_PYDUB = True
+except ImportError:
+    HAS_PYDUB = False
+
+_PCM_DTYPES = {1: np.uint8, 2: np.int16, 4: np.int32}
+
+# Folders of Resources/Audio (directly or under a voice folder like Lisa/)
+CATEGORIES = ["words", "spelling", "letters", "feedback", "instructions", "sentences", "answers"]
+AUDIO_EXTENSIONS = (".wav", ".mp3")
+DERIVED_DIRS = {"slow"}  # Variant trees built from other clips (time_stretch.py) - not clips of their own
+
+
+def read_wav(path):
+    """Load a PCM WAV file (path or file object). Returns (samples, sample_rate); multichannel input is downmixed."""
+    with wave.open(path if hasattr(path, 'read') else str(path), 'rb') as wav:
+        sample_rate = wav.getframerate()
+        channels = wav.getnchannels()
+        width = wav.getsampwidth()
+        raw = wav.readframes(wav.getnframes())
+
+    if width not in _PCM_DTYPES:
+        raise ValueError(f"{path}: unsupported sample width {width * 8}-bit")
+
+    samples = np.frombuffer(raw, dtype=np.dtype(_PCM_DTYPES[width]).newbyteorder('<')).astype(np.float32)
+    if width == 1:
+        samples = (samples - 128.0) / 128.0
+    else:
+        samples /= float(2 ** (8 * width - 1))
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, sample_rate
+
+
+def to_pcm16(samples):
+    """Convert float samples to little-endian 16-bit PCM bytes (with clipping)"""
+    clipped = np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0)
+    return (clipped * 32767.0).round().astype('<i2').tobytes()
+
+
+def write_wav(path, samples, sample_rate):
+    """Write mono float samples as a 16-bit PCM WAV file"""
+    with wave.open(str(path), 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(to_pcm16(samples))
+
+
+def sniff_bytes(header):
+    """'wav', 'adpcm' or 'mp3' from a clip's first bytes (at least 22), or None"""
+    if header[:4] == b'RIFF' and header[8:12] == b'WAVE':
+        # Format tag of a leading fmt chunk: 0x0011 is IMA ADPCM
+        if header[12:16] == b'fmt ' and header[20:22] == b'\x11\x00':
+            return 'adpcm'
+        return 'wav'
+    if header[:3] == b'ID3' or (len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0):
+        return 'mp3'
+    return None
+
+
+def sniff_format(path):
+    """'wav', 'adpcm' or 'mp3' from the file's magic bytes (not its extension), or None"""
+    with open(path, 'rb') as f:
+        return sniff_bytes(f.read(22))
+
+
+def decode_bytes(data, name="<bytes>"):
+    """Decode an in-memory WAV, ADPCM WAV or MP3 clip. Returns (samples, sample_rate, format)."""
+    fmt = sniff_bytes(data[:22])
+    if fmt == 'wav':
+        samples, sample_rate = read_wav(io.BytesIO(data))
+        return samples, sample_rate, fmt
+    if fmt == 'adpcm':
+        from ima_adpcm import parse_adpcm_wav
+        samples, sample_rate = parse_adpcm_wav(data, name)
+        return samples, sample_rate, fmt
+    if fmt != 'mp3':
+        raise ValueError(f"{name}: not a WAV or MP3 file")
+    if not HAS_PYDUB:
+        raise RuntimeError(f"{name}: is MP3; decoding needs pydub (pip install pydub, plus ffmpeg)")
+
+    segment = AudioSegment.from_file(io.BytesIO(data), format='mp3').set_channels(1)
+    samples = np.array(segment.get_array_of_samples(), dtype=np.float32)
+    samples /= float(2 ** (8 * segment.sample_width - 1))
+    return samples, segment.frame_rate, fmt
+
+
+def read_audio(path):
+    """Load a WAV, ADPCM WAV or MP3 clip whatever its extension. Returns (samples, sample_rate, format)."""
+    with open(path, 'rb') as f:
+        return decode_bytes(f.read(), str(path))
+
+
+# MPEG audio frame header tables (Layer III)
+_MP3_SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+_MP3_BITRATES_V1 = [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320]
+_MP3_BITRATES_V2 = [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160]
+
+
+def probe_bytes(data, file_size=None):
+    """
+    True format of a clip from its headers alone (no decoding).
+    data must hold the RIFF chunk headers up to 'data', or an MP3's ID3 tag
+    plus its first frame header. Returns a dict with format, sample_rate,
+    channels, bits_per_sample (0 for MP3), duration (seconds) and for MP3 the bitrate.
+    """
+    file_size = len(data) if file_size is None else file_size
+    fmt = sniff_bytes(data[:22])
+
+    if fmt in ('wav', 'adpcm'):
+        offset = 12
+        info = None
+        frame_count = None
+        while offset + 8 <= len(data):
+            chunk_id = data[offset:offset + 4]
+            size = struct.unpack('<I', data[offset + 4:offset + 8])[0]
+            if chunk_id == b'fmt ':
+                tag, channels, rate, byte_rate, block_align, bits = struct.unpack(
+                    '<HHIIHH', data[offset + 8:offset + 24])
+                info = {"format": fmt, "sample_rate": rate, "channels": channels, "bits_per_sample": bits}
+            elif chunk_id == b'fact':
+                frame_count = struct.unpack('<I', data[offset + 8:offset + 12])[0]
+            elif chunk_id == b'data':
+                if info is None:
+                    raise ValueError("WAV data chunk before fmt chunk")
+                # Compressed WAVs state their length in the fact chunk
+                if frame_count is not None:
+                    info["duration"] = frame_count / info["sample_rate"]
+                else:
+                    info["duration"] = size / byte_rate if byte_rate else 0.0
+                return info
+            offset += 8 + size + (size & 1)
+        raise ValueError("WAV header incomplete (no data chunk)")
+
+    if fmt == 'mp3':
+        offset = 0
+        if data[:3] == b'ID3':
+            # ID3v2 size is a 28-bit syncsafe integer
+            size = (data[6] & 0x7F) << 21 | (data[7] & 0x7F) << 14 | (data[8] & 0x7F) << 7 | (data[9] & 0x7F)
+            offset = 10 + size + (10 if data[5] & 0x10 else 0)
+        while offset + 4 <= len(data) and not (data[offset] == 0xFF and data[offset + 1] & 0xE0 == 0xE0):
+            offset += 1
+        if offset + 4 > len(data):
+            raise ValueError("no MP3 frame header found")
+
+        version = (data[offset + 1] >> 3) & 0x03
+        layer = (data[offset + 1] >> 1) & 0x03
+        bitrate_index = data[offset + 2] >> 4
+        rate_index = (data[offset + 2] >> 2) & 0x03
+        if version == 1 or layer != 1 or rate_index == 3 or bitrate_index in (0, 15):
+            raise ValueError("invalid or unsupported MP3 frame header")
+
+        bitrate = (_MP3_BITRATES_V1 if version == 3 else _MP3_BITRATES_V2)[bitrate_index] * 1000
+        return {
+            "format": "mp3",
+            "sample_rate": _MP3_SAMPLE_RATES[version][rate_index],
+            "channels": 1 if data[offset + 3] >> 6 == 3 else 2,
+            "bits_per_sample": 0,
+            "bitrate": bitrate,
+            "duration": (file_size - offset) * 8 / bitrate,  # Exact for constant bitrate
+        }
+
+    raise ValueError("not a WAV or MP3 file")
+
+
+def probe(path, prefix_bytes=65536):
+    """probe_bytes for a file, reading only its first prefix_bytes"""
+    with open(path, 'rb') as f:
+        return probe_bytes(f.read(prefix_bytes), os.fstat(f.fileno()).st_size)
+
+
+def mp3_bitrate(path, duration_seconds):
+    """Approximate bitrate of an existing MP3, so a re-encode keeps its size class"""
+    kbps = os.path.getsize(path) * 8 / max(duration_seconds, 1e-3) / 1000
+    return f"{max(16, int(round(kbps / 8)) * 8)}k"
+
+
+def write_audio(path, samples, sample_rate, fmt, bitrate="32k"):
+    """Write mono float samples as 16-bit PCM WAV, IMA ADPCM WAV or MP3, regardless of the file's extension"""
+    if fmt == 'wav':
+        write_wav(path, samples, sample_rate)
+        return
+    if fmt == 'adpcm':
+        from ima_adpcm import write_adpcm_wav
+        write_adpcm_wav(path, samples, sample_rate)
+        return
+    if not HAS_PYDUB:
+        raise RuntimeError(f"{path}: encoding MP3 needs pydub (pip install pydub, plus ffmpeg)")
+    segment = AudioSegment(data=to_pcm16(samples), sample_width=2, frame_rate=sample_rate, channels=1)
+    segment.export(str(path), format='mp3', bitrate=bitrate)
+
+
+def category_of(path):
+    """Bundle category (words, spelling, ...) a clip belongs to, or 'other'"""
+    parts = str(path).replace(os.sep, '/').split('/')
+    return next((part for part in parts if part in CATEGORIES), 'other')
+
+
+def voice_roots(audio_dir, categories=CATEGORIES):
+    """{voice name: folder holding the category folders} - "default" for categories directly under Audio/"""
+    roots = {}
+    audio_dir = Path(audio_dir)
+    for root in [audio_dir] + sorted(p for p in audio_dir.iterdir() if p.is_dir()):
+        if any((root / category).is_dir() for category in categories):
+            roots["default" if root == audio_dir else root.name] = root
+    return roots
+
+
+def resolve_clip(stem):
+    """The file the app would play for a path without extension (.wav first, then .mp3), or None"""
+    for extension in AUDIO_EXTENSIONS:
+        if os.path.exists(f"{stem}{extension}"):
+            return f"{stem}{extension}"
+    return None
+
+
+def iter_audio_files(root):
+    """
+    Every clip under root, in a stable order. Skips in-progress temp files and
+    the derived variant trees, so no stage reprocesses (or dedups) a variant
+    as if it were a source clip.
+    """
+    for directory, subdirs, files in os.walk(root):
+        subdirs[:] = sorted(subdir for subdir in subdirs if subdir not in DERIVED_DIRS)
+        for name in sorted(files):
+            if name.endswith(AUDIO_EXTENSIONS) and not name.startswith('.'):
+                yield os.path.join(directory, name)
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Signal metrics of decoded clips, shared by the validator and the generators.
+
+validate_audio.py --content turns these into pass/fail checks; the
+generators only need the silence test to tell a finished render from the
+silent placeholders create_placeholder_audio.py writes. Keeping them here
+lets a generator run that test without importing the whole validator.
+"""
+
+import numpy as np
+
+from audio_io import read_audio, sniff_format
+from trim_silence import frame_energy_db
+
+# Configuration
+SILENT_PEAK_DB = -50.0  # A clip whose peak is below this is silent
+CLIP_LEVEL = 0.999  # |sample| at or above this counts as clipped
+ACTIVITY_FRAME_MS = 10
+ACTIVITY_DB = -45.0  # Frames louder than this (dBFS) count as speech
+
+
+def signal_metrics(clips):
+    """
+    Content metrics for a list of (samples, sample_rate), computed for the
+    whole batch at once: the clips are concatenated and every per-clip sum
+    or maximum is a single np.add/np.maximum.reduceat over the clip offsets.
+    """
+    lengths = np.array([max(len(samples), 1) for samples, _ in clips])
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    joined = np.concatenate([samples if len(samples) else np.zeros(1, np.float32) for samples, _ in clips])
+    magnitude = np.abs(joined)
+
+    rms = np.sqrt(np.add.reduceat(np.square(joined, dtype=np.float64), starts) / lengths)
+    peak = np.maximum.reduceat(magnitude, starts)
+    dc = np.add.reduceat(joined, starts, dtype=np.float64) / lengths
+    clipped = np.add.reduceat((magnitude >= CLIP_LEVEL).astype(np.int64), starts) / lengths
+
+    metrics = []
+    for i, (samples, sample_rate) in enumerate(clips):
+        energy = frame_energy_db(samples, max(1, int(sample_rate * ACTIVITY_FRAME_MS / 1000)))
+        metrics.append({
+            "rms_db": float(20 * np.log10(max(rms[i], 1e-10))),
+            "peak_db": float(20 * np.log10(max(peak[i], 1e-10))),
+            "dc_offset": float(dc[i]),
+            "clipping_ratio": float(clipped[i]),
+            "speech_fraction": float((energy > ACTIVITY_DB).mean()) if energy.size else 0.0,
+        })
+    return metrics
+
+
+def is_finished_render(path):
+    """
+    Whether an existing file can be adopted as a render: anything but the
+    silent PCM placeholders. MP3 is always a real render - placeholders are
+    never MP3.
+    """
+    if sniff_format(path) == "mp3":
+        return True
+    try:
+        samples, sample_rate, _ = read_audio(path)
+    except Exception:
+        return False
+    return signal_metrics([(samples, sample_rate)])[0]["peak_db"] >= SILENT_PEAK_DB
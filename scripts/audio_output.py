@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Format-aware output stage for TTS engines.
+
+Engines hand back encoded bytes (gTTS always MP3) that used to be written
+under whatever name the caller wanted - MP3 data in .wav files. Here the
+file extension declares the container: engine bytes are written as-is when
+they already match it, and otherwise decoded and re-encoded in memory in one
+pass. Every written file is probed and recorded in a format manifest so
+tools (and people) can see what each file really is.
+
+Usage:
+    python audio_output.py    # probe the whole Audio tree and rewrite the manifest
+"""
+
+import json
+import os
+from pathlib import Path
+
+from audio_io import AUDIO_EXTENSIONS, decode_bytes, iter_audio_files, probe, sniff_bytes, write_audio
+from sharding import REPO_ROOT, shard_key
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+FORMAT_MANIFEST = str(REPO_ROOT / "AUDIO_FORMATS.json")
+DECLARED_FORMATS = {".wav": "wav", ".mp3": "mp3"}
+MP3_BITRATE = "64k"  # What gTTS itself produces
+
+
+def declared_format(path):
+    suffix = Path(path).suffix.lower()
+    if suffix not in DECLARED_FORMATS:
+        raise ValueError(f"{path}: unknown audio extension {suffix!r}")
+    return DECLARED_FORMATS[suffix]
+
+
+def write_declared(output_path, data, sample_rate=None):
+    """
+    Write engine output bytes to output_path in the container its extension
+    declares, resampled to sample_rate if one is given.
+    """
+    target = declared_format(output_path)
+    if sniff_bytes(data[:22]) == target and sample_rate is None:
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        return
+
+    samples, rate, _ = decode_bytes(data, str(output_path))
+    if sample_rate is not None and rate != sample_rate:
+        from resample_audio import resample  # Needs scipy - only when a rate is asked for
+        samples, rate = resample(samples, rate, sample_rate), sample_rate
+    write_audio(output_path, samples, rate, target, MP3_BITRATE)
+
+
+def remove_siblings(output_path):
+    """
+    Delete copies of output_path under the other audio extension. Call it once
+    the new file is in place - the app plays a stale .wav before any .mp3.
+    Returns the removed paths.
+    """
+    stem, extension = os.path.splitext(output_path)
+    removed = []
+    for other in AUDIO_EXTENSIONS:
+        if other != extension.lower() and os.path.exists(stem + other):
+            os.remove(stem + other)
+            removed.append(stem + other)
+    return removed
+
+
+class FormatManifest:
+    """True format of every generated file, keyed by path relative to Resources/Audio"""
+
+    def __init__(self, path=FORMAT_MANIFEST, save_path=None):
+        """
+        save_path: write updates here instead of to path (sharded runs each keep
+        their own copy, merged back by `sharding.py verify`).
+        """
+        self.path = save_path or path
+        self.entries = {}
+        for source in dict.fromkeys([path, self.path]):
+            if os.path.exists(source):
+                with open(source, 'r', encoding='utf-8') as f:
+                    self.entries.update(json.load(f).get("files", {}))
+
+    def record(self, output_path):
+        info = probe(output_path)
+        suffix = Path(output_path).suffix.lower()
+        info["declared"] = DECLARED_FORMATS.get(suffix)
+        # ADPCM is still a WAV container, so it satisfies a .wav name
+        info["matches_extension"] = info["declared"] == ("wav" if info["format"] == "adpcm" else info["format"])
+        self.entries[shard_key(output_path)] = info
+        return info
+
+    def forget(self, output_path):
+        self.entries.pop(shard_key(output_path), None)
+
+    def mismatched(self):
+        return sorted(key for key, info in self.entries.items() if not info["matches_extension"])
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({"version": 1, "files": self.entries}, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+def main():
+    """Rebuild the manifest from the files on disk"""
+    if not os.path.isdir(OUTPUT_DIR):
+        print(f"❌ Audio directory not found: {OUTPUT_DIR}")
+        return
+
+    manifest = FormatManifest()
+    manifest.entries = {}
+    failed = 0
+    for path in iter_audio_files(OUTPUT_DIR):
+        try:
+            manifest.record(path)
+        except ValueError as e:
+            print(f"   ❌ {path}: {e}")
+            failed += 1
+    manifest.save()
+
+    mismatched = manifest.mismatched()
+    print(f"📋 Format manifest: {manifest.path}")
+    print(f"   Files: {len(manifest.entries)}")
+    print(f"   Content doesn't match extension: {len(mismatched)}")
+    for key in mismatched[:10]:
+        print(f"      - {key} ({manifest.entries[key]['format']})")
+    if failed:
+        print(f"   Unreadable: {failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Build manifest for generated sentence audio.
+
+Records, for every outputFile, the hash of the text it was rendered from plus
+the engine and params used. The planner compares that against the current
+SENTENCES_AUDIO_BATCH.json so only entries whose inputs changed are
+re-synthesized - editing one sentence costs one synthesis, not 720.
+
+Both files live at the repo root whichever directory a tool runs from.
+
+Usage:
+    python build_manifest.py [path/to/SENTENCES_AUDIO_MANIFEST.json]
+"""
+
+import hashlib
+import json
+import os
+import sys
+
+from sharding import REPO_ROOT
+
+MANIFEST_FILE = str(REPO_ROOT / "SENTENCES_AUDIO_MANIFEST.json")
+SENTENCES_FILE = str(REPO_ROOT / "SENTENCES_AUDIO_BATCH.json")
+SAVE_EVERY = 25  # Flush to disk after this many new records
+
+
+def text_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path=MANIFEST_FILE, save_path=None):
+        """
+        save_path: write updates here instead of to path (sharded runs each keep
+        their own copy, merged back by `sharding.py verify`).
+        """
+        self.path = save_path or path
+        self.entries = {}
+        self.unsaved = 0
+        for source in dict.fromkeys([path, self.path]):
+            if os.path.exists(source):
+                with open(source, "r", encoding="utf-8") as f:
+                    self.entries.update(json.load(f).get("entries", {}))
+
+    @staticmethod
+    def signature(text, engine, params):
+        return {"text_hash": text_hash(text), "engine": engine, "params": params}
+
+    def is_current(self, output_file, signature, actual_path):
+        entry = self.entries.get(output_file)
+        return (
+            entry is not None
+            and all(entry.get(k) == v for k, v in signature.items())
+            and os.path.exists(actual_path)
+        )
+
+    def plan(self, items, adopt_existing=False):
+        """
+        Split items into (stale, current).
+        Each item is (output_file, signature, actual_path). With adopt_existing,
+        files on disk that predate the manifest are recorded as current instead
+        of being regenerated (useful when re-rendering costs real money); pass
+        a predicate on the path to adopt only the files it accepts.
+        """
+        stale, current = [], []
+        for item in items:
+            output_file, signature, actual_path = item
+            if self.is_current(output_file, signature, actual_path):
+                current.append(item)
+            elif (adopt_existing and output_file not in self.entries and os.path.exists(actual_path)
+                  and (adopt_existing is True or adopt_existing(actual_path))):
+                self.record(output_file, signature, actual_path)
+                current.append(item)
+            else:
+                stale.append(item)
+        return stale, current
+
+    def record(self, output_file, signature, actual_path):
+        self.entries[output_file] = dict(signature, file=os.path.basename(actual_path))
+        self.unsaved += 1
+        if self.unsaved >= SAVE_EVERY:
+            self.save()
+
+    def save(self):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": 1, "entries": self.entries}, f, indent=2, sort_keys=True, ensure_ascii=False)
+        os.replace(temp_path, self.path)
+        self.unsaved = 0
+
+
+def main():
+    """Show how the manifest compares to the current sentence batch"""
+    manifest = BuildManifest(sys.argv[1] if len(sys.argv) > 1 else MANIFEST_FILE)
+
+    with open(SENTENCES_FILE, "r", encoding="utf-8") as f:
+        sentences = json.load(f)["sentences"]
+
+    changed = missing = 0
+    for sentence in sentences:
+        entry = manifest.entries.get(sentence["outputFile"])
+        if entry is None:
+            missing += 1
+        elif entry["text_hash"] != text_hash(sentence["text"]):
+            changed += 1
+            print(f"   ✏️  {sentence['outputFile']}: text changed")
+
+    print(f"📋 Manifest: {manifest.path}")
+    print(f"   Recorded: {len(manifest.entries)}")
+    print(f"   Text changed: {changed}")
+    print(f"   Not yet recorded: {missing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,60 @@
 #!/usr/bin/env python3
 """
 Check that all required audio files have been generated.
+
+The Audio tree is walked once with os.scandir into a set of clip names
+(relative path without extension - the app accepts .wav or .mp3). Missing
+and orphaned clips are then plain set differences against the expected
+assets of every voice: the app's Lisa/ voice, any other voice folder, and
+categories generated directly under Audio/. What each voice must hold comes
+from the compiled asset manifest (asset_manifest.py).
+
+Present files must also pass validate_audio.py's header checks - a 4 KB
+read per file, cheaper than any cache lookup that hashes it.
 """
 
-import json
+import os
 from pathlib import Path
 
+from asset_manifest import SENTENCES_FILE, load_manifest
+from audio_io import AUDIO_EXTENSIONS, CATEGORIES, DERIVED_DIRS
+from validate_audio import validate_audio_file
+
 OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+NOT_ORPHANS = DERIVED_DIRS | {"answers"}  # Built from other clips by later stages
+
+def scan_audio_tree(audio_dir):
+    """
+    One os.scandir walk. Returns {clip name: relative path of the file the
+    app would play} - .wav wins over .mp3, as in AudioPlaybackService.
+    """
+    index = {}
+    stack = [""]
+    while stack:
+        relative_dir = stack.pop()
+        with os.scandir(os.path.join(audio_dir, relative_dir)) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                relative = f"{relative_dir}/{entry.name}" if relative_dir else entry.name
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(relative)
+                    continue
+                stem, extension = os.path.splitext(relative)
+                if extension in AUDIO_EXTENSIONS and (stem not in index or extension == ".wav"):
+                    index[stem] = relative
+    return index
+
+def voices_in(index):
+    """Voice prefixes present in the index: "" for categories directly under Audio/, else the folder name"""
+    voices = set()
+    for name in index:
+        parts = name.split('/')
+        if parts[0] in CATEGORIES:
+            voices.add("")
+        elif len(parts) > 2 and parts[1] in CATEGORIES:
+            voices.add(parts[0])
+    return voices
 
 def check_completeness():
     audio_dir = Path(OUTPUT_DIR)
@@ -21,133 +69,82 @@ def check_completeness():
     print("=" * 60)
     print()
 
-    # Load word bank
-    if not Path('word_bank.json').exists():
+    try:
+        manifest = load_manifest()
+    except FileNotFoundError:
         print("❌ word_bank.json not found!")
         return False
 
-    with open('word_bank.json', 'r') as f:
-        word_bank = json.load(f)
+    if not manifest.has_sentences:
+        print(f"⚠️  {SENTENCES_FILE} not found - sentence clips not checked")
+        print()
 
-    word_bank = {int(k): v for k, v in word_bank.items()}
+    index = scan_audio_tree(audio_dir)
+    # Manifest voices are required even if their folder is missing
+    voices = sorted(voices_in(index) | set(manifest.voices))
 
     missing = []
     found = []
+    expected_names = set()
+    for voice in voices:
+        prefix = f"{voice}/" if voice else ""
+        print(f"🎙️  Voice: {voice or '(Audio root)'}")
+        for category in CATEGORIES:
+            if not manifest.keys(category):
+                continue
+            names = {prefix + name for name in manifest.names(category)}
+            expected_names |= names
+            category_missing = names - index.keys()
+            missing.extend(sorted(category_missing))
+            found.extend(index[name] for name in sorted(names & index.keys()))
+            status = "✅" if not category_missing else "❌"
+            print(f"   {status} {category:<13} {len(names) - len(category_missing):4d}/{len(names)}")
+        print()
 
-    # Check words
-    print("🔤 Checking word pronunciations...")
-    for difficulty, words in word_bank.items():
-        for word in words:
-            word_file = audio_dir / f"words/difficulty_{difficulty}/{word}.wav"
-            if not word_file.exists():
-                missing.append(f"words/difficulty_{difficulty}/{word}.wav")
-            else:
-                found.append(word_file)
-
-    total_words = sum(len(words) for words in word_bank.values())
-    found_words = total_words - len([m for m in missing if m.startswith('words/')])
-    print(f"   Found: {found_words}/{total_words}")
-    if found_words < total_words:
-        print(f"   ❌ Missing {total_words - found_words} word files")
-    else:
-        print(f"   ✅ All word files present")
-    print()
-
-    # Check spelling
-    print("📝 Checking letter-by-letter spelling...")
-    for difficulty, words in word_bank.items():
-        for word in words:
-            spelled_file = audio_dir / f"spelling/difficulty_{difficulty}/{word}_spelled.wav"
-            if not spelled_file.exists():
-                missing.append(f"spelling/difficulty_{difficulty}/{word}_spelled.wav")
-            else:
-                found.append(spelled_file)
-
-    found_spelled = total_words - len([m for m in missing if m.startswith('spelling/')])
-    print(f"   Found: {found_spelled}/{total_words}")
-    if found_spelled < total_words:
-        print(f"   ❌ Missing {total_words - found_spelled} spelling files")
-    else:
-        print(f"   ✅ All spelling files present")
-    print()
-
-    # Check letters
-    print("🔡 Checking individual letters...")
-    letter_count = 0
-    for letter in "abcdefghijklmnopqrstuvwxyz":
-        letter_file = audio_dir / f"letters/{letter}.wav"
-        if not letter_file.exists():
-            missing.append(f"letters/{letter}.wav")
-        else:
-            found.append(letter_file)
-            letter_count += 1
-
-    print(f"   Found: {letter_count}/26")
-    if letter_count < 26:
-        print(f"   ❌ Missing {26 - letter_count} letter files")
-    else:
-        print(f"   ✅ All letter files present")
-    print()
-
-    # Check feedback
-    print("💬 Checking feedback messages...")
-    feedback_files = {
-        'success': ['great_job', 'excellent', 'you_got_it', 'perfect', 'amazing', 'wonderful'],
-        'encouragement': ['nice_try', 'almost_there', 'keep_trying', 'dont_give_up'],
-        'system': ['correct_spelling_is', 'level_complete']
-    }
-
-    feedback_count = 0
-    total_feedback = sum(len(files) for files in feedback_files.values())
-
-    for category, files in feedback_files.items():
-        for filename in files:
-            feedback_file = audio_dir / f"feedback/{category}/{filename}.wav"
-            if not feedback_file.exists():
-                missing.append(f"feedback/{category}/{filename}.wav")
-            else:
-                found.append(feedback_file)
-                feedback_count += 1
-
-    print(f"   Found: {feedback_count}/{total_feedback}")
-    if feedback_count < total_feedback:
-        print(f"   ❌ Missing {total_feedback - feedback_count} feedback files")
-    else:
-        print(f"   ✅ All feedback files present")
-    print()
-
-    # Check instructions
-    print("📢 Checking instruction prompts...")
-    instruction_files = ['listen_carefully', 'spell_out_loud', 'say_each_letter', 'tap_to_speak', 'type_spelling']
-    instruction_count = 0
-
-    for filename in instruction_files:
-        instruction_file = audio_dir / f"instructions/{filename}.wav"
-        if not instruction_file.exists():
-            missing.append(f"instructions/{filename}.wav")
-        else:
-            found.append(instruction_file)
-            instruction_count += 1
-
-    print(f"   Found: {instruction_count}/{len(instruction_files)}")
-    if instruction_count < len(instruction_files):
-        print(f"   ❌ Missing {len(instruction_files) - instruction_count} instruction files")
+    orphaned = sorted(name for name in index.keys() - expected_names
+                      if not NOT_ORPHANS & set(name.split('/')))
+
+    # Present files must also be valid (the header checks of validate_audio.py)
+    print("🔍 Validating present files...")
+    invalid = []
+    for relative in found:
+        _, _, issues, _ = validate_audio_file(str(audio_dir / relative))
+        if issues:
+            invalid.append((relative, issues))
+    if invalid:
+        print(f"   ❌ {len(invalid)} files fail validation")
     else:
-        print(f"   ✅ All instruction files present")
+        print(f"   ✅ All present files valid")
     print()
 
     # Summary
-    expected_total = (total_words * 2) + 26 + total_feedback + len(instruction_files)
-    found_total = len(found)
-
     print("=" * 60)
     print("📊 Completeness Summary")
     print("=" * 60)
-    print(f"   Expected files: {expected_total}")
-    print(f"   Found files: {found_total}")
+    print(f"   Voices: {', '.join(voice or '(Audio root)' for voice in voices)}")
+    print(f"   Expected files: {len(expected_names)}")
+    print(f"   Found files: {len(found)}")
     print(f"   Missing files: {len(missing)}")
+    print(f"   Invalid files: {len(invalid)}")
+    print(f"   Orphaned files: {len(orphaned)}")
     print()
 
+    if invalid:
+        print("❌ Invalid files:")
+        for f, issues in invalid[:20]:
+            print(f"   - {f}: {'; '.join(issues)}")
+        if len(invalid) > 20:
+            print(f"   ... and {len(invalid) - 20} more")
+        print()
+
+    if orphaned:
+        print("🧹 Orphaned files (no longer expected by any voice):")
+        for name in orphaned[:20]:
+            print(f"   - {index[name]}")
+        if len(orphaned) > 20:
+            print(f"   ... and {len(orphaned) - 20} more")
+        print()
+
     if missing:
         print("❌ Missing files:")
         for f in missing[:20]:  # Show first 20
@@ -158,6 +155,10 @@ def check_completeness():
         print(f"💡 To regenerate missing files, run: python generate_audio.py")
         print()
         return False
+    elif invalid:
+        print(f"💡 To regenerate invalid files, delete them and run: python generate_audio.py")
+        print()
+        return False
     else:
         print("✅ All required audio files are present!")
         print()
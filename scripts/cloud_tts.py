@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Asyncio engine for cloud TTS services.
+
+Runs a configurable number of synthesis requests in flight over one pooled
+keep-alive HTTP session, throttled by token buckets matched to the vendor's
+requests-per-second and characters-per-minute quotas. The per-service
+request coroutine is passed in, so the engine can be pointed at a local stub
+server for testing.
+
+Transient failures (429, 5xx, timeouts) are retried with jittered
+exponential backoff that honors Retry-After, 429s also lower the request
+rate until the vendor recovers, and a circuit breaker pauses every worker
+when failures pile up so a degraded vendor doesn't burn the retry budget.
+"""
+
+import asyncio
+import email.utils
+import random
+import time
+
+try:
+    import aiohttp
+    HAS_AIOHTTP = True
+except ImportError:
+    HAS_AIOHTTP = False
+
+from job_journal import atomic_output
+
+
+class SynthesisError(Exception):
+    """A synthesis request that the service rejected"""
+
+    def __init__(self, message, status=None, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+# HTTP statuses worth retrying - everything else is a permanent failure
+RETRYABLE_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def is_retryable(error):
+    if isinstance(error, SynthesisError):
+        return error.status in RETRYABLE_STATUSES
+    if isinstance(error, asyncio.TimeoutError):
+        return True
+    return HAS_AIOHTTP and isinstance(error, aiohttp.ClientError)
+
+
+def retry_after_seconds(error):
+    """Seconds the server asked us to wait (Retry-After as delta-seconds or HTTP date), or None"""
+    headers = getattr(error, "headers", None) or {}
+    value = next((v for k, v in headers.items() if k.lower() == "retry-after"), None)
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, email.utils.parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RetryPolicy:
+    def __init__(self, max_attempts=6, base_delay=1.0, max_delay=60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delay(self, attempt, error):
+        """Backoff before retry number `attempt` (0-based): Retry-After if given, else full jitter"""
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive transient failures. While open,
+    every worker waits; after `cooldown_seconds` a single probe request is let
+    through (half-open) and its outcome closes or re-opens the circuit.
+    """
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold=5, cooldown_seconds=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.condition = asyncio.Condition()
+
+    async def acquire(self):
+        """Wait until a request may be sent"""
+        async with self.condition:
+            while True:
+                now = time.monotonic()
+                if self.state == self.OPEN and now >= self.opened_at + self.cooldown_seconds:
+                    self.state = self.HALF_OPEN
+                    self.probing = False
+                if self.state == self.CLOSED:
+                    return
+                if self.state == self.HALF_OPEN and not self.probing:
+                    self.probing = True
+                    return
+
+                timeout = self.opened_at + self.cooldown_seconds - now if self.state == self.OPEN else None
+                try:
+                    await asyncio.wait_for(self.condition.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def record_success(self):
+        async with self.condition:
+            if self.state != self.CLOSED:
+                print("   🟢 Circuit closed: vendor recovered, resuming")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.probing = False
+            self.condition.notify_all()
+
+    async def record_failure(self):
+        async with self.condition:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                print(f"   ⚡ Circuit open: pausing all requests for {self.cooldown_seconds:.0f}s")
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.probing = False
+            self.condition.notify_all()
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        """rate: tokens added per second; capacity: maximum burst"""
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, tokens=1):
+        """Wait until `tokens` are available and take them"""
+        tokens = min(tokens, self.capacity)  # A single oversized request only has to wait for a full bucket
+        async with self.lock:  # First come, first served
+            self._refill()
+            while self.tokens < tokens:
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= tokens
+
+
+class RateLimiter:
+    def __init__(self, requests_per_second, characters_per_minute):
+        self.max_requests_per_second = requests_per_second
+        self.requests = TokenBucket(requests_per_second, max(1.0, requests_per_second))
+        self.characters = TokenBucket(characters_per_minute / 60.0, characters_per_minute)
+
+    async def acquire(self, text):
+        await self.requests.acquire(1)
+        await self.characters.acquire(len(text))
+
+    def throttle(self):
+        """Halve the request rate after the vendor says we're going too fast"""
+        self.requests.rate = max(self.max_requests_per_second / 16, self.requests.rate / 2)
+
+    def recover(self):
+        """Creep back toward the configured rate after each success"""
+        self.requests.rate = min(self.max_requests_per_second,
+                                 self.requests.rate + self.max_requests_per_second / 20)
+
+
+class CloudTTSEngine:
+    def __init__(self, synthesize, concurrency=4, requests_per_second=2.0, characters_per_minute=20000,
+                 timeout_seconds=60, retry=None, breaker=None):
+        """
+        synthesize: async (session, text) -> audio bytes; raises SynthesisError on failure.
+        """
+        if not HAS_AIOHTTP:
+            raise RuntimeError("aiohttp not installed. Please install: pip install aiohttp")
+
+        self.synthesize = synthesize
+        self.concurrency = concurrency
+        self.limiter = RateLimiter(requests_per_second, characters_per_minute)
+        self.timeout = aiohttp.ClientTimeout(total=timeout_seconds)
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = 0
+
+    async def _synthesize_with_retry(self, session, text):
+        attempt = 0
+        while True:
+            await self.breaker.acquire()
+            await self.limiter.acquire(text)
+            try:
+                audio = await self.synthesize(session, text)
+            except Exception as e:
+                if not is_retryable(e):
+                    # The vendor answered; this request is just bad
+                    await self.breaker.record_success()
+                    raise
+                await self.breaker.record_failure()
+                if isinstance(e, SynthesisError) and e.status == 429:
+                    self.limiter.throttle()
+                attempt += 1
+                if attempt >= self.retry.max_attempts:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(self.retry.delay(attempt - 1, e))
+                continue
+
+            await self.breaker.record_success()
+            self.limiter.recover()
+            return audio
+
+    async def _worker(self, session, queue, on_done):
+        while True:
+            job = await queue.get()
+            text, output_path = job[0], job[1]
+            try:
+                audio = await self._synthesize_with_retry(session, text)
+                with atomic_output(output_path) as temp_path, open(temp_path, "wb") as f:
+                    f.write(audio)
+                on_done(job, None)
+            except Exception as e:
+                on_done(job, e)
+            finally:
+                queue.task_done()
+
+    async def run(self, jobs, on_done):
+        """
+        Synthesize every job. Each job is a tuple starting with (text, output_path);
+        on_done(job, error) is called as each one finishes, with error None on success.
+        """
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait(job)
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=60)
+        async with aiohttp.ClientSession(connector=connector, timeout=self.timeout) as session:
+            workers = [
+                asyncio.create_task(self._worker(session, queue, on_done))
+                for _ in range(self.concurrency)
+            ]
+            await queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
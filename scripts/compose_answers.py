@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Pre-render "The correct spelling is ... C, A, T" as one clip per word.
+
+After a miss the app plays feedback/system/correct_spelling_is and then the
+word's spelling clip - two file opens and an audible gap between them. This
+stage joins the two ahead of time: the silence at the junction is trimmed,
+a short pause is inserted and the edges meet in an equal-power (cos/sin)
+crossfade, so the level never dips. Output mirrors the spelling tree:
+
+    Audio/<voice>/answers/difficulty_N/<word>_answer.wav
+
+A clip is only re-rendered when the hash of either input (or the join
+settings) changed since the last run, and rendering runs across a process pool.
+
+Usage:
+    python compose_answers.py [--gap 0.15] [--crossfade 0.03] [--force] [--workers N]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from asset_manifest import load_manifest
+from audio_io import read_audio, resolve_clip, voice_roots, write_wav
+from job_journal import atomic_output
+from resample_audio import resample
+from trim_silence import speech_bounds
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+REPORT_FILE = "answer_clips.json"
+PROMPT = "feedback/system/correct_spelling_is"
+PAUSE_SECONDS = 0.15  # Between "is" and the first letter
+CROSSFADE_SECONDS = 0.03
+
+
+def file_hash(path):
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def equal_power_crossfade(first, second, overlap):
+    """first then second, overlapping by `overlap` samples with cos/sin gains (constant total power)"""
+    overlap = min(overlap, len(first), len(second))
+    if not overlap:
+        return np.concatenate([first, second])
+    theta = np.linspace(0.0, np.pi / 2, overlap, dtype=np.float32)
+    blend = first[-overlap:] * np.cos(theta) + second[:overlap] * np.sin(theta)
+    return np.concatenate([first[:-overlap], blend, second[overlap:]])
+
+
+@lru_cache(maxsize=4)
+def load_prompt(path, content_hash):
+    """Decode and tail-trim the prompt once per worker (the hash keys out stale copies)"""
+    samples, sample_rate, _ = read_audio(path)
+    bounds = speech_bounds(samples, sample_rate)
+    if bounds is None:
+        raise ValueError(f"{path} is silent")
+    return samples[:bounds[1]], sample_rate
+
+
+def compose_answer(prompt, spelled, sample_rate, spelled_rate, gap_seconds, crossfade_seconds):
+    """The joined clip as float samples at sample_rate"""
+    if spelled_rate != sample_rate:
+        spelled = resample(spelled, spelled_rate, sample_rate)
+    bounds = speech_bounds(spelled, sample_rate)
+    if bounds is None:
+        raise ValueError("spelling clip is silent")
+    # Leading zeros make the pause; the crossfade then lands in it unless gap < crossfade
+    answer = np.concatenate([np.zeros(int(gap_seconds * sample_rate), np.float32), spelled[bounds[0]:]])
+    return equal_power_crossfade(prompt, answer, int(crossfade_seconds * sample_rate))
+
+
+def compose_file(job):
+    """Worker: render one answer clip if its inputs changed. Returns (output path, inputs key, status)."""
+    prompt_path, prompt_hash, spelled_path, output_path, previous_key, gap, crossfade, force = job
+    try:
+        key = hashlib.sha256(
+            f"{prompt_hash}|{file_hash(spelled_path)}|{gap}|{crossfade}".encode("utf-8")).hexdigest()
+        if not force and key == previous_key and os.path.exists(output_path):
+            return output_path, key, "skipped"
+
+        prompt, sample_rate = load_prompt(prompt_path, prompt_hash)
+        spelled, spelled_rate, _ = read_audio(spelled_path)
+        samples = compose_answer(prompt, spelled, sample_rate, spelled_rate, gap, crossfade)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with atomic_output(output_path) as temp_path:
+            write_wav(temp_path, samples, sample_rate)
+        return output_path, key, "composed"
+    except Exception as e:
+        print(f"   ❌ {spelled_path}: {e}")
+        return output_path, None, "failed"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pre-render 'correct spelling is' + spelling clips")
+    parser.add_argument("--gap", type=float, default=PAUSE_SECONDS, help="pause before the spelling in seconds")
+    parser.add_argument("--crossfade", type=float, default=CROSSFADE_SECONDS, help="crossfade length in seconds")
+    parser.add_argument("--force", action="store_true", help="re-render clips whose inputs are unchanged")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    print("=" * 60)
+    print("🧷 Answer Clip Composition")
+    print("=" * 60)
+    print()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        return
+    try:
+        spelled_names = sorted(load_manifest().names("spelling"))
+    except FileNotFoundError:
+        print("❌ word_bank.json not found!")
+        print("   Please run: python export_word_bank.py")
+        return
+
+    report = {}
+    if os.path.exists(REPORT_FILE):
+        with open(REPORT_FILE, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+
+    jobs = []
+    missing = 0
+    for voice, root in voice_roots(args.dir).items():
+        prompt_path = resolve_clip(os.path.join(root, PROMPT))
+        if prompt_path is None:
+            print(f"   ⚠️  {voice}: no {PROMPT} clip - skipping this voice")
+            continue
+        prompt_hash = file_hash(prompt_path)
+        for name in spelled_names:
+            spelled_path = resolve_clip(os.path.join(root, name))
+            if spelled_path is None:
+                missing += 1
+                continue
+            # spelling/difficulty_N/<word>_spelled → answers/difficulty_N/<word>_answer.wav
+            answer_name = "answers" + name[len("spelling"):-len("_spelled")] + "_answer.wav"
+            output_path = os.path.join(root, answer_name)
+            previous_key = report.get(os.path.relpath(output_path, args.dir))
+            jobs.append((prompt_path, prompt_hash, spelled_path, output_path, previous_key,
+                         args.gap, args.crossfade, args.force))
+
+    print(f"   {len(jobs)} answer clips, {args.workers} workers")
+    if missing:
+        print(f"   ⚠️  {missing} words have no spelling clip yet")
+    print()
+
+    counts = {"composed": 0, "skipped": 0, "failed": 0}
+    with multiprocessing.Pool(args.workers) as pool:
+        for processed, (output_path, key, status) in enumerate(pool.imap_unordered(compose_file, jobs, chunksize=8), 1):
+            counts[status] += 1
+            if key is not None:
+                report[os.path.relpath(output_path, args.dir)] = key
+            print(f"      [{processed:4d}/{len(jobs)}]", end='\r')
+    print()
+
+    temp_path = f"{REPORT_FILE}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(temp_path, REPORT_FILE)
+
+    print("=" * 60)
+    print("📊 Summary:")
+    print(f"   Composed: {counts['composed']}")
+    print(f"   Up to date: {counts['skipped']}")
+    print(f"   Failed: {counts['failed']}")
+    print(f"   ⏱️  {time.time() - start_time:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Batched multi-utterance inference for Coqui TTS.
+
+tts.tts_to_file pays the full forward-pass and vocoder setup for every text,
+even one-letter clips like "A". This module runs the acoustic model per text
+(Tacotron2's decoder stops on a per-utterance stop token, so it only supports
+batch size 1) and then vocodes whole length buckets of mel spectrograms in a
+single padded batch, splitting the waveforms back out per text.
+"""
+
+import numpy as np
+
+# Texts longer than this are not worth batching - use the regular path
+MAX_BATCH_TEXT_LEN = 32
+# Upper bounds (in characters) of the length buckets texts are grouped by
+LENGTH_BUCKETS = [2, 8, 16, 32]
+
+
+def bucket_by_length(items, batch_size, text_of=lambda item: item):
+    """
+    Group items into batches of similar text length.
+    Returns a list of batches; items longer than MAX_BATCH_TEXT_LEN are left out.
+    """
+    buckets = {limit: [] for limit in LENGTH_BUCKETS}
+    for item in items:
+        length = len(text_of(item))
+        for limit in LENGTH_BUCKETS:
+            if length <= limit:
+                buckets[limit].append(item)
+                break
+
+    batches = []
+    for limit in LENGTH_BUCKETS:
+        bucket = sorted(buckets[limit], key=lambda item: len(text_of(item)))
+        for start in range(0, len(bucket), batch_size):
+            batches.append(bucket[start:start + batch_size])
+    return batches
+
+
+def _vocoder_input(synthesizer, text):
+    """Run the acoustic model for one text and return the vocoder-normalized mel [C, T]"""
+    from TTS.tts.utils.synthesis import synthesis
+
+    outputs = synthesis(
+        model=synthesizer.tts_model,
+        text=text,
+        CONFIG=synthesizer.tts_config,
+        use_cuda=synthesizer.use_cuda,
+        use_griffin_lim=False,
+    )
+    mel = outputs["outputs"]["model_outputs"][0].detach().cpu().numpy()
+    mel = synthesizer.tts_model.ap.denormalize(mel.T).T
+    return synthesizer.vocoder_ap.normalize(mel.T)
+
+
+def synthesize_batch(synthesizer, texts):
+    """
+    Synthesize a batch of short texts with one vocoder pass.
+    Returns float waveforms in the same order as texts.
+    """
+    # Imported here so callers that only bucket texts don't pay for torch
+    import torch
+    from TTS.tts.utils.synthesis import trim_silence
+
+    if synthesizer.vocoder_model is None or (
+        synthesizer.vocoder_config["audio"]["sample_rate"] != synthesizer.tts_model.ap.sample_rate
+    ):
+        # No separate vocoder to batch (or it needs per-clip mel interpolation)
+        return [np.asarray(synthesizer.tts(text), dtype=np.float32) for text in texts]
+
+    mels = [_vocoder_input(synthesizer, text) for text in texts]
+    frames = [mel.shape[1] for mel in mels]
+    max_frames = max(frames)
+
+    # Pad every mel to the longest one with the quietest value in the batch
+    pad_value = min(float(mel.min()) for mel in mels)
+    batch = np.full((len(mels), mels[0].shape[0], max_frames), pad_value, dtype=np.float32)
+    for i, mel in enumerate(mels):
+        batch[i, :, :mel.shape[1]] = mel
+
+    device = "cuda" if synthesizer.use_cuda else "cpu"
+    with torch.no_grad():
+        waveforms = synthesizer.vocoder_model.inference(torch.from_numpy(batch).to(device))
+    waveforms = waveforms.detach().cpu().numpy().reshape(len(mels), -1)
+
+    hop_length = waveforms.shape[1] // max_frames
+    do_trim = synthesizer.tts_config.audio.get("do_trim_silence", False)
+
+    results = []
+    for waveform, n_frames in zip(waveforms, frames):
+        wav = waveform[:n_frames * hop_length]
+        if do_trim:
+            wav = trim_silence(wav, synthesizer.tts_model.ap)
+        results.append(wav.astype(np.float32))
+    return results
+
+
+def batch_to_files(synthesizer, texts, file_paths):
+    """Synthesize texts in one batch and save each waveform to its file path"""
+    for waveform, file_path in zip(synthesize_batch(synthesizer, texts), file_paths):
+        synthesizer.save_wav(waveform, str(file_path))
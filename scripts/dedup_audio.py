@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Find identical and near-identical clips across the Audio tree.
+
+The same word is rendered under several words/difficulty_N/ and
+spelling/difficulty_N/ folders, and a silent placeholder .wav can survive
+next to the real .mp3 (the app plays the .wav first). Every clip gets an
+acoustic fingerprint: a vectorized STFT, the local spectral peaks, and
+hashes of peak pairs (frequency, frequency, time gap) - landmarks that
+survive re-encoding, resampling and small level changes. An inverted index
+(hash → clips) finds the candidates for each clip, which are grouped when
+enough of their hashes match and their durations agree. Silent clips are
+never grouped - every silent placeholder of a given length is byte-identical
+whatever it stands in for - they are listed for regeneration instead.
+
+Each group keeps one canonical file. Duplicates are reported (default);
+with --mode link the byte-identical ones are hardlinked to the canonical
+file, which keeps every path the app loads in place. Similar clips are only
+ever reported - a short clip has few landmarks, and letters like b/d/e/p/t/v
+share most of theirs. Nothing in the app resolves references, so duplicates
+are never deleted; dedup_references.json (next to the other reports, outside
+the bundle) accumulates the identical duplicate → canonical mapping across
+runs. Links only save space in the working tree: Xcode copies bundle
+resources and the .ipa doesn't keep hardlinks, so the shipped app is no
+smaller.
+
+Usage:
+    python dedup_audio.py [--mode report|link] [--threshold 0.5] [--workers N]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from collections import Counter, defaultdict
+
+import numpy as np
+
+try:
+    from scipy.ndimage import maximum_filter
+except ImportError:
+    print("❌ scipy not found!")
+    print("   Please install: pip install scipy")
+    exit(1)
+
+from audio_io import HAS_PYDUB, category_of, iter_audio_files, read_audio, sniff_format
+from resample_audio import resample
+from trim_silence import speech_bounds
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+REFERENCES_FILE = "dedup_references.json"  # Outside the audio root, so it never ships in the bundle
+ANALYSIS_RATE = 8000  # Speech landmarks live well below 4 kHz
+FFT_SIZE = 512
+HOP = 128  # 16 ms
+PEAK_NEIGHBORHOOD = (5, 7)  # (frames, bins) a peak must dominate
+PEAK_FLOOR_DB = -40.0  # Peaks quieter than this below the clip's loudest bin are ignored
+FAN_OUT = 5  # Each peak is paired with the next FAN_OUT peaks
+MAX_PAIR_FRAMES = 63  # Largest time gap in a pair (fits in 6 bits)
+SIMILARITY = 0.5  # Share of the smaller fingerprint that must match
+DURATION_TOLERANCE = 0.1  # Grouped clips differ in length by at most 10%
+MAX_POSTINGS = 200  # Hashes shared by more clips than this carry no information
+
+
+def spectrogram(samples):
+    """Magnitude STFT (frames × bins) of the whole clip in one vectorized pass"""
+    if len(samples) < FFT_SIZE:
+        samples = np.pad(samples, (0, FFT_SIZE - len(samples)))
+    frames = np.lib.stride_tricks.sliding_window_view(samples, FFT_SIZE)[::HOP]
+    return np.abs(np.fft.rfft(frames * np.hanning(FFT_SIZE).astype(np.float32), axis=1))
+
+
+def landmark_hashes(samples, sample_rate):
+    """Sorted unique 24-bit peak-pair hashes of a clip"""
+    if sample_rate != ANALYSIS_RATE:
+        samples = resample(samples, sample_rate, ANALYSIS_RATE)
+    spectrum = spectrogram(samples)
+    floor = spectrum.max() * 10 ** (PEAK_FLOOR_DB / 20)
+    peaks = (spectrum == maximum_filter(spectrum, size=PEAK_NEIGHBORHOOD)) & (spectrum > floor)
+    times, bins = np.nonzero(peaks)  # Row-major, so already ordered by time
+
+    hashes = []
+    for k in range(1, FAN_OUT + 1):
+        gap = times[k:] - times[:-k]
+        valid = (gap > 0) & (gap <= MAX_PAIR_FRAMES)
+        hashes.append((bins[:-k][valid] << 15) | (bins[k:][valid] << 6) | gap[valid])
+    return np.unique(np.concatenate(hashes)) if hashes else np.array([], dtype=np.int64)
+
+
+def fingerprint_file(path):
+    """Worker: (path, size, content hash, duration, silent, landmark hashes) or None on failure"""
+    try:
+        with open(path, 'rb') as f:
+            content_hash = hashlib.sha256(f.read()).hexdigest()
+        samples, sample_rate, _ = read_audio(path)
+        silent = speech_bounds(samples, sample_rate) is None
+        hashes = np.array([], dtype=np.int64) if silent else landmark_hashes(samples, sample_rate)
+        return path, os.path.getsize(path), content_hash, len(samples) / sample_rate, silent, hashes
+    except Exception as e:
+        print(f"   ❌ {path}: {e}")
+        return None
+
+
+def find_groups(clips, threshold=SIMILARITY):
+    """
+    Union audible clips that are byte-identical, or whose landmark sets
+    overlap by at least threshold (of the smaller set) with durations that
+    agree. Silent clips are never grouped. Returns lists of clip indices,
+    each with two or more members.
+    """
+    parent = list(range(len(clips)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    by_content = defaultdict(list)
+    for i, clip in enumerate(clips):
+        if not clip["silent"]:
+            by_content[clip["hash"]].append(i)
+    for members in by_content.values():
+        for i in members[1:]:
+            parent[find(i)] = find(members[0])
+
+    index = defaultdict(list)
+    for i, clip in enumerate(clips):
+        for h in clip["landmarks"].tolist():
+            index[h].append(i)
+
+    for i, clip in enumerate(clips):
+        shared = Counter()
+        for h in clip["landmarks"].tolist():
+            postings = index[h]
+            if len(postings) <= MAX_POSTINGS:
+                shared.update(postings)
+        for j, count in shared.items():
+            if j <= i:
+                continue
+            other = clips[j]
+            smaller = min(len(clip["landmarks"]), len(other["landmarks"]))
+            longer = max(clip["duration"], other["duration"])
+            if (count >= threshold * smaller
+                    and abs(clip["duration"] - other["duration"]) <= DURATION_TOLERANCE * longer):
+                parent[find(j)] = find(i)
+
+    groups = defaultdict(list)
+    for i in range(len(clips)):
+        groups[find(i)].append(i)
+    return [members for members in groups.values() if len(members) > 1]
+
+
+def canonical_of(clips, members):
+    """Prefer audible clips in their declared format, then the shallowest, alphabetically first path"""
+    def rank(i):
+        clip = clips[i]
+        declared = os.path.splitext(clip["path"])[1].lower()[1:]
+        return (clip["silent"], clip["format"] != declared, clip["path"].count(os.sep), clip["path"])
+    return min(members, key=rank)
+
+
+def shadowing_placeholders(clips):
+    """Silent .wav files whose real .mp3 sibling is audible - the app would play the silence"""
+    by_path = {clip["path"]: clip for clip in clips}
+    shadowing = []
+    for clip in clips:
+        stem, extension = os.path.splitext(clip["path"])
+        sibling = by_path.get(stem + ".mp3")
+        if extension == ".wav" and clip["silent"] and sibling is not None and not sibling["silent"]:
+            shadowing.append(clip)
+    return shadowing
+
+
+def replace_with_link(duplicate, canonical):
+    if os.path.samefile(duplicate, canonical):
+        return  # Linked by an earlier run (renaming over the same inode would leave the temp link behind)
+    temp_path = f"{duplicate}.link.tmp"
+    os.link(canonical, temp_path)
+    os.replace(temp_path, duplicate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Find and collapse duplicate audio clips")
+    parser.add_argument("--mode", choices=["report", "link"], default="report",
+                        help="report only (default) or hardlink duplicates to the canonical file")
+    parser.add_argument("--threshold", type=float, default=SIMILARITY,
+                        help=f"fraction of landmarks that must match (default: {SIMILARITY})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    print("=" * 60)
+    print("🧬 Acoustic Fingerprint Deduplication")
+    print("=" * 60)
+    print()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        return
+
+    paths = list(iter_audio_files(args.dir))
+    formats = {path: sniff_format(path) for path in paths}
+    if not HAS_PYDUB:
+        mp3_count = sum(fmt == "mp3" for fmt in formats.values())
+        paths = [path for path in paths if formats[path] != "mp3"]
+        if mp3_count:
+            print(f"⚠️  Skipping {mp3_count} MP3 clips - install pydub (and ffmpeg) to fingerprint them")
+
+    clips = []
+    with multiprocessing.Pool(args.workers) as pool:
+        for processed, result in enumerate(pool.imap_unordered(fingerprint_file, paths, chunksize=8), 1):
+            if result is not None:
+                path, size, content_hash, duration, silent, landmarks = result
+                clips.append({"path": path, "size": size, "hash": content_hash, "duration": duration,
+                              "silent": silent, "landmarks": landmarks, "format": formats[path]})
+            print(f"      [{processed:4d}/{len(paths)}]", end='\r')
+    print()
+    clips.sort(key=lambda clip: clip["path"])
+    fingerprint_time = time.time() - start_time
+    fingerprinted = len(clips)
+
+    references = {}
+    similar = 0
+    duplicated = defaultdict(int)
+
+    # Shadowing placeholders are reported for removal, not kept as anyone's canonical copy
+    shadowing = shadowing_placeholders(clips)
+    if shadowing:
+        print(f"🔇 {len(shadowing)} silent placeholders shadow real MP3 audio - delete or regenerate them")
+        for clip in shadowing:
+            print(f"      - {os.path.relpath(clip['path'], args.dir)}")
+        print()
+        shadowing_paths = {clip["path"] for clip in shadowing}
+        clips = [clip for clip in clips if clip["path"] not in shadowing_paths]
+
+    # Identical silence says nothing about what a clip should contain - regenerate, don't collapse
+    silent = [clip for clip in clips if clip["silent"]]
+    if silent:
+        print(f"🔕 {len(silent)} silent clips (placeholders?) - regenerate them, not grouped")
+        for clip in silent[:20]:
+            print(f"      - {os.path.relpath(clip['path'], args.dir)}")
+        if len(silent) > 20:
+            print(f"      ... and {len(silent) - 20} more")
+        print()
+        clips = [clip for clip in clips if not clip["silent"]]
+
+    groups = find_groups(clips, args.threshold)
+    print(f"🔗 {len(groups)} groups of duplicates")
+    for members in sorted(groups, key=lambda members: clips[members[0]]["path"]):
+        canonical = clips[canonical_of(clips, members)]
+        print(f"   {os.path.relpath(canonical['path'], args.dir)}")
+        # Only byte-identical clips share a file: each content hash keeps its own canonical copy
+        by_content = defaultdict(list)
+        for i in members:
+            by_content[clips[i]["hash"]].append(i)
+        for i in members:
+            clip = clips[i]
+            target = clips[canonical_of(clips, by_content[clip["hash"]])]
+            if clip is canonical:
+                continue
+            if target is clip:
+                # Different content that merely sounds alike - never linked
+                print(f"      ≈ {os.path.relpath(clip['path'], args.dir)} (similar, {clip['size'] / 1024:.1f} KB)")
+                similar += 1
+                continue
+            note = "" if target is canonical else f" of {os.path.relpath(target['path'], args.dir)}"
+            print(f"      = {os.path.relpath(clip['path'], args.dir)} (identical{note}, {clip['size'] / 1024:.1f} KB)")
+            references[os.path.relpath(clip["path"], args.dir)] = os.path.relpath(target["path"], args.dir)
+            duplicated[category_of(clip["path"])] += clip["size"]
+            if args.mode == "link":
+                replace_with_link(clip["path"], target["path"])
+
+    if args.mode != "report" and references:
+        merged = {}
+        if os.path.exists(REFERENCES_FILE):
+            with open(REFERENCES_FILE, 'r', encoding='utf-8') as f:
+                merged = json.load(f)
+        # A clip that is canonical now is no longer anyone's duplicate
+        canonicals = set(references.values())
+        merged = {duplicate: canonical for duplicate, canonical in merged.items() if duplicate not in canonicals}
+        merged.update(references)
+        temp_path = f"{REFERENCES_FILE}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=2, sort_keys=True)
+        os.replace(temp_path, REFERENCES_FILE)
+
+    print()
+    print("=" * 60)
+    print("📊 Summary:")
+    print(f"   Fingerprinted: {fingerprinted} clips in {fingerprint_time:.1f}s")
+    print(f"   Identical duplicates: {len(references)}")
+    print(f"   Similar (report only): {similar}")
+    for category, size in sorted(duplicated.items()):
+        print(f"      {category:<14} {size / 1024:9.1f} KB")
+    verb = "Would free" if args.mode == "report" else "Freed"
+    print(f"   {verb} on disk: {sum(duplicated.values()) / 1024 / 1024:.2f} MB")
+    print("   ℹ️  The shipped app is no smaller: Xcode copies bundle resources and the .ipa doesn't keep hardlinks")
+    if args.mode != "report" and references:
+        print(f"   References: {REFERENCES_FILE}")
+    print(f"   ⏱️  {time.time() - start_time:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,122 +2,324 @@
 """
 Generate all audio files for SpellFlare using Coqui TTS.
 This script creates pre-generated audio files that will be bundled with the app.
+
+The clips to render - and the file each one goes to - come from the compiled
+expected-asset manifest (asset_manifest.py).
 """
 
-import os
-import json
+import argparse
+import multiprocessing
+from contextlib import ExitStack
 from pathlib import Path
 import time
 
-try:
-    from TTS.api import TTS
-except ImportError:
-    print("❌ TTS library not found!")
-    print("   Please install: pip install TTS")
-    exit(1)
+from asset_manifest import WORD_BANK_FILE, clip_path, load_manifest, spelled_word
+from tts_cache import SynthesisCache
+from coqui_batch import MAX_BATCH_TEXT_LEN, bucket_by_length, batch_to_files
+from tts_daemon import TTSClient
+from spelling_composer import SpellingComposer
+from job_journal import JOURNAL_FILE, JobJournal, atomic_output
+from sharding import in_shard, parse_shard, shard_path, write_receipt
+from audio_io import read_wav
+from ima_adpcm import LOW_SNR_DB, read_adpcm_wav, snr_db, write_adpcm_wav
 
 # Configuration
 OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
 MODEL = "tts_models/en/ljspeech/tacotron2-DDC"
 SAMPLE_RATE = 22050  # Default for the model
 
+def load_tts():
+    """Import Coqui TTS and load the model in this process"""
+    try:
+        from TTS.api import TTS
+    except ImportError:
+        print("❌ TTS library not found!")
+        print("   Please install: pip install TTS")
+        exit(1)
+    return TTS(model_name=MODEL, progress_bar=False)
+
 class AudioGenerator:
-    def __init__(self):
-        print("🔧 Initializing Coqui TTS...")
+    def __init__(self, verbose=True, batch_size=1, use_daemon=False, journal_path=JOURNAL_FILE, codec="pcm"):
+        if verbose:
+            print("🔧 Initializing Coqui TTS...")
         try:
-            self.tts = TTS(model_name=MODEL, progress_bar=False)
-            print(f"   Model: {MODEL}")
-            print(f"   Sample rate: {SAMPLE_RATE} Hz")
+            # The daemon keeps the model loaded across runs; otherwise load it here
+            self.tts = TTSClient.connect(MODEL) if use_daemon else load_tts()
+            if verbose:
+                if use_daemon:
+                    print(f"   Using TTS daemon at {self.tts.sock.getpeername()}")
+                print(f"   Model: {MODEL}")
+                print(f"   Sample rate: {SAMPLE_RATE} Hz")
         except Exception as e:
             print(f"❌ Failed to initialize TTS: {e}")
             raise
 
         self.output_dir = Path(OUTPUT_DIR)
+        self.cache = SynthesisCache()
+        self.journal = JobJournal(journal_path)  # Files finished by an interrupted earlier run
         self.generated_count = 0
-
-    def generate_word_audio(self, word, difficulty):
-        """Generate full word pronunciation"""
-        output_path = self.output_dir / f"words/difficulty_{difficulty}/{word}.wav"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        try:
-            self.tts.tts_to_file(
-                text=word,
-                file_path=str(output_path)
-            )
-            self.generated_count += 1
+        self.batch_size = batch_size
+        self.codec = codec
+        self.pending = None  # Queued (text, output_path, label) while batching
+        self.finished = []  # Results produced without synthesis while batching
+        self.composer = None
+        self.composer_unavailable = False
+
+    def _render(self, text, output_path, label):
+        """Render text to output_path, reusing a cached render when available"""
+        if self.pending is not None:
+            self.pending.append((text, output_path, label))
             return True
-        except Exception as e:
-            print(f"      ❌ Failed to generate {word}: {e}")
-            return False
-
-    def generate_spelled_audio(self, word, difficulty):
-        """Generate letter-by-letter spelling with pauses"""
-        # Add commas between letters for natural pauses
-        letters = ", ".join(word.upper())
-        output_path = self.output_dir / f"spelling/difficulty_{difficulty}/{word}_spelled.wav"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        try:
-            self.tts.tts_to_file(
-                text=letters,
-                file_path=str(output_path)
-            )
-            self.generated_count += 1
+        key = self.cache.key("coqui", MODEL, text, sample_rate=SAMPLE_RATE)
+        if self.journal.is_done(output_path, self._journal_key(key)):
             return True
-        except Exception as e:
-            print(f"      ❌ Failed to generate {word}_spelled: {e}")
-            return False
 
-    def generate_letter_audio(self, letter):
-        """Generate individual letter pronunciation"""
-        output_path = self.output_dir / f"letters/{letter.lower()}.wav"
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            self.tts.tts_to_file(
-                text=letter.upper(),
-                file_path=str(output_path)
+            self.cache.render(
+                "coqui", MODEL, text, output_path,
+                lambda path: self.tts.tts_to_file(text=text, file_path=path),
+                sample_rate=SAMPLE_RATE
             )
+            self._finish(output_path, key)
             self.generated_count += 1
             return True
         except Exception as e:
-            print(f"      ❌ Failed to generate letter {letter}: {e}")
+            print(f"      ❌ Failed to generate {label}: {e}")
             return False
 
-    def generate_feedback_audio(self, text, category, filename):
-        """Generate feedback message audio"""
-        output_path = self.output_dir / f"feedback/{category}/{filename}.wav"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        try:
-            self.tts.tts_to_file(
-                text=text,
-                file_path=str(output_path)
-            )
-            self.generated_count += 1
-            return True
-        except Exception as e:
-            print(f"      ❌ Failed to generate {filename}: {e}")
-            return False
+    def _finish(self, output_path, key):
+        """Apply the output codec to a freshly written PCM clip, then journal it"""
+        if self.codec == "adpcm":
+            samples, sample_rate = read_wav(output_path)
+            with atomic_output(output_path) as temp_path:
+                write_adpcm_wav(temp_path, samples, sample_rate)
+            snr = snr_db(samples, read_adpcm_wav(output_path)[0])
+            if snr < LOW_SNR_DB:
+                print(f"      ⚠️  {output_path.name}: ADPCM round trip SNR only {snr:.1f} dB")
+        self.journal.mark_done(output_path, self._journal_key(key))
+
+    def _journal_key(self, key):
+        """Journal entries also record the codec: a PCM file isn't done for an --codec adpcm run"""
+        return f"{key}:{self.codec}"
+
+    def begin_batch(self):
+        """Queue renders instead of synthesizing them one at a time"""
+        self.pending = []
+        self.finished = []
+
+    def flush_batch(self):
+        """
+        Render everything queued since begin_batch.
+        Short texts that miss the cache are vocoded together in length buckets.
+        Yields (label, success, cache_hit) per queued item.
+        """
+        pending, self.pending = self.pending, None
+        yield from self.finished
+        self.finished = []
+        misses = []
+        duplicates = []
+        queued = set()
+
+        for text, output_path, label in pending:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            key = self.cache.key("coqui", MODEL, text, sample_rate=SAMPLE_RATE)
+            if self.journal.is_done(output_path, self._journal_key(key)):
+                yield label, True, 0
+            elif key in queued:
+                # Same text already queued in this batch - copy it from the cache afterwards
+                duplicates.append((key, output_path, label))
+            elif self.cache.fetch(key, output_path):
+                self._finish(output_path, key)
+                self.generated_count += 1
+                yield label, True, 1
+            else:
+                queued.add(key)
+                misses.append((key, text, output_path, label))
+
+        short = [miss for miss in misses if len(miss[1]) <= MAX_BATCH_TEXT_LEN]
+        batches = bucket_by_length(short, self.batch_size, text_of=lambda miss: miss[1])
+        # Long texts (spelled-out words) gain nothing from batching
+        batches += [[miss] for miss in misses if len(miss[1]) > MAX_BATCH_TEXT_LEN]
+
+        for batch in batches:
+            try:
+                # Synthesize into temp files; all of them are renamed into place only if the batch succeeds
+                with ExitStack() as stack:
+                    texts = [text for _, text, _, _ in batch]
+                    paths = [stack.enter_context(atomic_output(output_path)) for _, _, output_path, _ in batch]
+                    if len(batch) == 1:
+                        self.tts.tts_to_file(text=texts[0], file_path=paths[0])
+                    elif isinstance(self.tts, TTSClient):
+                        self.tts.batch_to_files(texts, paths)
+                    else:
+                        batch_to_files(self.tts.synthesizer, texts, paths)
+            except Exception as e:
+                for _, _, _, label in batch:
+                    print(f"      ❌ Failed to generate {label}: {e}")
+                    yield label, False, 0
+                continue
+
+            for key, _, output_path, label in batch:
+                self.cache.store(key, output_path)
+                self._finish(output_path, key)
+                self.generated_count += 1
+                yield label, True, 0
+
+        for key, output_path, label in duplicates:
+            success = self.cache.fetch(key, output_path)
+            if success:
+                self._finish(output_path, key)
+            self.generated_count += success
+            yield label, success, int(success)
+
+    def generate_clip(self, text, relative, label):
+        """Generate a word, letter, feedback or instruction clip at relative (to OUTPUT_DIR)"""
+        return self._render(text, self.output_dir / relative, label)
+
+    def _load_composer(self, voice):
+        """Load a voice's letter clips once; None if they haven't all been generated yet"""
+        if self.composer is None and not self.composer_unavailable:
+            try:
+                self.composer = SpellingComposer(self.output_dir / voice / "letters")
+            except Exception as e:
+                print(f"      ⚠️  Letter clips unavailable ({e}), synthesizing spellings instead")
+                self.composer_unavailable = True
+        return self.composer
+
+    def generate_spelled_audio(self, text, relative, word):
+        """Generate letter-by-letter spelling with pauses"""
+        output_path = self.output_dir / relative
+        label = f"{word}_spelled"
+
+        composer = self._load_composer(Path(relative).parts[0])
+        if composer is None:
+            # The manifest text has commas between letters for natural pauses
+            return self._render(text, output_path, label)
+
+        # Concatenate the already rendered letter clips - no synthesis needed
+        key = f"composed:{word}"
+        if self.journal.is_done(output_path, self._journal_key(key)):
+            success = True
+        else:
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                composer.compose_to_file(word, output_path)
+                self._finish(output_path, key)
+                self.generated_count += 1
+                success = True
+            except Exception as e:
+                print(f"      ❌ Failed to compose {label}: {e}")
+                success = False
+
+        if self.pending is not None:
+            self.finished.append((label, success, 0))
+        return success
+
+# Letters come first: the spelling phase is composed from the letter clips
+PHASES = [
+    ("🔤 Phase 1: Generating Individual Letters", "letters"),
+    ("📝 Phase 2: Composing Letter-by-Letter Spelling", "spelling"),
+    ("📦 Phase 3: Generating Word Pronunciations", "words"),
+    ("💬 Phase 4: Generating Feedback Messages", "feedback"),
+    ("📢 Phase 5: Generating Instruction Prompts", "instructions"),
+]
+
+def clip_job(clip):
+    """(AudioGenerator method name, args, progress label) rendering one manifest entry"""
+    relative = clip_path(clip)
+    if clip["category"] == "spelling":
+        word = spelled_word(clip)
+        return ("generate_spelled_audio", (clip["text"], relative, word), f"{word}_spelled")
+    label = clip["name"].split("/", 1)[1]
+    return ("generate_clip", (clip["text"], relative, label), label)
+
+def build_phases(manifest, shard=None, categories=None):
+    """
+    Work items for each generation phase (or just those of categories), one per
+    clip the manifest lists. With a shard, only the items whose output hashes
+    to it are kept - letters too, so every file has exactly one writer; the
+    spelling clips a shard composes come from a --letters-only run beforehand.
+    """
+    return [
+        (title, [job for job in map(clip_job, manifest.clips_of(category)) if in_shard(job_output(job), shard)])
+        for title, category in PHASES if categories is None or category in categories
+    ]
 
-    def generate_instruction_audio(self, text, filename):
-        """Generate instruction prompt audio"""
-        output_path = self.output_dir / f"instructions/{filename}.wav"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+def missing_letters(manifest):
+    """Letter clips not rendered yet"""
+    return [job_output(job) for job in map(clip_job, manifest.clips_of("letters")) if not job_output(job).exists()]
+
+def job_output(job):
+    """Output path a build_phases item writes"""
+    _, args, _ = job
+    return Path(OUTPUT_DIR) / args[1]
+
+# Per-process generator used by pool workers (each loads the model once)
+_worker_generator = None
+
+def _init_worker(batch_size, journal_path, codec):
+    global _worker_generator
+    try:
+        import torch
+        torch.set_num_threads(1)  # One core per worker; the pool provides the parallelism
+    except ImportError:
+        pass
+    _worker_generator = AudioGenerator(verbose=False, batch_size=batch_size, journal_path=journal_path, codec=codec)
+
+def _run_job(job):
+    method, args, label = job
+    hits_before = _worker_generator.cache.hits
+    success = getattr(_worker_generator, method)(*args)
+    return label, success, _worker_generator.cache.hits - hits_before
+
+def _run_batch(jobs):
+    _worker_generator.begin_batch()
+    for method, args, _ in jobs:
+        getattr(_worker_generator, method)(*args)
+    return list(_worker_generator.flush_batch())
+
+def run_phase(title, jobs, execute):
+    """Run one phase's jobs through execute and report progress as results stream in"""
+    print()
+    print(title)
+    print("-" * 60)
 
-        try:
-            self.tts.tts_to_file(
-                text=text,
-                file_path=str(output_path)
-            )
-            self.generated_count += 1
-            return True
-        except Exception as e:
-            print(f"      ❌ Failed to generate {filename}: {e}")
-            return False
+    total = len(jobs)
+    succeeded = 0
+    cache_hits = 0
+    for processed, (label, success, hits) in enumerate(execute(jobs), 1):
+        succeeded += success
+        cache_hits += hits
+        percent = (processed / total) * 100
+        print(f"      [{processed:3d}/{total}] ({percent:5.1f}%) {label:<30}", end='\r')
+    print()
+    return succeeded, cache_hits
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate SpellFlare audio with Coqui TTS")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of synthesis processes, each with its own model (default: 1)")
+    parser.add_argument("--batch-size", type=int, default=1,
+                        help="vocode up to N short texts per inference pass (default: 1, no batching)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="synthesize through the warm TTS daemon (started on demand, see tts_daemon.py)")
+    parser.add_argument("--codec", choices=["pcm", "adpcm"], default="pcm",
+                        help="output encoding: 16-bit PCM or IMA ADPCM (~4x smaller, see ima_adpcm.py)")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="only generate this node's share of the files (e.g. 2/4); see sharding.py")
+    parser.add_argument("--letters-only", action="store_true",
+                        help="render just the letter clips; run once before sharded runs, which compose from them")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the journal of an interrupted run and regenerate everything")
+    args = parser.parse_args()
+    if args.daemon and args.workers > 1:
+        parser.error("--daemon serializes synthesis on one model; use it without --workers")
+    if args.letters_only and args.shard:
+        parser.error("--letters-only renders the letters once for every shard; run it without --shard")
+
     start_time = time.time()
 
     print("=" * 60)
@@ -125,107 +327,84 @@ def main():
     print("=" * 60)
     print()
 
-    # Check if word bank exists
-    if not os.path.exists('word_bank.json'):
-        print("❌ word_bank.json not found!")
+    # The manifest is recompiled from word_bank.json if that changed
+    try:
+        manifest = load_manifest()
+    except FileNotFoundError:
+        print(f"❌ {WORD_BANK_FILE} not found!")
         print("   Please run: python export_word_bank.py")
         return
 
-    # Load word bank
-    with open('word_bank.json', 'r') as f:
-        word_bank = json.load(f)
-
-    # Convert string keys to integers
-    word_bank = {int(k): v for k, v in word_bank.items()}
-
-    # Initialize generator
-    generator = AudioGenerator()
-
-    print()
-    print("📦 Phase 1: Generating Word Pronunciations")
-    print("-" * 60)
-
-    total_words = sum(len(words) for words in word_bank.values())
-    processed = 0
-
-    for difficulty, words in sorted(word_bank.items()):
-        print(f"   Difficulty {difficulty:2d}: {len(words)} words")
-        for word in words:
-            processed += 1
-            percent = (processed / total_words) * 100
-            print(f"      [{processed:3d}/{total_words}] ({percent:5.1f}%) {word:<25}", end='\r')
-            generator.generate_word_audio(word, difficulty)
-        print()  # New line after each difficulty
-
-    print()
-    print("📝 Phase 2: Generating Letter-by-Letter Spelling")
-    print("-" * 60)
-
-    processed = 0
-    for difficulty, words in sorted(word_bank.items()):
-        print(f"   Difficulty {difficulty:2d}: {len(words)} words")
-        for word in words:
-            processed += 1
-            percent = (processed / total_words) * 100
-            print(f"      [{processed:3d}/{total_words}] ({percent:5.1f}%) {word}_spelled", end='\r')
-            generator.generate_spelled_audio(word, difficulty)
-        print()
-
-    print()
-    print("🔤 Phase 3: Generating Individual Letters")
-    print("-" * 60)
-
-    for i, letter in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZ", 1):
-        print(f"      [{i:2d}/26] {letter}", end='\r')
-        generator.generate_letter_audio(letter)
-    print()
-
-    print()
-    print("💬 Phase 4: Generating Feedback Messages")
-    print("-" * 60)
-
-    feedback_map = {
-        'success': [
-            ('Great job!', 'great_job'),
-            ('Excellent!', 'excellent'),
-            ('You got it!', 'you_got_it'),
-            ('Perfect!', 'perfect'),
-            ('Amazing!', 'amazing'),
-            ('Wonderful!', 'wonderful')
-        ],
-        'encouragement': [
-            ('Nice try!', 'nice_try'),
-            ('Almost there!', 'almost_there'),
-            ('Keep trying!', 'keep_trying'),
-            ("Don't give up!", 'dont_give_up')
-        ],
-        'system': [
-            ('The correct spelling is', 'correct_spelling_is'),
-            ('Congratulations! You completed the level!', 'level_complete')
-        ]
-    }
-
-    for category, messages in feedback_map.items():
-        print(f"   {category.capitalize()}:")
-        for text, filename in messages:
-            print(f"      - {filename}")
-            generator.generate_feedback_audio(text, category, filename)
-
-    print()
-    print("📢 Phase 5: Generating Instruction Prompts")
-    print("-" * 60)
-
-    instructions = [
-        ('Listen carefully!', 'listen_carefully'),
-        ('Spell the word out loud', 'spell_out_loud'),
-        ('Say each letter', 'say_each_letter'),
-        ('Tap to speak', 'tap_to_speak'),
-        ('Type the spelling', 'type_spelling')
-    ]
+    if args.shard and missing_letters(manifest):
+        # Every shard composes its spelling clips from all 26 letters, which no shard may overwrite
+        print(f"❌ {len(missing_letters(manifest))} letter clips missing")
+        print("   Please run once before the sharded runs: python generate_audio.py --letters-only")
+        return
 
-    for text, filename in instructions:
-        print(f"      - {filename}")
-        generator.generate_instruction_audio(text, filename)
+    phases = build_phases(manifest, args.shard, ["letters"] if args.letters_only else None)
+    total_jobs = sum(len(jobs) for _, jobs in phases)
+    generated_count = 0
+    if args.shard:
+        print(f"🧩 Shard {args.shard.index}/{args.shard.count}: {total_jobs} files")
+
+    # An interrupted run leaves a journal of finished files; pick up after them
+    journal_path = shard_path(JOURNAL_FILE, args.shard)
+    journal = JobJournal(journal_path)
+    if args.restart:
+        journal.clear()
+    elif len(journal):
+        print(f"📓 Resuming: {len(journal)} files already completed by an interrupted run")
+        print("   (use --restart to regenerate everything)")
+    cache_hits = 0
+
+    if args.workers > 1:
+        print(f"🔧 Starting {args.workers} Coqui TTS workers...")
+        print(f"   Model: {MODEL}")
+        print(f"   Sample rate: {SAMPLE_RATE} Hz")
+
+        # Spawn (not fork) so no worker inherits a half-initialized torch runtime
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.workers, initializer=_init_worker,
+                          initargs=(args.batch_size, journal_path, args.codec)) as pool:
+            if args.batch_size > 1:
+                def execute(jobs):
+                    chunks = [jobs[i:i + args.batch_size] for i in range(0, len(jobs), args.batch_size)]
+                    for results in pool.imap_unordered(_run_batch, chunks):
+                        yield from results
+            else:
+                execute = lambda jobs: pool.imap_unordered(_run_job, jobs)
+            for title, jobs in phases:
+                succeeded, hits = run_phase(title, jobs, execute)
+                generated_count += succeeded
+                cache_hits += hits
+        cache_summary = f"{cache_hits} hits / {total_jobs} lookups ({cache_hits / total_jobs * 100:.1f}%)"
+    else:
+        generator = AudioGenerator(batch_size=args.batch_size, use_daemon=args.daemon,
+                                   journal_path=journal_path, codec=args.codec)
+
+        def execute(jobs):
+            if args.batch_size > 1:
+                generator.begin_batch()
+                for method, job_args, _ in jobs:
+                    getattr(generator, method)(*job_args)
+                yield from generator.flush_batch()
+                return
+            for method, job_args, label in jobs:
+                yield label, getattr(generator, method)(*job_args), 0
+
+        for title, jobs in phases:
+            succeeded, _ = run_phase(title, jobs, execute)
+            generated_count += succeeded
+        cache_summary = generator.cache.summary()
+        generator.journal.close()
+
+    # Only a complete run retires the journal; after a failure the next run resumes
+    if generated_count == total_jobs:
+        journal.clear()
+
+    if args.shard:
+        expected = [job_output(job) for _, jobs in build_phases(manifest) for job in jobs]
+        write_receipt("generate_audio", args.shard, expected, total_jobs - generated_count)
 
     # Summary
     elapsed_time = time.time() - start_time
@@ -236,7 +415,13 @@ def main():
     print("=" * 60)
     print("✅ Audio Generation Complete!")
     print("=" * 60)
-    print(f"   Total files generated: {generator.generated_count}")
+    print(f"   Total files generated: {generated_count}")
+    if generated_count < total_jobs:
+        print(f"   Incomplete: {total_jobs - generated_count} (rerun to resume from {journal_path})")
+    print(f"   Synthesis cache: {cache_summary}")
+    print(f"   Workers: {args.workers}")
+    print(f"   Batch size: {args.batch_size}")
+    print(f"   Codec: {args.codec}")
     print(f"   Time elapsed: {minutes}m {seconds}s")
     print(f"   Output directory: {OUTPUT_DIR}")
     print()
@@ -5,109 +5,145 @@ This script creates pre-generated audio files that will be bundled with the app.
 
 NOTE: Using gTTS as a working alternative to Coqui TTS due to Python 3.9 compatibility issues.
       Audio quality is good and suitable for production. Can upgrade to Coqui TTS when Python 3.10+ is available.
+
+gTTS only produces MP3; each render is decoded in memory and written as real
+PCM WAV, so the .wav files are what their names say (requires pydub + ffmpeg).
+
+The clips to render come from the compiled expected-asset manifest
+(asset_manifest.py).
 """
 
-import os
-import json
+import io
+import argparse
+from itertools import groupby
 from pathlib import Path
 import time
 from gtts import gTTS
 
+from asset_manifest import WORD_BANK_FILE, clip_path, load_manifest, spelled_word
+from tts_cache import SynthesisCache
+from audio_io import HAS_PYDUB, decode_bytes, write_audio
+from audio_output import FORMAT_MANIFEST, FormatManifest, write_declared
+from spelling_composer import SpellingComposer
+from sharding import in_shard, parse_shard, shard_path, write_receipt
+from time_stretch import wsola
+
 # Configuration
 OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+SPELLING_SPEED = 0.75  # Synthesized spellings are slowed down by time-stretching
 
 class AudioGenerator:
-    def __init__(self):
+    def __init__(self, shard=None):
         print("🔧 Initializing gTTS...")
         self.output_dir = Path(OUTPUT_DIR)
+        self.cache = SynthesisCache()
+        self.formats = FormatManifest(FORMAT_MANIFEST, shard_path(FORMAT_MANIFEST, shard))
         self.generated_count = 0
-
-    def generate_word_audio(self, word, difficulty):
-        """Generate full word pronunciation"""
-        output_path = self.output_dir / f"words/difficulty_{difficulty}/{word}.wav"
+        self.failed_count = 0
+        self.shard = shard
+        self.expected = []  # Every output an unsharded run would write
+        self.composer = None
+        self.composer_unavailable = False
+
+    def _save_gtts(self, text, output_path, speed):
+        """Synthesize with gTTS and store at output_path"""
+        tts = gTTS(text=text, lang='en')
+        # gTTS generates MP3: decode it in memory and write the WAV in one pass.
+        # output_path is a temp file the cache renames into place.
+        buffer = io.BytesIO()
+        tts.write_to_fp(buffer)
+        if speed == 1.0:
+            write_declared(output_path, buffer.getvalue())
+            return
+
+        # Slowed down locally (pitch preserved) instead of a second, slow=True synthesis
+        samples, sample_rate, _ = decode_bytes(buffer.getvalue(), str(output_path))
+        write_audio(output_path, wsola(samples, sample_rate, speed), sample_rate, "wav")
+
+    def _render(self, text, output_path, label, speed=1.0):
+        """Render text to output_path, reusing a cached render when available"""
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
         try:
-            tts = gTTS(text=word, lang='en', slow=False)
-            # gTTS generates MP3 by default, but we'll save as .wav extension
-            # (we can convert later if needed, or keep as .mp3)
-            temp_mp3 = str(output_path).replace('.wav', '.mp3')
-            tts.save(temp_mp3)
-            # Rename to .wav for consistency (actual format is MP3, which iOS can play)
-            os.rename(temp_mp3, str(output_path))
+            self.cache.render(
+                "gtts", "en", text, output_path,
+                lambda path: self._save_gtts(text, path, speed),
+                speed=speed, format="wav"
+            )
+            self.formats.record(output_path)
             self.generated_count += 1
             return True
         except Exception as e:
-            print(f"      ❌ Failed to generate {word}: {e}")
+            print(f"      ❌ Failed to generate {label}: {e}")
+            self.failed_count += 1
             return False
 
-    def generate_spelled_audio(self, word, difficulty):
+    def _owns(self, output_path):
+        """Note output_path as expected; False if another shard renders it"""
+        self.expected.append(output_path)
+        return in_shard(output_path, self.shard)
+
+    def generate_clip(self, text, relative, label):
+        """Generate a word, feedback or instruction clip at relative (to OUTPUT_DIR)"""
+        output_path = self.output_dir / relative
+        if not self._owns(output_path):
+            return None
+        return self._render(text, output_path, label)
+
+    def _load_composer(self, voice):
+        """Load a voice's letter clips once; None if they can't all be decoded yet"""
+        if self.composer is None and not self.composer_unavailable:
+            try:
+                self.composer = SpellingComposer(self.output_dir / voice / "letters")
+            except Exception as e:
+                print(f"      ⚠️  Letter clips unavailable ({e}), synthesizing spellings instead")
+                self.composer_unavailable = True
+        return self.composer
+
+    def generate_spelled_audio(self, text, relative, word):
         """Generate letter-by-letter spelling with pauses"""
-        # Add commas and spaces between letters for natural pauses
-        letters = ", ".join(word.upper())
-        output_path = self.output_dir / f"spelling/difficulty_{difficulty}/{word}_spelled.wav"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        try:
-            tts = gTTS(text=letters, lang='en', slow=True)  # Use slow=True for spelling
-            temp_mp3 = str(output_path).replace('.wav', '.mp3')
-            tts.save(temp_mp3)
-            os.rename(temp_mp3, str(output_path))
-            self.generated_count += 1
-            return True
-        except Exception as e:
-            print(f"      ❌ Failed to generate {word}_spelled: {e}")
-            return False
+        output_path = self.output_dir / relative
+        if not self._owns(output_path):
+            return None
 
-    def generate_letter_audio(self, letter):
-        """Generate individual letter pronunciation"""
-        output_path = self.output_dir / f"letters/{letter.lower()}.wav"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+        composer = self._load_composer(Path(relative).parts[0])
+        if composer is None:
+            # The manifest text has commas and spaces between letters for natural pauses
+            return self._render(text, output_path, f"{word}_spelled", speed=SPELLING_SPEED)
 
-        try:
-            tts = gTTS(text=letter.upper(), lang='en', slow=False)
-            temp_mp3 = str(output_path).replace('.wav', '.mp3')
-            tts.save(temp_mp3)
-            os.rename(temp_mp3, str(output_path))
-            self.generated_count += 1
-            return True
-        except Exception as e:
-            print(f"      ❌ Failed to generate letter {letter}: {e}")
-            return False
-
-    def generate_feedback_audio(self, text, category, filename):
-        """Generate feedback message audio"""
-        output_path = self.output_dir / f"feedback/{category}/{filename}.wav"
+        # Concatenate the already rendered letter clips - no network call needed
         output_path.parent.mkdir(parents=True, exist_ok=True)
-
         try:
-            tts = gTTS(text=text, lang='en', slow=False)
-            temp_mp3 = str(output_path).replace('.wav', '.mp3')
-            tts.save(temp_mp3)
-            os.rename(temp_mp3, str(output_path))
+            composer.compose_to_file(word, output_path)
+            self.formats.record(output_path)
             self.generated_count += 1
             return True
         except Exception as e:
-            print(f"      ❌ Failed to generate {filename}: {e}")
+            print(f"      ❌ Failed to compose {word}_spelled: {e}")
+            self.failed_count += 1
             return False
 
-    def generate_instruction_audio(self, text, filename):
-        """Generate instruction prompt audio"""
-        output_path = self.output_dir / f"instructions/{filename}.wav"
-        output_path.parent.mkdir(parents=True, exist_ok=True)
+    def generate_letter_audio(self, text, relative):
+        """Generate individual letter pronunciation"""
+        output_path = self.output_dir / relative
+        if not self._owns(output_path):
+            return None
+        return self._render(text, output_path, f"letter {text}")
 
-        try:
-            tts = gTTS(text=text, lang='en', slow=False)
-            temp_mp3 = str(output_path).replace('.wav', '.mp3')
-            tts.save(temp_mp3)
-            os.rename(temp_mp3, str(output_path))
-            self.generated_count += 1
-            return True
-        except Exception as e:
-            print(f"      ❌ Failed to generate {filename}: {e}")
-            return False
+def by_folder(clips):
+    """(folder, clips) groups of manifest entries by their folder under the category"""
+    return [(folder, list(group)) for folder, group in groupby(clips, key=lambda clip: clip["name"].split("/")[1])]
 
 def main():
+    parser = argparse.ArgumentParser(description="Generate SpellFlare audio with gTTS")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="only generate this node's share of the files (e.g. 2/4); see sharding.py")
+    parser.add_argument("--letters-only", action="store_true",
+                        help="render just the letter clips; run once before sharded runs, which compose from them")
+    args = parser.parse_args()
+    if args.letters_only and args.shard:
+        parser.error("--letters-only renders the letters once for every shard; run it without --shard")
+
     start_time = time.time()
 
     print("=" * 60)
@@ -115,107 +151,104 @@ def main():
     print("=" * 60)
     print()
 
-    # Check if word bank exists
-    if not os.path.exists('word_bank.json'):
-        print("❌ word_bank.json not found!")
+    # The manifest is recompiled from word_bank.json if that changed
+    try:
+        manifest = load_manifest()
+    except FileNotFoundError:
+        print(f"❌ {WORD_BANK_FILE} not found!")
         print("   Please run: python export_word_bank.py")
         return
 
-    # Load word bank
-    with open('word_bank.json', 'r') as f:
-        word_bank = json.load(f)
-
-    # Convert string keys to integers
-    word_bank = {int(k): v for k, v in word_bank.items()}
+    if not HAS_PYDUB:
+        print("❌ pydub not found!")
+        print("   gTTS returns MP3, which is converted to WAV in memory.")
+        print("   Please install: pip install pydub (and ffmpeg)")
+        return
 
     # Initialize generator
-    generator = AudioGenerator()
+    generator = AudioGenerator(shard=args.shard)
+    if args.shard:
+        print(f"🧩 Shard {args.shard.index}/{args.shard.count}: rendering only this node's files")
+
+    letters = manifest.clips_of("letters")
+    if args.shard and not all((generator.output_dir / clip_path(clip)).exists() for clip in letters):
+        # Every shard composes its spelling clips from all 26 letters, which no shard may overwrite
+        print("❌ Letter clips missing")
+        print("   Please run once before the sharded runs: python generate_audio_gtts.py --letters-only")
+        return
+    spellings = manifest.clips_of("spelling")
+    words = manifest.clips_of("words")
 
+    # Letters come first: the spelling phase is composed from the letter clips
     print()
-    print("📦 Phase 1: Generating Word Pronunciations")
+    print("🔤 Phase 1: Generating Individual Letters")
     print("-" * 60)
 
-    total_words = sum(len(words) for words in word_bank.values())
-    processed = 0
+    for i, clip in enumerate(letters, 1):
+        print(f"      [{i:2d}/{len(letters)}] {clip['text']}", end='\r')
+        generator.generate_letter_audio(clip["text"], clip_path(clip))
+    print()
 
-    for difficulty, words in sorted(word_bank.items()):
-        print(f"   Difficulty {difficulty:2d}: {len(words)} words")
-        for word in words:
-            processed += 1
-            percent = (processed / total_words) * 100
-            print(f"      [{processed:3d}/{total_words}] ({percent:5.1f}%) {word:<25}", end='\r')
-            generator.generate_word_audio(word, difficulty)
-        print()  # New line after each difficulty
+    if args.letters_only:
+        generator.formats.save()
+        print()
+        print(f"✅ {generator.generated_count} letter clips generated - the sharded runs can start")
+        return
 
     print()
-    print("📝 Phase 2: Generating Letter-by-Letter Spelling")
+    print("📝 Phase 2: Composing Letter-by-Letter Spelling")
     print("-" * 60)
 
     processed = 0
-    for difficulty, words in sorted(word_bank.items()):
-        print(f"   Difficulty {difficulty:2d}: {len(words)} words")
-        for word in words:
+    for folder, clips in by_folder(spellings):
+        print(f"   {folder.replace('_', ' ').capitalize()}: {len(clips)} words")
+        for clip in clips:
             processed += 1
-            percent = (processed / total_words) * 100
-            print(f"      [{processed:3d}/{total_words}] ({percent:5.1f}%) {word}_spelled", end='\r')
-            generator.generate_spelled_audio(word, difficulty)
+            percent = (processed / len(spellings)) * 100
+            word = spelled_word(clip)
+            print(f"      [{processed:3d}/{len(spellings)}] ({percent:5.1f}%) {word}_spelled", end='\r')
+            generator.generate_spelled_audio(clip["text"], clip_path(clip), word)
         print()
 
     print()
-    print("🔤 Phase 3: Generating Individual Letters")
+    print("📦 Phase 3: Generating Word Pronunciations")
     print("-" * 60)
 
-    for i, letter in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZ", 1):
-        print(f"      [{i:2d}/26] {letter}", end='\r')
-        generator.generate_letter_audio(letter)
-    print()
+    processed = 0
+
+    for folder, clips in by_folder(words):
+        print(f"   {folder.replace('_', ' ').capitalize()}: {len(clips)} words")
+        for clip in clips:
+            processed += 1
+            percent = (processed / len(words)) * 100
+            print(f"      [{processed:3d}/{len(words)}] ({percent:5.1f}%) {clip['text']:<25}", end='\r')
+            generator.generate_clip(clip["text"], clip_path(clip), clip["text"])
+        print()  # New line after each difficulty
 
     print()
     print("💬 Phase 4: Generating Feedback Messages")
     print("-" * 60)
 
-    feedback_map = {
-        'success': [
-            ('Great job!', 'great_job'),
-            ('Excellent!', 'excellent'),
-            ('You got it!', 'you_got_it'),
-            ('Perfect!', 'perfect'),
-            ('Amazing!', 'amazing'),
-            ('Wonderful!', 'wonderful')
-        ],
-        'encouragement': [
-            ('Nice try!', 'nice_try'),
-            ('Almost there!', 'almost_there'),
-            ('Keep trying!', 'keep_trying'),
-            ("Don't give up!", 'dont_give_up')
-        ],
-        'system': [
-            ('The correct spelling is', 'correct_spelling_is'),
-            ('Congratulations! You completed the level!', 'level_complete')
-        ]
-    }
-
-    for category, messages in feedback_map.items():
+    for category, clips in by_folder(manifest.clips_of("feedback")):
         print(f"   {category.capitalize()}:")
-        for text, filename in messages:
+        for clip in clips:
+            filename = clip["name"].rsplit("/", 1)[1]
             print(f"      - {filename}")
-            generator.generate_feedback_audio(text, category, filename)
+            generator.generate_clip(clip["text"], clip_path(clip), filename)
 
     print()
     print("📢 Phase 5: Generating Instruction Prompts")
     print("-" * 60)
 
-    instructions = [
-        ('Listen carefully!', 'listen_carefully'),
-        ('Spell the word out loud', 'spell_out_loud'),
-        ('Say each letter', 'say_each_letter'),
-        ('Tap to speak', 'tap_to_speak'),
-        ('Type the spelling', 'type_spelling')
-    ]
-
-    for text, filename in instructions:
+    for clip in manifest.clips_of("instructions"):
+        filename = clip["name"].rsplit("/", 1)[1]
         print(f"      - {filename}")
-        generator.generate_instruction_audio(text, filename)
+        generator.generate_clip(clip["text"], clip_path(clip), filename)
+
+    generator.formats.save()
+    if args.shard:
+        write_receipt("generate_audio_gtts", args.shard, generator.expected, generator.failed_count,
+                      formats=FORMAT_MANIFEST)
 
     # Summary
     elapsed_time = time.time() - start_time
@@ -228,11 +261,11 @@ def main():
     print("=" * 60)
     print(f"   TTS Engine: gTTS (Google Text-to-Speech)")
     print(f"   Total files generated: {generator.generated_count}")
+    print(f"   Synthesis cache: {generator.cache.summary()}")
     print(f"   Time elapsed: {minutes}m {seconds}s")
     print(f"   Output directory: {OUTPUT_DIR}")
     print()
-    print("   ⚠️  Audio files are in MP3 format with .wav extension")
-    print("      iOS supports MP3 natively via AVAudioPlayer")
+    print(f"   Audio files are PCM WAV - real formats recorded in {generator.formats.path}")
     print()
     print("Next steps:")
     print("   1. Run: python validate_audio.py")
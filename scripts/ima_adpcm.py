@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+IMA ADPCM (WAV format 0x0011) encoder and decoder in NumPy.
+
+IMA ADPCM stores 4 bits per sample - about a quarter of 16-bit PCM - and
+AVAudioPlayer decodes it natively. The codec is sequential within a block,
+but every block starts from its own header (first sample + step index), so
+the encoder and decoder step through sample positions once while processing
+all blocks of all clips in a batch side by side as NumPy vectors.
+
+Usage:
+    python ima_adpcm.py encode [--categories words spelling letters] [--workers N]
+    python ima_adpcm.py decode input.wav output.wav
+"""
+
+import argparse
+import multiprocessing
+import os
+import struct
+import sys
+import time
+
+import numpy as np
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+DEFAULT_CATEGORIES = ["words", "spelling", "letters"]
+LOW_SNR_DB = 20.0  # Flag files whose round trip is noisier than this
+BATCH_SIZE = 32  # Files encoded together per pool task
+
+WAVE_FORMAT_IMA_ADPCM = 0x0011
+
+STEP_TABLE = np.array([
+    7, 8, 9, 10, 11, 12, 13, 14, 16, 17, 19, 21, 23, 25, 28, 31, 34, 37, 41, 45,
+    50, 55, 60, 66, 73, 80, 88, 97, 107, 118, 130, 143, 157, 173, 190, 209, 230,
+    253, 279, 307, 337, 371, 408, 449, 494, 544, 598, 658, 724, 796, 876, 963,
+    1060, 1166, 1282, 1411, 1552, 1707, 1878, 2066, 2272, 2499, 2749, 3024, 3327,
+    3660, 4026, 4428, 4871, 5358, 5894, 6484, 7132, 7845, 8630, 9493, 10442,
+    11487, 12635, 13899, 15289, 16818, 18500, 20350, 22385, 24623, 27086, 29794,
+    32767
+], dtype=np.int32)
+INDEX_TABLE = np.array([-1, -1, -1, -1, 2, 4, 6, 8] * 2, dtype=np.int32)
+
+
+def block_align_for(sample_rate):
+    """Bytes per block, following the usual 256 bytes per 11025 Hz convention"""
+    return 256 * max(1, sample_rate // 11025)
+
+
+def samples_per_block(block_align):
+    # 4-byte header holds the first sample; each remaining byte holds two
+    return (block_align - 4) * 2 + 1
+
+
+def to_int16(samples):
+    return (np.clip(np.asarray(samples, dtype=np.float32), -1.0, 1.0) * 32767.0).round().astype(np.int32)
+
+
+def encode_blocks(blocks):
+    """
+    Encode an (n_blocks, samples_per_block) int array.
+    Returns (predictors, step_indices, nibbles) with nibbles shaped (n_blocks, samples_per_block - 1).
+    """
+    blocks = blocks.astype(np.int32)
+    predictor = blocks[:, 0].copy()
+    # Blocks are independent, so pick each one's starting step from its own first difference
+    index = np.clip(np.searchsorted(STEP_TABLE, np.abs(blocks[:, 1] - blocks[:, 0])), 0, 88).astype(np.int32)
+    start_index = index.copy()
+    nibbles = np.empty((blocks.shape[0], blocks.shape[1] - 1), dtype=np.uint8)
+
+    for i in range(1, blocks.shape[1]):
+        step = STEP_TABLE[index]
+        diff = blocks[:, i] - predictor
+        nibble = (diff < 0).astype(np.int32) << 3
+        diff = np.abs(diff)
+        vpdiff = step >> 3
+        for bit in (4, 2, 1):
+            hit = diff >= step
+            nibble |= hit * bit
+            diff -= hit * step
+            vpdiff += hit * step
+            step = step >> 1
+        predictor = np.clip(np.where(nibble & 8, predictor - vpdiff, predictor + vpdiff), -32768, 32767)
+        index = np.clip(index + INDEX_TABLE[nibble], 0, 88)
+        nibbles[:, i - 1] = nibble
+
+    return blocks[:, 0], start_index, nibbles
+
+
+def decode_blocks(predictors, step_indices, nibbles):
+    """Inverse of encode_blocks. Returns an (n_blocks, samples_per_block) int32 array."""
+    predictor = predictors.astype(np.int32)
+    index = step_indices.astype(np.int32)
+    output = np.empty((nibbles.shape[0], nibbles.shape[1] + 1), dtype=np.int32)
+    output[:, 0] = predictor
+
+    for i in range(nibbles.shape[1]):
+        nibble = nibbles[:, i].astype(np.int32)
+        step = STEP_TABLE[index]
+        vpdiff = (step >> 3) + ((nibble & 4) > 0) * step + ((nibble & 2) > 0) * (step >> 1) + ((nibble & 1) > 0) * (step >> 2)
+        predictor = np.clip(np.where(nibble & 8, predictor - vpdiff, predictor + vpdiff), -32768, 32767)
+        index = np.clip(index + INDEX_TABLE[nibble], 0, 88)
+        output[:, i + 1] = predictor
+
+    return output
+
+
+def _to_blocks(pcm, per_block):
+    """Split a clip into whole blocks, padding the last one by holding the final sample"""
+    count = max(1, -(-len(pcm) // per_block))
+    padded = np.full(count * per_block, pcm[-1] if len(pcm) else 0, dtype=np.int32)
+    padded[:len(pcm)] = pcm
+    return padded.reshape(count, per_block)
+
+
+def encode_clips(clips, sample_rate):
+    """Encode several float clips at one sample rate in a single pass. Returns the data chunk bytes of each."""
+    block_align = block_align_for(sample_rate)
+    per_block = samples_per_block(block_align)
+    blocked = [_to_blocks(to_int16(clip), per_block) for clip in clips]
+    predictors, indices, nibbles = encode_blocks(np.concatenate(blocked))
+
+    # Block layout: int16 first sample, uint8 step index, reserved byte, then nibbles low-first
+    data = np.zeros((len(predictors), block_align), dtype=np.uint8)
+    data[:, 0:2] = predictors.astype('<i2').view(np.uint8).reshape(-1, 2)
+    data[:, 2] = indices
+    data[:, 4:] = nibbles[:, 0::2] | (nibbles[:, 1::2] << 4)
+
+    chunks = []
+    offset = 0
+    for blocks in blocked:
+        chunks.append(data[offset:offset + len(blocks)].tobytes())
+        offset += len(blocks)
+    return chunks
+
+
+def decode_data(data, block_align, frame_count):
+    """Decode a mono IMA ADPCM data chunk to float samples"""
+    blocks = np.frombuffer(data[:len(data) // block_align * block_align], dtype=np.uint8).reshape(-1, block_align)
+    predictors = blocks[:, 0:2].copy().view('<i2').reshape(-1)
+    packed = blocks[:, 4:]
+    nibbles = np.empty((len(blocks), packed.shape[1] * 2), dtype=np.uint8)
+    nibbles[:, 0::2] = packed & 0x0F
+    nibbles[:, 1::2] = packed >> 4
+    pcm = decode_blocks(predictors, blocks[:, 2], nibbles).reshape(-1)[:frame_count]
+    return (pcm / 32768.0).astype(np.float32)
+
+
+def wav_bytes(data, sample_rate, frame_count):
+    """Wrap an encoded data chunk in a RIFF/WAVE container (fmt + fact + data)"""
+    block_align = block_align_for(sample_rate)
+    per_block = samples_per_block(block_align)
+    fmt = struct.pack('<HHIIHHHH', WAVE_FORMAT_IMA_ADPCM, 1, sample_rate,
+                      sample_rate * block_align // per_block, block_align, 4, 2, per_block)
+    body = (b'WAVE'
+            + b'fmt ' + struct.pack('<I', len(fmt)) + fmt
+            + b'fact' + struct.pack('<II', 4, frame_count)
+            + b'data' + struct.pack('<I', len(data)) + data)
+    return b'RIFF' + struct.pack('<I', len(body)) + body
+
+
+def write_adpcm_wav(path, samples, sample_rate):
+    data = encode_clips([samples], sample_rate)[0]
+    with open(path, 'wb') as f:
+        f.write(wav_bytes(data, sample_rate, len(samples)))
+
+
+def read_adpcm_wav(path):
+    """Load a mono IMA ADPCM WAV. Returns (samples, sample_rate)."""
+    with open(path, 'rb') as f:
+        return parse_adpcm_wav(f.read(), path)
+
+
+def parse_adpcm_wav(raw, name="<bytes>"):
+    """Decode an in-memory mono IMA ADPCM WAV. Returns (samples, sample_rate)."""
+    if raw[:4] != b'RIFF' or raw[8:12] != b'WAVE':
+        raise ValueError(f"{name}: not a WAV file")
+
+    fmt = data = None
+    frame_count = None
+    offset = 12
+    while offset + 8 <= len(raw):
+        chunk_id, size = raw[offset:offset + 4], struct.unpack('<I', raw[offset + 4:offset + 8])[0]
+        body = raw[offset + 8:offset + 8 + size]
+        if chunk_id == b'fmt ':
+            fmt = struct.unpack('<HHIIHH', body[:16])
+        elif chunk_id == b'fact':
+            frame_count = struct.unpack('<I', body[:4])[0]
+        elif chunk_id == b'data':
+            data = body
+        offset += 8 + size + (size & 1)
+
+    if fmt is None or data is None:
+        raise ValueError(f"{name}: missing fmt or data chunk")
+    tag, channels, sample_rate, _, block_align, _ = fmt
+    if tag != WAVE_FORMAT_IMA_ADPCM or channels != 1:
+        raise ValueError(f"{name}: not mono IMA ADPCM (format 0x{tag:04x}, {channels} channels)")
+    if frame_count is None:
+        frame_count = len(data) // block_align * samples_per_block(block_align)
+    return decode_data(data, block_align, frame_count), sample_rate
+
+
+def snr_db(reference, decoded):
+    noise = np.sum(np.square(reference.astype(np.float64) - decoded[:len(reference)]))
+    signal = np.sum(np.square(reference.astype(np.float64)))
+    if noise == 0:
+        return float('inf')
+    if signal == 0:
+        return float('-inf')
+    return float(10 * np.log10(signal / noise))
+
+
+def encode_batch(paths):
+    """Worker: transcode PCM WAV files to ADPCM in place. Returns [(path, bytes_before, bytes_after, snr)]."""
+    from audio_io import read_wav
+    from job_journal import atomic_output
+
+    clips = {}
+    results = []
+    for path in paths:
+        try:
+            samples, sample_rate = read_wav(path)
+            clips.setdefault(sample_rate, []).append((path, samples))
+        except Exception as e:
+            print(f"   ❌ {path}: {e}")
+            results.append((path, 0, 0, None))
+
+    for sample_rate, group in clips.items():
+        chunks = encode_clips([samples for _, samples in group], sample_rate)
+        for (path, samples), data in zip(group, chunks):
+            decoded = decode_data(data, block_align_for(sample_rate), len(samples))
+            size_before = os.path.getsize(path)
+            with atomic_output(path) as temp_path:
+                with open(temp_path, 'wb') as f:
+                    f.write(wav_bytes(data, sample_rate, len(samples)))
+            results.append((path, size_before, os.path.getsize(path), snr_db(samples, decoded)))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="IMA ADPCM encoder/decoder for the audio bundle")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    encode_parser = subparsers.add_parser("encode", help="transcode PCM WAV clips to IMA ADPCM in place")
+    encode_parser.add_argument("--categories", nargs="+", default=DEFAULT_CATEGORIES)
+    encode_parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    encode_parser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+    decode_parser = subparsers.add_parser("decode", help="decode one IMA ADPCM WAV to 16-bit PCM")
+    decode_parser.add_argument("input")
+    decode_parser.add_argument("output")
+    args = parser.parse_args()
+
+    from audio_io import category_of, iter_audio_files, sniff_format, write_wav
+
+    if args.command == "decode":
+        samples, sample_rate = read_adpcm_wav(args.input)
+        write_wav(args.output, samples, sample_rate)
+        print(f"✅ Decoded {len(samples)} samples at {sample_rate} Hz to {args.output}")
+        return
+
+    start_time = time.time()
+    print("=" * 60)
+    print("🗜️  IMA ADPCM Encoding")
+    print("=" * 60)
+    print()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        sys.exit(1)
+
+    paths = [path for path in iter_audio_files(args.dir)
+             if category_of(path) in args.categories and sniff_format(path) == "wav"]
+    print(f"   {len(paths)} PCM clips in {', '.join(args.categories)}")
+    print()
+
+    batches = [paths[i:i + BATCH_SIZE] for i in range(0, len(paths), BATCH_SIZE)]
+    total_before = total_after = 0
+    snrs = []
+    with multiprocessing.Pool(args.workers) as pool:
+        for results in pool.imap_unordered(encode_batch, batches):
+            for path, size_before, size_after, snr in results:
+                if snr is None:
+                    continue
+                total_before += size_before
+                total_after += size_after
+                snrs.append(snr)
+                flag = "⚠️ " if snr < LOW_SNR_DB else "  "
+                print(f"   {flag}{os.path.relpath(path, args.dir):<50} {size_before / 1024:7.1f} KB → "
+                      f"{size_after / 1024:6.1f} KB  SNR {snr:5.1f} dB")
+
+    print()
+    print("=" * 60)
+    print("📊 Summary:")
+    print(f"   Encoded: {len(snrs)} files")
+    if snrs:
+        print(f"   Size: {total_before / 1024 / 1024:.1f} MB → {total_after / 1024 / 1024:.1f} MB "
+              f"({total_before / max(total_after, 1):.1f}× smaller)")
+        print(f"   SNR: min {min(snrs):.1f} dB, median {np.median(snrs):.1f} dB")
+    print(f"   ⏱️  {time.time() - start_time:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Crash-safe bookkeeping for the audio generators.
+
+Every output is written to a temp file next to its destination and renamed
+into place, so a killed run never leaves a truncated clip under a final name.
+Each finished file is then appended to a journal (one JSON line per file,
+flushed and fsynced). A restarted run reads the journal and skips everything
+already recorded there, checking each file with a single stat instead of
+re-validating the whole tree.
+
+Usage:
+    python job_journal.py [path/to/journal.jsonl]
+"""
+
+import json
+import os
+import sys
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+
+JOURNAL_FILE = "generation_journal.jsonl"
+
+
+@contextmanager
+def atomic_output(output_path):
+    """
+    Yield a temp path to write to; it replaces output_path only if the block succeeds.
+    The temp file keeps the destination's extension for writers that sniff it, and
+    its random name is unique even across hosts sharing the directory (PIDs aren't).
+    """
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = output_path.with_name(f".{output_path.stem}.{uuid.uuid4().hex}.partial{output_path.suffix}")
+    try:
+        yield str(temp_path)
+        os.replace(temp_path, output_path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+class JobJournal:
+    def __init__(self, path=JOURNAL_FILE):
+        self.path = path
+        self.done = {}  # output path -> (input key, size)
+        self.file = None
+
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # Torn last line from a crash mid-append
+                    self.done[record["path"]] = (record["key"], record["size"])
+
+    def __len__(self):
+        return len(self.done)
+
+    def is_done(self, output_path, key):
+        """True if output_path was finished from the same inputs and is still the file we wrote"""
+        entry = self.done.get(str(output_path))
+        if entry is None or entry[0] != key:
+            return False
+        try:
+            return os.stat(output_path).st_size == entry[1]
+        except OSError:
+            return False
+
+    def mark_done(self, output_path, key):
+        size = os.stat(output_path).st_size
+        if self.file is None:
+            # Append mode: concurrent workers each add whole lines to the same journal
+            self.file = open(self.path, "a", encoding="utf-8")
+        self.file.write(json.dumps({"path": str(output_path), "key": key, "size": size}) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.done[str(output_path)] = (key, size)
+
+    def clear(self):
+        """Forget the journal once a run has completed"""
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.done = {}
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def main():
+    journal = JobJournal(sys.argv[1] if len(sys.argv) > 1 else JOURNAL_FILE)
+    if not os.path.exists(journal.path):
+        print(f"📓 No journal at {journal.path} - the last run completed (or never started)")
+        return
+
+    intact = sum(1 for path, (key, _) in journal.done.items() if journal.is_done(path, key))
+    print(f"📓 Journal: {journal.path}")
+    print(f"   Completed items: {len(journal)}")
+    print(f"   Still intact on disk: {intact}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""
+Normalize every clip in the Audio tree to one integrated loudness.
+
+The bundle mixes Coqui WAVs, gTTS MP3s and placeholders, so loudness jumps
+between words/ and Lisa/sentences/. Each clip's integrated loudness is
+measured per ITU-R BS.1770 (K-weighting, 400 ms blocks, absolute and
+relative gating), the gain to TARGET_LUFS is applied and a look-ahead
+limiter keeps the 4x-oversampled true peak under TRUE_PEAK_CEILING_DB.
+
+Runs across a process pool and records a per-file gain report. A file whose
+content hash matches the report (already normalized to the same target) is
+skipped, so reruns only touch new or regenerated clips.
+
+Usage:
+    python normalize_loudness.py [--target -16] [--dry-run] [--workers N] [--force]
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+try:
+    from scipy.ndimage import minimum_filter1d, uniform_filter1d
+    from scipy.signal import lfilter, resample_poly
+except ImportError:
+    print("❌ scipy not found!")
+    print("   Please install: pip install scipy")
+    exit(1)
+
+from audio_io import HAS_PYDUB, iter_audio_files, mp3_bitrate, read_audio, sniff_format, write_audio
+from job_journal import atomic_output
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+REPORT_FILE = "loudness_report.json"
+TARGET_LUFS = -16.0  # Common target for speech on mobile devices
+TRUE_PEAK_CEILING_DB = -1.0
+MAX_GAIN_DB = 20.0  # Never boost quiet clips (or noise) further than this
+TOLERANCE_DB = 0.5  # Clips this close to target are left as they are
+OVERSAMPLE = 4  # True-peak estimation factor
+LIMITER_LOOKAHEAD_MS = 5
+
+# BS.1770 gating
+BLOCK_SECONDS = 0.4
+BLOCK_STEP_SECONDS = 0.1  # 75% overlap
+ABSOLUTE_GATE_LUFS = -70.0
+RELATIVE_GATE_LU = -10.0
+
+
+def k_weighting_filters(sample_rate):
+    """
+    BS.1770 K-weighting biquads for any sample rate: the head-related high
+    shelf and the RLB high-pass, re-derived from their analog prototypes (the
+    standard only tabulates coefficients for 48 kHz).
+    """
+    k = np.tan(np.pi * 1681.974450955533 / sample_rate)
+    q = 0.7071752369554196
+    vh = 10 ** (3.999843853973347 / 20)
+    vb = vh ** 0.4996667741545416
+    a0 = 1 + k / q + k * k
+    shelf = (np.array([vh + vb * k / q + k * k, 2 * (k * k - vh), vh - vb * k / q + k * k]) / a0,
+             np.array([1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]))
+
+    k = np.tan(np.pi * 38.13547087602444 / sample_rate)
+    q = 0.5003270373238773
+    a0 = 1 + k / q + k * k
+    high_pass = (np.array([1.0, -2.0, 1.0]),
+                 np.array([1.0, 2 * (k * k - 1) / a0, (1 - k / q + k * k) / a0]))
+    return shelf, high_pass
+
+
+def k_weight(samples, sample_rate):
+    for b, a in k_weighting_filters(sample_rate):
+        samples = lfilter(b, a, samples)
+    return samples
+
+
+def integrated_loudness(samples, sample_rate):
+    """Gated integrated loudness in LUFS (-inf for silence)"""
+    weighted = k_weight(samples.astype(np.float64), sample_rate)
+    block = int(BLOCK_SECONDS * sample_rate)
+    step = int(BLOCK_STEP_SECONDS * sample_rate)
+
+    # Mean square of every 400 ms block at once, from a running sum of squares
+    energy = np.concatenate(([0.0], np.cumsum(np.square(weighted))))
+    if len(weighted) < block:
+        powers = np.array([energy[-1] / max(len(weighted), 1)])
+    else:
+        starts = np.arange(0, len(weighted) - block + 1, step)
+        powers = (energy[starts + block] - energy[starts]) / block
+
+    with np.errstate(divide='ignore'):
+        loudness = -0.691 + 10 * np.log10(powers)
+    gated = powers[loudness > ABSOLUTE_GATE_LUFS]
+    if not gated.size:
+        return float('-inf')
+
+    relative_gate = -0.691 + 10 * np.log10(gated.mean()) + RELATIVE_GATE_LU
+    gated = powers[(loudness > ABSOLUTE_GATE_LUFS) & (loudness > relative_gate)]
+    return float(-0.691 + 10 * np.log10(gated.mean()))
+
+
+def true_peak_envelope(samples):
+    """Per-sample peak of the oversampled signal (catches inter-sample overs)"""
+    upsampled = resample_poly(samples, OVERSAMPLE, 1)[:len(samples) * OVERSAMPLE]
+    return np.abs(upsampled).reshape(-1, OVERSAMPLE).max(axis=1)
+
+
+def limit_true_peak(samples, sample_rate, ceiling_db=TRUE_PEAK_CEILING_DB):
+    """
+    Look-ahead limiter: the gain needed at every over is spread over the
+    surrounding window (min filter, then a box filter of half its width, which
+    never rises above the required gain) so reductions ramp in without clicks.
+    Returns (limited samples, maximum gain reduction in dB).
+    """
+    ceiling = 10 ** (ceiling_db / 20.0)
+    peaks = true_peak_envelope(samples)
+    if peaks.max() <= ceiling:
+        return samples, 0.0
+
+    required = np.minimum(1.0, ceiling / np.maximum(peaks, 1e-12))
+    window = max(1, int(sample_rate * LIMITER_LOOKAHEAD_MS / 1000))
+    gain = uniform_filter1d(minimum_filter1d(required, 2 * window + 1), window + 1)
+    gain = np.minimum(gain, required)
+    limited = (samples * gain).astype(np.float32)
+
+    # Filtering can leave a residual inter-sample over; trim it statically
+    residual = true_peak_envelope(limited).max()
+    if residual > ceiling:
+        limited *= ceiling / residual
+    return limited, float(-20 * np.log10(gain.min()))
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def normalize_file(job):
+    """Worker: measure and normalize one file. Returns (path, report entry or None, status)."""
+    path, target, previous, dry_run = job
+    try:
+        content_hash = file_hash(path)
+        if previous and previous.get("hash") == content_hash and previous.get("target") == target:
+            return path, previous, "skipped"
+
+        samples, sample_rate, fmt = read_audio(path)
+        loudness = integrated_loudness(samples, sample_rate)
+        entry = {"target": target, "loudness_before": loudness, "gain_db": 0.0,
+                 "limiter_db": 0.0, "format": fmt}
+
+        if loudness == float('-inf'):
+            entry["hash"] = content_hash
+            return path, entry, "silent"
+
+        gain_db = min(target - loudness, MAX_GAIN_DB)
+        normalized, limiter_db = limit_true_peak(samples * 10 ** (gain_db / 20.0), sample_rate)
+        entry.update(gain_db=gain_db, limiter_db=limiter_db)
+        if abs(gain_db) < TOLERANCE_DB and limiter_db == 0.0:
+            entry["hash"] = content_hash
+            return path, entry, "in-tolerance"
+        if dry_run:
+            return path, entry, "normalized"
+
+        bitrate = mp3_bitrate(path, len(samples) / sample_rate) if fmt == "mp3" else None
+        with atomic_output(path) as temp_path:
+            write_audio(temp_path, normalized, sample_rate, fmt, bitrate)
+        entry["loudness_after"] = integrated_loudness(normalized, sample_rate)
+        entry["hash"] = file_hash(path)
+        return path, entry, "normalized"
+    except Exception as e:
+        print(f"   ❌ {path}: {e}")
+        return path, None, "failed"
+
+
+def load_report(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_report(path, report):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    os.replace(temp_path, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Normalize loudness of all audio clips")
+    parser.add_argument("--target", type=float, default=TARGET_LUFS, help="integrated loudness in LUFS (default: -16)")
+    parser.add_argument("--dry-run", action="store_true", help="measure and report without rewriting files")
+    parser.add_argument("--force", action="store_true", help="re-measure files the report says are done")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    print("=" * 60)
+    print("🔊 Loudness Normalization")
+    print("=" * 60)
+    print()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        return
+
+    paths = list(iter_audio_files(args.dir))
+    if not HAS_PYDUB:
+        mp3_count = len(paths)
+        paths = [path for path in paths if sniff_format(path) == "wav"]
+        mp3_count -= len(paths)
+        if mp3_count:
+            print(f"⚠️  Skipping {mp3_count} MP3 clips - install pydub (and ffmpeg) to normalize them")
+
+    report = load_report(REPORT_FILE)
+    print(f"   {len(paths)} clips, target {args.target:.1f} LUFS / {TRUE_PEAK_CEILING_DB:.1f} dBTP, "
+          f"{args.workers} workers{' (dry run)' if args.dry_run else ''}")
+    print()
+
+    counts = {}
+    gains = []
+    jobs = [
+        (path, args.target, None if args.force else report.get(os.path.relpath(path, args.dir)), args.dry_run)
+        for path in paths
+    ]
+    with multiprocessing.Pool(args.workers) as pool:
+        for processed, (path, entry, status) in enumerate(pool.imap_unordered(normalize_file, jobs, chunksize=8), 1):
+            counts[status] = counts.get(status, 0) + 1
+            if entry is not None:
+                report[os.path.relpath(path, args.dir)] = entry
+                if status != "skipped" and entry["loudness_before"] != float('-inf'):
+                    gains.append(entry["gain_db"])
+            print(f"      [{processed:4d}/{len(jobs)}]", end='\r')
+    print()
+
+    if not args.dry_run:
+        # Silent clips measure -inf, which JSON can't hold
+        for entry in report.values():
+            if entry["loudness_before"] == float('-inf'):
+                entry["loudness_before"] = None
+        save_report(REPORT_FILE, report)
+
+    print()
+    print("=" * 60)
+    print("📊 Summary:")
+    for status in ["normalized", "in-tolerance", "skipped", "silent", "failed"]:
+        print(f"   {status:<13} {counts.get(status, 0)}")
+    if gains:
+        print(f"   Gain applied: min {min(gains):+.1f} dB, median {np.median(gains):+.1f} dB, max {max(gains):+.1f} dB")
+    if not args.dry_run:
+        print(f"   Per-file report: {REPORT_FILE}")
+    print(f"   ⏱️  {time.time() - start_time:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
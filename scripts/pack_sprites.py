@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Pack small-clip categories (letters, feedback) into one audio sprite each.
+
+Spelling playback opens a letter clip per letter - each a Bundle.main.url
+lookup and a file open. A sprite is a single 16-bit mono PCM WAV holding
+every clip of a category back to back, each starting on an ALIGN_BYTES
+boundary (a JUNK chunk aligns the data chunk itself), so the app can
+memory-map one file and play a clip by seeking. Next to each sprite a JSON
+index maps clip name → byte offset (from the start of the file), frame count
+and SHA-256 of the clip's PCM bytes.
+
+Sprites go to Resources/AudioSprites/<voice>/, outside the Audio tree, so
+the trim/normalize/resample passes never rewrite them behind the index's back.
+
+Usage:
+    python pack_sprites.py pack [--categories letters feedback] [--rate 22050]
+    python pack_sprites.py verify [--sources]
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+from asset_manifest import load_manifest
+from audio_io import CATEGORIES, iter_audio_files, read_audio, resolve_clip, to_pcm16, voice_roots
+from resample_audio import resample
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+SPRITE_DIR = "../spelling-bee iOS App/Resources/AudioSprites"
+DEFAULT_CATEGORIES = ["letters", "feedback"]
+ALIGN_BYTES = 4096  # Page size: every clip starts on its own page of the mapping
+INDEX_VERSION = 1
+
+
+def load_clip(path, sample_rate=None):
+    """Decode a clip to 16-bit PCM bytes, resampled to sample_rate if given. Returns (pcm, rate)."""
+    samples, rate, _ = read_audio(path)
+    if sample_rate and rate != sample_rate:
+        samples, rate = resample(samples, rate, sample_rate), sample_rate
+    return to_pcm16(samples), rate
+
+
+def sprite_header(sample_rate, data_size, align):
+    """RIFF/fmt header plus a JUNK chunk sized so the PCM data starts on an align boundary"""
+    junk_size = -(12 + 24 + 8 + 8) % align
+    riff_size = 4 + 24 + 8 + junk_size + 8 + data_size
+    return (b'RIFF' + struct.pack('<I', riff_size) + b'WAVE'
+            + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, sample_rate, sample_rate * 2, 2, 16)
+            + b'JUNK' + struct.pack('<I', junk_size) + bytes(junk_size)
+            + b'data' + struct.pack('<I', data_size))
+
+
+def pack_category(root, category, sprite_path, sample_rate=None, align=ALIGN_BYTES):
+    """Write the sprite for root/category and return its index"""
+    paths = list(iter_audio_files(root / category))
+    if not paths:
+        return None
+
+    decoded = {}
+    for path in paths:
+        name = Path(os.path.relpath(path, root / category)).with_suffix("").as_posix()
+        # Pack the file the app would play: .wav wins over an .mp3 of the same name
+        if resolve_clip(os.path.join(root, category, name)) == path:
+            decoded[name] = (path,) + load_clip(path)
+    if sample_rate is None:
+        # The rate most clips already have - the fewest need resampling
+        sample_rate = Counter(rate for _, _, rate in decoded.values()).most_common(1)[0][0]
+
+    clips = {}
+    chunks = []
+    position = len(sprite_header(sample_rate, 0, align))
+    for name, (path, pcm, rate) in sorted(decoded.items()):
+        if rate != sample_rate:
+            pcm, rate = load_clip(path, sample_rate)
+        clips[name] = {"offset": position, "frames": len(pcm) // 2,
+                       "sha256": hashlib.sha256(pcm).hexdigest()}
+        padding = bytes(-len(pcm) % align)
+        chunks += [pcm, padding]
+        position += len(pcm) + len(padding)
+
+    data_size = sum(len(chunk) for chunk in chunks)
+    sprite_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = sprite_path.with_name(f".{sprite_path.name}.partial")
+    with open(temp_path, 'wb') as f:
+        f.write(sprite_header(sample_rate, data_size, align))
+        f.writelines(chunks)
+    os.replace(temp_path, sprite_path)
+
+    index = {"version": INDEX_VERSION, "sprite": sprite_path.name, "sample_rate": sample_rate,
+             "channels": 1, "bits_per_sample": 16, "align": align, "clips": clips}
+    index_path = sprite_path.with_suffix(".json")
+    temp_path = index_path.with_name(f".{index_path.name}.partial")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, indent=2, sort_keys=True)
+    os.replace(temp_path, index_path)
+    return index
+
+
+def verify_sprite(index_path, source_dir=None):
+    """
+    Extract every clip from the sprite and check it against the index (and,
+    given source_dir, against a fresh decode of the source clip). Returns a
+    list of problems, empty when the sprite is sound.
+    """
+    with open(index_path, 'r', encoding='utf-8') as f:
+        index = json.load(f)
+    sprite_path = Path(index_path).with_name(index["sprite"])
+    problems = []
+
+    with open(sprite_path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        sprite_rate = struct.unpack_from('<I', data, 24)[0]
+        if sprite_rate != index["sample_rate"]:
+            problems.append(f"sprite is {sprite_rate} Hz, index says {index['sample_rate']} Hz")
+
+        end_of_previous = 0
+        for name, clip in sorted(index["clips"].items(), key=lambda item: item[1]["offset"]):
+            offset, length = clip["offset"], clip["frames"] * 2
+            if offset % index["align"]:
+                problems.append(f"{name}: offset {offset} is not {index['align']}-byte aligned")
+            if offset < end_of_previous or offset + length > len(data):
+                problems.append(f"{name}: bytes {offset}-{offset + length} overlap or overrun")
+            end_of_previous = offset + length
+
+            pcm = data[offset:offset + length]
+            if hashlib.sha256(pcm).hexdigest() != clip["sha256"]:
+                problems.append(f"{name}: extracted clip doesn't match its checksum")
+
+            if source_dir is not None:
+                source = resolve_clip(os.path.join(source_dir, name))
+                if source is None:
+                    problems.append(f"{name}: source clip missing")
+                elif load_clip(source, index["sample_rate"])[0] != pcm:
+                    problems.append(f"{name}: source clip changed since packing")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack small audio clips into sprites with an offset index")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    pack_parser = subparsers.add_parser("pack", help="build one sprite per voice and category")
+    pack_parser.add_argument("--categories", nargs="+", default=DEFAULT_CATEGORIES)
+    pack_parser.add_argument("--rate", type=int, help="sprite sample rate (default: the clips' most common rate)")
+    pack_parser.add_argument("--align", type=int, default=ALIGN_BYTES, help=f"clip alignment in bytes (default: {ALIGN_BYTES})")
+    verify_parser = subparsers.add_parser("verify", help="extract every clip and compare checksums")
+    verify_parser.add_argument("--sources", action="store_true", help="also compare against the source clips")
+    for subparser in (pack_parser, verify_parser):
+        subparser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+        subparser.add_argument("--out", default=SPRITE_DIR, help="sprite folder (default: Resources/AudioSprites)")
+    args = parser.parse_args()
+
+    if args.command == "pack" and args.align % 4:
+        parser.error("--align must be a multiple of 4")
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        sys.exit(1)
+
+    start_time = time.time()
+    # Sprites of any category can be verified; packing looks only for the requested ones
+    roots = voice_roots(args.dir, args.categories if args.command == "pack" else CATEGORIES)
+
+    if args.command == "verify":
+        print("🔍 Verifying audio sprites...")
+        failures = 0
+        for index_path in sorted(Path(args.out).glob("*/*.json")):
+            voice, category = index_path.parent.name, index_path.stem
+            source_dir = roots[voice] / category if args.sources and voice in roots else None
+            problems = verify_sprite(index_path, source_dir)
+            status = "✅" if not problems else "❌"
+            print(f"   {status} {voice}/{category}")
+            for problem in problems:
+                print(f"      - {problem}")
+            failures += bool(problems)
+        print(f"   ⏱️  {time.time() - start_time:.2f}s")
+        sys.exit(1 if failures else 0)
+
+    print("=" * 60)
+    print("🧩 Audio Sprite Packing")
+    print("=" * 60)
+    print()
+
+    try:
+        expected = load_manifest()
+    except FileNotFoundError:
+        expected = None  # No word_bank.json yet - pack without checking for absent clips
+
+    for voice, root in roots.items():
+        for category in args.categories:
+            sprite_path = Path(args.out) / voice / f"{category}.wav"
+            try:
+                index = pack_category(root, category, sprite_path, args.rate, args.align)
+            except Exception as e:
+                print(f"   ❌ {voice}/{category}: {e}")
+                continue
+            if index is None:
+                continue
+            print(f"   {voice}/{category:<12} {len(index['clips']):3d} clips → {sprite_path.name} "
+                  f"({os.path.getsize(sprite_path) / 1024:.1f} KB at {index['sample_rate']} Hz)")
+            if expected is None:
+                continue
+            absent = sorted(expected.names(category) - {f"{category}/{name}" for name in index['clips']})
+            if absent:
+                print(f"      ⚠️  {len(absent)} expected clips not in the sprite: {', '.join(absent[:5])}")
+
+    print()
+    print(f"⏱️  {time.time() - start_time:.1f}s")
+    print("Next: python pack_sprites.py verify --sources")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Convert every clip in the Audio tree to one sample rate per category.
+
+Coqui writes 22050 Hz, gTTS 24000 Hz, the WAV-converted sentences and the
+placeholders 44100 Hz - so the app resamples at playback time. This stage
+decodes each clip once, resamples it in memory with a polyphase filter
+(scipy.signal.resample_poly) and rewrites it in its original format. Files
+are handed to a process pool in batches; each worker designs the anti-alias
+filter for a given rate ratio once and reuses it for the whole run.
+
+Usage:
+    python resample_audio.py [--rate 22050] [--category-rate sentences=24000] [--dry-run]
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import time
+from collections import Counter
+from functools import lru_cache
+
+try:
+    from scipy.signal import firwin, resample_poly
+except ImportError:
+    print("❌ scipy not found!")
+    print("   Please install: pip install scipy")
+    exit(1)
+
+from audio_io import (HAS_PYDUB, CATEGORIES, category_of, iter_audio_files, mp3_bitrate, read_audio,
+                      sniff_format, write_audio)
+from job_journal import atomic_output
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+DEFAULT_RATE = 22050  # Plenty for speech; the Coqui model's native rate
+CATEGORY_RATES = {}  # Per-category overrides, e.g. {"sentences": 24000}
+BATCH_SIZE = 16  # Files per pool task
+KAISER_BETA = 5.0  # Same window resample_poly uses by default
+
+
+@lru_cache(maxsize=None)
+def lowpass_filter(up, down):
+    """Anti-alias FIR for an up/down ratio (what resample_poly would design on every call)"""
+    max_rate = max(up, down)
+    return firwin(2 * 10 * max_rate + 1, 1.0 / max_rate, window=('kaiser', KAISER_BETA))
+
+
+def resample(samples, from_rate, to_rate):
+    g = math.gcd(from_rate, to_rate)
+    up, down = to_rate // g, from_rate // g
+    return resample_poly(samples, up, down, window=lowpass_filter(up, down)).astype(samples.dtype)
+
+
+def resample_batch(batch):
+    """Worker: resample a batch of (path, target_rate, dry_run). Returns [(path, from_rate, status)]."""
+    results = []
+    for path, target_rate, dry_run in batch:
+        try:
+            samples, sample_rate, fmt = read_audio(path)
+            if sample_rate == target_rate:
+                results.append((path, sample_rate, "unchanged"))
+                continue
+            if not dry_run:
+                bitrate = mp3_bitrate(path, len(samples) / sample_rate) if fmt == "mp3" else None
+                converted = resample(samples, sample_rate, target_rate)
+                with atomic_output(path) as temp_path:
+                    write_audio(temp_path, converted, target_rate, fmt, bitrate)
+            results.append((path, sample_rate, "resampled"))
+        except Exception as e:
+            print(f"   ❌ {path}: {e}")
+            results.append((path, None, "failed"))
+    return results
+
+
+def parse_category_rate(value):
+    category, _, rate = value.partition("=")
+    if category not in CATEGORIES or not rate.isdigit():
+        raise argparse.ArgumentTypeError(f"expected CATEGORY=RATE with CATEGORY in {', '.join(CATEGORIES)}")
+    return category, int(rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resample all audio clips to a common rate")
+    parser.add_argument("--rate", type=int, default=DEFAULT_RATE, help=f"target rate in Hz (default: {DEFAULT_RATE})")
+    parser.add_argument("--category-rate", type=parse_category_rate, action="append", default=[],
+                        metavar="CATEGORY=RATE", help="override the rate for one category (repeatable)")
+    parser.add_argument("--dry-run", action="store_true", help="report what would change without rewriting files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+    args = parser.parse_args()
+
+    rates = dict(CATEGORY_RATES, **dict(args.category_rate))
+    start_time = time.time()
+
+    print("=" * 60)
+    print("🎚️  Sample Rate Conversion")
+    print("=" * 60)
+    print()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        return
+
+    paths = list(iter_audio_files(args.dir))
+    if not HAS_PYDUB:
+        mp3_count = len(paths)
+        paths = [path for path in paths if sniff_format(path) == "wav"]
+        mp3_count -= len(paths)
+        if mp3_count:
+            print(f"⚠️  Skipping {mp3_count} MP3 clips - install pydub (and ffmpeg) to resample them")
+
+    for category in CATEGORIES:
+        print(f"   {category:<14} → {rates.get(category, args.rate)} Hz")
+    print()
+
+    jobs = [(path, rates.get(category_of(path), args.rate), args.dry_run) for path in paths]
+    batches = [jobs[i:i + BATCH_SIZE] for i in range(0, len(jobs), BATCH_SIZE)]
+
+    statuses = Counter()
+    source_rates = Counter()
+    processed = 0
+    with multiprocessing.Pool(args.workers) as pool:
+        for results in pool.imap_unordered(resample_batch, batches):
+            for path, from_rate, status in results:
+                statuses[status] += 1
+                if from_rate:
+                    source_rates[from_rate] += 1
+            processed += len(results)
+            print(f"      [{processed:4d}/{len(jobs)}]", end='\r')
+    print()
+
+    print("=" * 60)
+    print("📊 Summary:")
+    print(f"   Source rates: {', '.join(f'{rate} Hz × {count}' for rate, count in sorted(source_rates.items()))}")
+    print(f"   {'Would resample' if args.dry_run else 'Resampled'}: {statuses['resampled']}")
+    print(f"   Already at target: {statuses['unchanged']}")
+    print(f"   Failed: {statuses['failed']}")
+    print(f"   ⏱️  {time.time() - start_time:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Split audio generation across build nodes that share a filesystem.
+
+Each generator accepts --shard i/n and only renders the outputs whose path
+hashes to shard i (1-based) - a stable hash of the path relative to
+Resources/Audio, so every node agrees on the split without coordinating.
+Per-run state that would otherwise be shared (journals, build manifests)
+gets a per-shard file name.
+
+Every sharded run leaves a receipt in shard_receipts/. The verify step
+checks that all n receipts are present, were planned from the same expected
+file list, cover it exactly once and that every file exists, then folds the
+per-shard build and format manifests back into the main ones.
+
+The letter clips every shard composes its spellings from are rendered once,
+unsharded, before the shards start (generate_audio.py --letters-only).
+
+Usage:
+    python generate_audio.py --letters-only  # once, on any node
+    python generate_audio.py --shard 1/3     # on node 1 (and 2/3, 3/3 elsewhere)
+    python sharding.py verify [generator]
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+from collections import namedtuple
+from pathlib import Path
+
+from audio_io import resolve_clip
+
+# Configuration
+REPO_ROOT = Path(__file__).resolve().parent.parent
+AUDIO_ROOT = REPO_ROOT / "spelling-bee iOS App" / "Resources" / "Audio"
+RECEIPT_DIR = REPO_ROOT / "shard_receipts"
+
+Shard = namedtuple("Shard", ["index", "count"])
+
+
+def parse_shard(value):
+    """argparse type for 'i/n' with 1 <= i <= n"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/n (e.g. 2/4), got {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 1 and {count}, got {index}")
+    return Shard(index, count)
+
+
+def shard_key(output_path):
+    """Output path relative to Resources/Audio, with forward slashes - identical on every node"""
+    path = Path(os.path.abspath(output_path)).as_posix()
+    marker = "/Resources/Audio/"
+    return path.split(marker, 1)[1] if marker in path else Path(output_path).as_posix()
+
+
+def shard_of(output_path, count):
+    """1-based shard that owns output_path"""
+    digest = hashlib.sha256(shard_key(output_path).encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def in_shard(output_path, shard):
+    return shard is None or shard_of(output_path, shard.count) == shard.index
+
+
+def shard_path(path, shard):
+    """Per-shard variant of a state file path (unchanged when not sharding)"""
+    if shard is None:
+        return path
+    return f"{path}.shard-{shard.index}of{shard.count}"
+
+
+def write_receipt(generator, shard, expected, failed, manifest=None, formats=None):
+    """
+    Record what this shard was responsible for.
+    expected: every output path the full (unsharded) run would produce.
+    failed: how many of this shard's outputs could not be generated.
+    manifest: base build manifest path whose per-shard copy this run wrote, if any.
+    formats: base format manifest (AUDIO_FORMATS.json) path likewise.
+    """
+    keys = sorted(shard_key(path) for path in expected)
+    receipt = {
+        "generator": generator,
+        "shard": list(shard),
+        "expected_count": len(keys),
+        "expected_digest": hashlib.sha256("\n".join(keys).encode("utf-8")).hexdigest(),
+        "assigned": [key for key in keys if shard_of(key, shard.count) == shard.index],
+        "failed": failed,
+        "manifest": os.path.abspath(manifest) if manifest else None,
+        "formats": os.path.abspath(formats) if formats else None,
+    }
+
+    RECEIPT_DIR.mkdir(exist_ok=True)
+    receipt_path = RECEIPT_DIR / f"{generator}.{shard.index}of{shard.count}.json"
+    temp_path = receipt_path.with_name(receipt_path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(receipt, f, indent=2)
+    os.replace(temp_path, receipt_path)
+    return receipt_path
+
+
+def merge_manifest_shards(manifest_path, manifest_class):
+    """
+    Fold every per-shard copy of a manifest (a BuildManifest or FormatManifest)
+    into the main one. Returns the number merged.
+    """
+    shard_files = sorted(glob.glob(glob.escape(manifest_path) + ".shard-*"))
+    if not shard_files:
+        return 0
+
+    base = manifest_class(manifest_path)
+    original = dict(base.entries)
+    for shard_file in shard_files:
+        # Each shard copy starts from the main manifest, so anything that differs is that shard's own work
+        entries = manifest_class(shard_file).entries
+        for key, entry in entries.items():
+            if original.get(key) != entry:
+                base.entries[key] = entry
+        # ...and anything it no longer holds, it removed (a deleted stale file)
+        for key in original.keys() - entries.keys():
+            base.entries.pop(key, None)
+    base.save()
+
+    for shard_file in shard_files:
+        os.remove(shard_file)
+    return len(shard_files)
+
+
+def verify(generator):
+    """Check the receipts for one generator. Returns a list of problems (empty when complete)."""
+    receipts = []
+    for receipt_path in sorted(RECEIPT_DIR.glob(f"{generator}.*of*.json")):
+        with open(receipt_path, "r", encoding="utf-8") as f:
+            receipts.append(json.load(f))
+
+    counts = {receipt["shard"][1] for receipt in receipts}
+    if len(counts) != 1:
+        return [f"receipts from different shard counts: {sorted(counts)} (clear {RECEIPT_DIR} before re-splitting)"]
+    count = counts.pop()
+
+    problems = []
+    indices = {receipt["shard"][0] for receipt in receipts}
+    missing_shards = sorted(set(range(1, count + 1)) - indices)
+    if missing_shards:
+        problems.append(f"no receipt from shard(s) {', '.join(f'{i}/{count}' for i in missing_shards)}")
+
+    digests = {receipt["expected_digest"] for receipt in receipts}
+    if len(digests) != 1:
+        problems.append("shards were planned from different inputs (word bank or sentences changed mid-run)")
+
+    covered = set()
+    for receipt in receipts:
+        index = receipt["shard"][0]
+        if receipt["failed"]:
+            problems.append(f"shard {index}/{count} reported {receipt['failed']} failed files")
+        for key in receipt["assigned"]:
+            if shard_of(key, count) != index:
+                problems.append(f"{key} was rendered by shard {index}/{count} but belongs to another")
+            if key in covered:
+                problems.append(f"{key} was rendered by more than one shard")
+            covered.add(key)
+
+    expected_count = receipts[0]["expected_count"]
+    if not missing_shards and len(covered) != expected_count:
+        problems.append(f"shards cover {len(covered)} of {expected_count} expected files")
+
+    # Generators without pydub write .mp3 where .wav was declared - either one counts
+    missing_files = [key for key in sorted(covered)
+                     if resolve_clip(os.path.splitext(AUDIO_ROOT / key)[0]) is None]
+    for key in missing_files[:10]:
+        problems.append(f"missing on disk: {key}")
+    if len(missing_files) > 10:
+        problems.append(f"... and {len(missing_files) - 10} more missing files")
+
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify and merge sharded audio generation runs")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    verify_parser = subparsers.add_parser("verify", help="check shard receipts cover the expected files")
+    verify_parser.add_argument("generator", nargs="?", help="only check this generator (default: all)")
+    args = parser.parse_args()
+
+    generators = sorted({path.name.split(".")[0] for path in RECEIPT_DIR.glob("*of*.json")})
+    if args.generator:
+        generators = [g for g in generators if g == args.generator]
+    if not generators:
+        print(f"❌ No shard receipts found in {RECEIPT_DIR}")
+        sys.exit(1)
+
+    all_ok = True
+    for generator in generators:
+        problems = verify(generator)
+        if problems:
+            all_ok = False
+            print(f"❌ {generator}:")
+            for problem in problems:
+                print(f"   - {problem}")
+            continue
+
+        # Both modules import this one
+        from audio_output import FormatManifest
+        from build_manifest import BuildManifest
+
+        manifests = set()
+        for receipt_path in RECEIPT_DIR.glob(f"{generator}.*of*.json"):
+            with open(receipt_path, "r", encoding="utf-8") as f:
+                receipt = json.load(f)
+            if receipt["manifest"]:
+                manifests.add((receipt["manifest"], BuildManifest))
+            if receipt.get("formats"):
+                manifests.add((receipt["formats"], FormatManifest))
+        merged = sum(merge_manifest_shards(path, manifest_class) for path, manifest_class in manifests)
+
+        print(f"✅ {generator}: all shards complete")
+        if merged:
+            print(f"   Merged {merged} per-shard build and format manifests")
+
+    sys.exit(0 if all_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
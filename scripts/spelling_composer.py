@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compose letter-by-letter spelling clips from the 26 letter clips.
+
+A spelled word is just the letters A-Z that the letters phase already
+renders, so instead of sending "C, A, T" through TTS we trim the cached
+letters/*.wav clips and concatenate them with a configurable gap and a
+short fade at every clip edge (clips overlap, i.e. crossfade, when the gap
+is zero or negative).
+
+Usage:
+    python spelling_composer.py [--gap 0.25] [--crossfade 0.01]
+"""
+
+import argparse
+import json
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from audio_io import read_audio, write_wav
+from job_journal import atomic_output
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+LETTER_GAP_SECONDS = 0.25  # Silence between letters
+CROSSFADE_SECONDS = 0.01  # Fade length at each clip edge
+TRIM_THRESHOLD = 0.02  # Fraction of a clip's peak treated as silence when trimming
+
+
+def trim_clip(samples, threshold=TRIM_THRESHOLD):
+    """Strip leading and trailing near-silence so gaps between letters stay consistent"""
+    if not samples.size:
+        return samples
+    loud = np.flatnonzero(np.abs(samples) > threshold * np.abs(samples).max())
+    if not loud.size:
+        return samples[:0]
+    return samples[loud[0]:loud[-1] + 1]
+
+
+class SpellingComposer:
+    def __init__(self, letters_dir, gap_seconds=LETTER_GAP_SECONDS, crossfade_seconds=CROSSFADE_SECONDS):
+        """Load all 26 letter clips. Raises if any is missing or can't be decoded."""
+        self.letters = {}
+        self.sample_rate = None
+
+        for letter in "abcdefghijklmnopqrstuvwxyz":
+            samples, sample_rate, _ = read_audio(Path(letters_dir) / f"{letter}.wav")
+            if self.sample_rate is None:
+                self.sample_rate = sample_rate
+            elif sample_rate != self.sample_rate:
+                raise ValueError(f"letters/{letter}.wav is {sample_rate} Hz, expected {self.sample_rate} Hz")
+            self.letters[letter] = trim_clip(samples)
+
+        self.gap = int(round(gap_seconds * self.sample_rate))
+        self.crossfade = int(round(crossfade_seconds * self.sample_rate))
+
+        # Fade every letter once up front; compose() then only adds clips into a buffer
+        for letter, samples in self.letters.items():
+            fade = min(self.crossfade, len(samples) // 2)
+            if fade:
+                ramp = np.linspace(0.0, 1.0, fade, endpoint=False, dtype=np.float32)
+                samples = samples.copy()
+                samples[:fade] *= ramp
+                samples[-fade:] *= ramp[::-1]
+            self.letters[letter] = samples
+
+    def compose(self, word):
+        """Return the spelled-out word as float samples"""
+        clips = [self.letters[ch] for ch in word.lower() if ch in self.letters]
+        if not clips:
+            return np.zeros(0, dtype=np.float32)
+
+        # Each clip starts `gap` samples after the previous one ends, minus the fade overlap
+        step = self.gap - self.crossfade
+        starts = np.cumsum([0] + [len(clip) + step for clip in clips[:-1]])
+        starts -= min(starts.min(), 0)
+        total = int(max(start + len(clip) for start, clip in zip(starts, clips)))
+
+        output = np.zeros(total, dtype=np.float32)
+        for start, clip in zip(starts, clips):
+            output[start:start + len(clip)] += clip
+        return output
+
+    def compose_to_file(self, word, output_path):
+        with atomic_output(output_path) as temp_path:
+            write_wav(temp_path, self.compose(word), self.sample_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compose spelling clips from letter clips")
+    parser.add_argument("--gap", type=float, default=LETTER_GAP_SECONDS, help="seconds of silence between letters")
+    parser.add_argument("--crossfade", type=float, default=CROSSFADE_SECONDS, help="fade length at each clip edge")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    if not os.path.exists('word_bank.json'):
+        print("❌ word_bank.json not found!")
+        print("   Please run: python export_word_bank.py")
+        return
+
+    with open('word_bank.json', 'r') as f:
+        word_bank = {int(k): v for k, v in json.load(f).items()}
+
+    output_dir = Path(OUTPUT_DIR)
+    try:
+        composer = SpellingComposer(output_dir / "letters", args.gap, args.crossfade)
+    except Exception as e:
+        print(f"❌ Could not load letter clips: {e}")
+        print("   Generate letters first: python generate_audio.py")
+        return
+
+    composed = 0
+    for difficulty, words in sorted(word_bank.items()):
+        for word in words:
+            output_path = output_dir / f"spelling/difficulty_{difficulty}/{word}_spelled.wav"
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            composer.compose_to_file(word, output_path)
+            composed += 1
+
+    print(f"✅ Composed {composed} spelling clips in {time.time() - start_time:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
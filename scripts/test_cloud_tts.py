@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Tests for cloud_tts.py against a local stub HTTP server.
+
+The stub answers each request with the next scripted (status, headers)
+response - 200s carry a fake audio body - and records when it was asked,
+so retries, the circuit breaker and the token buckets can be checked
+without a vendor account.
+
+Usage:
+    python -m unittest test_cloud_tts     # or: python -m pytest test_cloud_tts.py
+"""
+
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+
+from aiohttp import web
+
+from cloud_tts import CircuitBreaker, CloudTTSEngine, RateLimiter, RetryPolicy, SynthesisError
+
+AUDIO = b"RIFF-stub-audio"
+
+
+class StubServer:
+    """ElevenLabs-shaped endpoint replaying scripted responses (then 200 forever)"""
+
+    def __init__(self, responses=()):
+        self.responses = list(responses)
+        self.request_times = []
+
+    async def handle(self, request):
+        await request.json()
+        self.request_times.append(time.monotonic())
+        status, headers = self.responses.pop(0) if self.responses else (200, {})
+        if status == 200:
+            return web.Response(body=AUDIO, content_type="audio/wav")
+        return web.Response(status=status, headers=headers, text="stub error")
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_post("/v1/text-to-speech/{voice}", self.handle)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        host, port = self.runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}/v1/text-to-speech/lisa"
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+
+class CloudTTSEngineTest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.output_dir = tempfile.TemporaryDirectory()
+
+    async def asyncTearDown(self):
+        self.output_dir.cleanup()
+
+    async def run_engine(self, responses, texts=("Hello there.",), **engine_options):
+        """Start a stub with `responses`, synthesize texts through it. Returns (stub, engine, errors)."""
+        stub = StubServer(responses)
+        await stub.start()
+
+        async def synthesize(session, text):
+            async with session.post(stub.url, json={"text": text}) as response:
+                body = await response.read()
+                if response.status != 200:
+                    raise SynthesisError(f"{response.status}", status=response.status,
+                                         headers=dict(response.headers))
+                return body
+
+        options = dict(concurrency=1, requests_per_second=100.0, characters_per_minute=100000,
+                       retry=RetryPolicy(max_attempts=4, base_delay=0.01, max_delay=1.0),
+                       breaker=CircuitBreaker(failure_threshold=10, cooldown_seconds=1.0))
+        options.update(engine_options)
+        engine = CloudTTSEngine(synthesize, **options)
+
+        errors = {}
+        jobs = [(text, os.path.join(self.output_dir.name, f"{i}.wav")) for i, text in enumerate(texts)]
+        try:
+            await engine.run(jobs, lambda job, error: errors.__setitem__(job[1], error))
+        finally:
+            await stub.stop()
+        return stub, engine, errors
+
+    async def test_transient_failures_are_retried(self):
+        stub, engine, errors = await self.run_engine([(429, {"Retry-After": "0"}), (500, {})])
+        self.assertEqual(len(stub.request_times), 3)
+        self.assertEqual(engine.retries, 2)
+        self.assertEqual(list(errors.values()), [None])
+        with open(next(iter(errors)), "rb") as f:
+            self.assertEqual(f.read(), AUDIO)
+        # The 429 lowered the request rate; one success only creeps it back part of the way
+        self.assertLess(engine.limiter.requests.rate, 100.0)
+
+    async def test_retry_after_is_honored(self):
+        stub, _, errors = await self.run_engine([(429, {"Retry-After": "0.3"})])
+        self.assertEqual(list(errors.values()), [None])
+        self.assertGreaterEqual(stub.request_times[1] - stub.request_times[0], 0.28)
+
+    async def test_gives_up_after_max_attempts(self):
+        stub, _, errors = await self.run_engine([(503, {})] * 10,
+                                                retry=RetryPolicy(max_attempts=3, base_delay=0.01))
+        self.assertEqual(len(stub.request_times), 3)
+        error = next(iter(errors.values()))
+        self.assertIsInstance(error, SynthesisError)
+        self.assertEqual(error.status, 503)
+
+    async def test_permanent_failures_are_not_retried(self):
+        stub, engine, errors = await self.run_engine([(400, {})])
+        self.assertEqual(len(stub.request_times), 1)
+        self.assertEqual(engine.retries, 0)
+        self.assertEqual(next(iter(errors.values())).status, 400)
+
+    async def test_circuit_breaker_opens_after_repeated_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, cooldown_seconds=0.3)
+        stub, _, errors = await self.run_engine(
+            [(500, {}), (500, {})], texts=["One.", "Two."],
+            retry=RetryPolicy(max_attempts=4, base_delay=0.0), breaker=breaker)
+        self.assertEqual(list(errors.values()), [None, None])
+        self.assertEqual(len(stub.request_times), 4)
+        # The second failure opened the circuit: the retry waited out the cooldown
+        self.assertGreaterEqual(stub.request_times[2] - stub.request_times[1], 0.28)
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    async def test_open_circuit_holds_every_worker_until_the_probe_succeeds(self):
+        breaker = CircuitBreaker(failure_threshold=1, cooldown_seconds=0.2)
+        await breaker.record_failure()
+        start = time.monotonic()
+        waiters = [asyncio.create_task(breaker.acquire()) for _ in range(3)]
+        done, pending = await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        # One probe after the cooldown, everybody else still waiting on it
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertEqual((len(done), len(pending)), (1, 2))
+        await asyncio.sleep(0.05)
+        self.assertEqual(sum(waiter.done() for waiter in waiters), 1)
+        await breaker.record_success()
+        await asyncio.wait_for(asyncio.gather(*waiters), 1.0)
+
+    async def test_request_bucket_holds_configured_rate(self):
+        rate = 20.0
+        texts = [f"Sentence {i}." for i in range(30)]
+        start = time.monotonic()
+        _, _, errors = await self.run_engine([], texts=texts, concurrency=8, requests_per_second=rate)
+        elapsed = time.monotonic() - start
+        self.assertTrue(all(error is None for error in errors.values()))
+        # A full bucket allows a burst of `rate` requests; the rest are paced at `rate` per second
+        self.assertGreaterEqual(elapsed, (len(texts) - rate) / rate * 0.9)
+
+    async def test_character_bucket_holds_configured_rate(self):
+        limiter = RateLimiter(requests_per_second=1000, characters_per_minute=600)  # 10 characters a second
+        await limiter.acquire("x" * 600)  # The whole minute's budget at once
+        start = time.monotonic()
+        await limiter.acquire("x" * 5)
+        self.assertGreaterEqual(time.monotonic() - start, 0.45)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Derive slowed-down variants of existing clips without re-synthesizing.
+
+WSOLA (waveform-similarity overlap-add): the output is built from windowed
+frames at a fixed synthesis hop, read from the input at hop × speed. Each
+frame is shifted within a small tolerance to the position whose waveform
+best continues the previous frame (the cross-correlation peak), so the
+periods line up and pitch is preserved - no phasiness, no chipmunk effect.
+
+Variants go to parallel trees next to the originals:
+    Audio/slow/75/words/difficulty_1/cat.wav    (0.75× speed)
+    Audio/slow/50/words/difficulty_1/cat.wav    (0.5× speed)
+
+Usage:
+    python time_stretch.py [--speeds 0.75 0.5] [--categories words spelling] [--workers N]
+    python time_stretch.py --benchmark
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+
+import numpy as np
+
+from audio_io import (HAS_PYDUB, category_of, iter_audio_files, mp3_bitrate, read_audio, sniff_format,
+                      write_audio)
+from job_journal import atomic_output
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+SLOW_DIR = "slow"  # Variants live in Audio/slow/<percent>/... (one of audio_io.DERIVED_DIRS)
+DEFAULT_SPEEDS = [0.75, 0.5]
+DEFAULT_CATEGORIES = ["words", "spelling"]
+FRAME_MS = 40  # Long enough to hold a couple of pitch periods of a low voice
+TOLERANCE_MS = 10  # How far a frame may move to line up with the previous one
+
+
+def wsola(samples, sample_rate, speed):
+    """Play samples at speed (0.5 = half as fast) with pitch unchanged"""
+    frame = 2 * (int(sample_rate * FRAME_MS / 1000) // 2)
+    hop = frame // 2
+    tolerance = int(sample_rate * TOLERANCE_MS / 1000)
+    output_length = int(round(len(samples) / speed))
+    frames = output_length // hop + 2
+
+    # Periodic Hann windows at 50% overlap sum to exactly one
+    window = np.hanning(frame + 1)[:-1].astype(np.float32)
+    margin = frame + tolerance
+    padded = np.concatenate([np.zeros(margin, np.float32), samples.astype(np.float32),
+                             np.zeros(margin + frame, np.float32)])
+    output = np.zeros(frames * hop + frame, np.float32)
+
+    previous = None
+    for k in range(frames):
+        # Frame k is centred on output sample k*hop and input sample k*hop*speed
+        nominal = margin + int(round(k * hop * speed)) - hop
+        if previous is None:
+            start = nominal
+        else:
+            natural = padded[previous + hop:previous + hop + frame]
+            region = padded[nominal - tolerance:nominal + tolerance + frame]
+            start = nominal - tolerance + int(np.argmax(np.correlate(region, natural, mode='valid')))
+        output[k * hop:k * hop + frame] += padded[start:start + frame] * window
+        previous = start
+
+    return output[hop:hop + output_length]
+
+
+def variant_path(path, root, speed):
+    """Where the speed variant of path goes: root/slow/<percent>/<path relative to root>"""
+    return os.path.join(root, SLOW_DIR, str(int(round(speed * 100))), os.path.relpath(path, root))
+
+
+def stretch_file(job):
+    """Worker: write every speed variant of one clip. Returns (path, audio seconds in, variants written)."""
+    path, root, speeds, force = job
+    targets = [(speed, variant_path(path, root, speed)) for speed in speeds]
+    source_mtime = os.path.getmtime(path)
+    targets = [(speed, target) for speed, target in targets
+               if force or not os.path.exists(target) or os.path.getmtime(target) < source_mtime]
+    if not targets:
+        return path, 0.0, 0
+
+    try:
+        samples, sample_rate, fmt = read_audio(path)
+        bitrate = mp3_bitrate(path, len(samples) / sample_rate) if fmt == "mp3" else None
+        for speed, target in targets:
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with atomic_output(target) as temp_path:
+                write_audio(temp_path, wsola(samples, sample_rate, speed), sample_rate, fmt, bitrate)
+        return path, len(samples) / sample_rate, len(targets)
+    except Exception as e:
+        print(f"   ❌ {path}: {e}")
+        return path, 0.0, -1
+
+
+def benchmark(seconds=30.0, sample_rate=22050):
+    """Single-core throughput: seconds of audio stretched per second of CPU"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * sample_rate)) / sample_rate
+    # A voiced-speech stand-in: harmonics of a wobbling 140 Hz fundamental plus breath noise
+    phase = 2 * np.pi * np.cumsum(140 + 20 * np.sin(2 * np.pi * 3 * t)) / sample_rate
+    samples = sum(np.sin(h * phase) / h for h in range(1, 8)) * 0.2 + rng.normal(0, 0.01, len(t))
+    samples = samples.astype(np.float32)
+
+    print(f"⏱️  WSOLA benchmark: {seconds:.0f}s of audio at {sample_rate} Hz, one core")
+    for speed in DEFAULT_SPEEDS:
+        start = time.process_time()
+        stretched = wsola(samples, sample_rate, speed)
+        elapsed = time.process_time() - start
+        print(f"   {speed:.2f}×  → {len(stretched) / sample_rate:5.1f}s output in {elapsed:.2f}s CPU "
+              f"({seconds / elapsed:6.1f}× realtime per core)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Derive slowed-down clip variants with WSOLA time-stretching")
+    parser.add_argument("--speeds", type=float, nargs="+", default=DEFAULT_SPEEDS,
+                        help="playback speeds to derive (default: 0.75 0.5)")
+    parser.add_argument("--categories", nargs="+", default=DEFAULT_CATEGORIES)
+    parser.add_argument("--force", action="store_true", help="rewrite variants that are already up to date")
+    parser.add_argument("--benchmark", action="store_true", help="measure single-core throughput and exit")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark()
+        return
+    if not all(0.1 <= speed < 1.0 for speed in args.speeds):
+        parser.error("speeds must be between 0.1 and 1.0")
+
+    start_time = time.time()
+
+    print("=" * 60)
+    print("🐢 Slow-Mode Variants (WSOLA)")
+    print("=" * 60)
+    print()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        return
+
+    # iter_audio_files skips the slow/ tree, so variants are never stretched again
+    paths = [path for path in iter_audio_files(args.dir) if category_of(path) in args.categories]
+    if not HAS_PYDUB:
+        mp3_count = len(paths)
+        paths = [path for path in paths if sniff_format(path) != "mp3"]
+        mp3_count -= len(paths)
+        if mp3_count:
+            print(f"⚠️  Skipping {mp3_count} MP3 clips - install pydub (and ffmpeg) to stretch them")
+    print(f"   {len(paths)} clips in {', '.join(args.categories)} → "
+          f"{', '.join(f'{speed}×' for speed in args.speeds)}, {args.workers} workers")
+    print()
+
+    audio_seconds = 0.0
+    written = failed = 0
+    jobs = [(path, args.dir, args.speeds, args.force) for path in paths]
+    with multiprocessing.Pool(args.workers) as pool:
+        for processed, (path, seconds, variants) in enumerate(pool.imap_unordered(stretch_file, jobs, chunksize=4), 1):
+            if variants < 0:
+                failed += 1
+            else:
+                audio_seconds += seconds
+                written += variants
+            print(f"      [{processed:4d}/{len(jobs)}]", end='\r')
+    print()
+
+    elapsed = time.time() - start_time
+    print("=" * 60)
+    print("📊 Summary:")
+    print(f"   Variants written: {written}")
+    print(f"   Up to date: {len(jobs) * len(args.speeds) - written - failed * len(args.speeds)}")
+    print(f"   Failed: {failed}")
+    if audio_seconds:
+        per_core = audio_seconds * len(args.speeds) / elapsed / args.workers
+        print(f"   Throughput: {audio_seconds / 60:.1f} min of source audio, "
+              f"{per_core:.1f}× realtime per core")
+    print(f"   Output: {os.path.join(args.dir, SLOW_DIR)}")
+    print(f"   ⏱️  {elapsed:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Trim leading and trailing silence from every clip in the Audio tree.
+
+gTTS and Coqui clips start and end with silence that the app pays for as
+playback latency and bundle size. Each clip is split into short frames,
+speech onset/offset are the first and last frames whose energy is within
+THRESHOLD_DB of the loudest frame, and everything outside them (plus a small
+pad) is cut with a short fade. Files are rewritten in place, in their
+original format, across a process pool.
+
+Usage:
+    python trim_silence.py [--dry-run] [--workers N] [--threshold-db -40]
+"""
+
+import argparse
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+
+import numpy as np
+
+from audio_io import (HAS_PYDUB, CATEGORIES, category_of, iter_audio_files, mp3_bitrate, read_audio,
+                      sniff_format, write_audio)
+from job_journal import atomic_output
+
+# Configuration
+OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+FRAME_MS = 10  # Energy is measured per frame of this length
+THRESHOLD_DB = -40.0  # Frames quieter than this (relative to the loudest frame) are silence
+SILENCE_FLOOR_DB = -60.0  # A clip whose loudest frame is below this (dBFS) is silent - left alone
+PAD_MS = 30  # Silence kept before onset and after offset so consonants aren't clipped
+FADE_MS = 5  # Fade in/out at the new edges
+MIN_SAVING_MS = 20  # Don't rewrite a file to save less than this
+
+
+def frame_energy_db(samples, frame_length):
+    """Mean-square energy (dBFS) of consecutive frames; a partial last frame is zero-padded"""
+    frames = -(-len(samples) // frame_length)
+    padded = np.zeros(frames * frame_length, dtype=np.float32)
+    padded[:len(samples)] = samples
+    energy = np.square(padded.reshape(frames, frame_length)).mean(axis=1)
+    return 10.0 * np.log10(np.maximum(energy, 1e-12))
+
+
+def speech_bounds(samples, sample_rate, threshold_db=THRESHOLD_DB):
+    """(start, end) sample indices to keep, or None if the clip is silent"""
+    frame_length = max(1, int(sample_rate * FRAME_MS / 1000))
+    energy = frame_energy_db(samples, frame_length)
+    if not energy.size or energy.max() < SILENCE_FLOOR_DB:
+        return None
+
+    voiced = np.flatnonzero(energy >= energy.max() + threshold_db)
+    pad = int(sample_rate * PAD_MS / 1000)
+    start = max(0, voiced[0] * frame_length - pad)
+    end = min(len(samples), (voiced[-1] + 1) * frame_length + pad)
+    return start, end
+
+
+def trim(samples, sample_rate, start, end):
+    """Cut samples to [start, end) with a short fade at each new edge"""
+    trimmed = samples[start:end].copy()
+    fade = min(int(sample_rate * FADE_MS / 1000), len(trimmed) // 2)
+    if fade:
+        ramp = np.linspace(0.0, 1.0, fade, endpoint=False, dtype=np.float32)
+        if start > 0:
+            trimmed[:fade] *= ramp
+        if end < len(samples):
+            trimmed[-fade:] *= ramp[::-1]
+    return trimmed
+
+
+def trim_file(job):
+    """Worker: trim one file in place. Returns (category, status, bytes_saved, ms_saved)."""
+    path, threshold_db, dry_run = job
+    category = category_of(path)
+    try:
+        samples, sample_rate, fmt = read_audio(path)
+        bounds = speech_bounds(samples, sample_rate, threshold_db)
+        if bounds is None:
+            return category, "silent", 0, 0.0
+
+        start, end = bounds
+        ms_saved = (len(samples) - (end - start)) * 1000.0 / sample_rate
+        if ms_saved < MIN_SAVING_MS:
+            return category, "unchanged", 0, 0.0
+
+        size_before = os.path.getsize(path)
+        if dry_run:
+            # Estimate: size scales with duration for both PCM and constant-bitrate MP3
+            return category, "trimmed", int(size_before * ms_saved * sample_rate / len(samples) / 1000), ms_saved
+
+        bitrate = mp3_bitrate(path, len(samples) / sample_rate) if fmt == "mp3" else None
+        with atomic_output(path) as temp_path:
+            write_audio(temp_path, trim(samples, sample_rate, start, end), sample_rate, fmt, bitrate)
+        return category, "trimmed", size_before - os.path.getsize(path), ms_saved
+    except Exception as e:
+        print(f"   ❌ {path}: {e}")
+        return category, "failed", 0, 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trim leading/trailing silence from all audio clips")
+    parser.add_argument("--dry-run", action="store_true", help="report savings without rewriting files")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--threshold-db", type=float, default=THRESHOLD_DB,
+                        help="silence threshold relative to the loudest frame (default: -40)")
+    parser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+    args = parser.parse_args()
+
+    start_time = time.time()
+
+    print("=" * 60)
+    print("✂️  Silence Trimming")
+    print("=" * 60)
+    print()
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Audio directory not found: {args.dir}")
+        return
+
+    paths = list(iter_audio_files(args.dir))
+    if not HAS_PYDUB:
+        mp3_count = len(paths)
+        paths = [path for path in paths if sniff_format(path) == "wav"]
+        mp3_count -= len(paths)
+        if mp3_count:
+            print(f"⚠️  Skipping {mp3_count} MP3 clips - install pydub (and ffmpeg) to trim them")
+    print(f"   {len(paths)} clips, {args.workers} workers{' (dry run)' if args.dry_run else ''}")
+    print()
+
+    counts = defaultdict(lambda: defaultdict(int))
+    bytes_saved = defaultdict(int)
+    ms_saved = defaultdict(float)
+
+    jobs = [(path, args.threshold_db, args.dry_run) for path in paths]
+    with multiprocessing.Pool(args.workers) as pool:
+        for processed, (category, status, saved_bytes, saved_ms) in enumerate(
+                pool.imap_unordered(trim_file, jobs, chunksize=8), 1):
+            counts[category][status] += 1
+            bytes_saved[category] += saved_bytes
+            ms_saved[category] += saved_ms
+            print(f"      [{processed:4d}/{len(jobs)}]", end='\r')
+    print()
+
+    print(f"{'Category':<14}{'Trimmed':>9}{'Silent':>8}{'Failed':>8}{'KB saved':>11}{'ms saved':>12}")
+    print("-" * 62)
+    for category in CATEGORIES + ["other"]:
+        if category not in counts:
+            continue
+        c = counts[category]
+        print(f"{category:<14}{c['trimmed']:>9}{c['silent']:>8}{c['failed']:>8}"
+              f"{bytes_saved[category] / 1024:>11.1f}{ms_saved[category]:>12.0f}")
+    print("-" * 62)
+
+    total_trimmed = sum(c["trimmed"] for c in counts.values())
+    total_silent = sum(c["silent"] for c in counts.values())
+    total_failed = sum(c["failed"] for c in counts.values())
+    print(f"{'Total':<14}{total_trimmed:>9}{total_silent:>8}{total_failed:>8}"
+          f"{sum(bytes_saved.values()) / 1024:>11.1f}{sum(ms_saved.values()):>12.0f}")
+    print()
+    print(f"⏱️  {time.time() - start_time:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
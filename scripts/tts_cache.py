@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Content-addressed on-disk cache for synthesized audio.
+
+Every generator renders the same text many times (words repeat across
+difficulties, reruns start from scratch). Renders are keyed by a hash of
+(engine, model/voice, text, params) so a repeat costs one file copy instead
+of one inference or API call. Entries are copied, never hardlinked, into the
+Audio tree: a bundle file edited in place must not change the cache, and
+refreshing an entry's mtime must not touch the bundle. The cache is
+size-bounded and evicts least-recently-used entries (tracked via file mtime,
+refreshed on every hit).
+
+Usage:
+    python tts_cache.py stats
+    python tts_cache.py clear
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from job_journal import atomic_output
+
+# Configuration
+CACHE_DIR = os.environ.get("SPELLFLARE_TTS_CACHE", str(Path.home() / ".cache" / "spellflare" / "tts"))
+MAX_CACHE_BYTES = int(os.environ.get("SPELLFLARE_TTS_CACHE_MB", "2048")) * 1024 * 1024
+
+
+class SynthesisCache:
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._total_bytes = None  # Computed lazily on the first store
+
+    @staticmethod
+    def key(engine, voice, text, **params):
+        """Stable hash of everything that affects the rendered audio"""
+        payload = json.dumps(
+            {"engine": engine, "voice": voice, "text": text, "params": params},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _entry_path(self, key):
+        return self.cache_dir / key[:2] / key
+
+    def fetch(self, key, output_path):
+        """Materialize a cached render at output_path. Returns True on a hit."""
+        entry = self._entry_path(key)
+        if not entry.exists():
+            self.misses += 1
+            return False
+
+        # A copy, not a link - the bundle file and the entry must not share an inode
+        with atomic_output(output_path) as temp_path:
+            shutil.copyfile(entry, temp_path)
+
+        os.utime(entry)  # Mark as recently used
+        self.hits += 1
+        return True
+
+    def store(self, key, source_path):
+        """Add a freshly rendered file to the cache"""
+        entry = self._entry_path(key)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = entry.with_name(entry.name + f".{os.getpid()}.tmp")
+        shutil.copyfile(source_path, temp_path)
+        os.replace(temp_path, entry)
+
+        if self._total_bytes is None:
+            self._total_bytes = sum(e.stat().st_size for e in self.entries())
+        else:
+            self._total_bytes += entry.stat().st_size
+        if self._total_bytes > self.max_bytes:
+            self.evict()
+
+    def render(self, engine, voice, text, output_path, synthesize, **params):
+        """
+        Produce output_path for text, going to the engine only on a cache miss.
+        synthesize(path) must write the rendered audio to path (a temp file that
+        is renamed to output_path once complete).
+        """
+        key = self.key(engine, voice, text, **params)
+        if self.fetch(key, output_path):
+            return True
+
+        with atomic_output(output_path) as temp_path:
+            synthesize(temp_path)
+        self.store(key, output_path)
+        return False
+
+    def entries(self):
+        for shard in self.cache_dir.iterdir():
+            if not shard.is_dir():
+                continue
+            for entry in shard.iterdir():
+                if entry.name.endswith(".tmp"):
+                    continue
+                yield entry
+
+    def evict(self):
+        """Drop least-recently-used entries until the cache fits max_bytes"""
+        entries = []
+        total = 0
+        for entry in self.entries():
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry))
+            total += stat.st_size
+
+        self._total_bytes = total
+        if total <= self.max_bytes:
+            return 0
+
+        evicted = 0
+        for _, size, entry in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            evicted += 1
+        self._total_bytes = total
+        return evicted
+
+    def summary(self):
+        lookups = self.hits + self.misses
+        rate = (self.hits / lookups * 100) if lookups else 0.0
+        return f"{self.hits} hits / {lookups} lookups ({rate:.1f}%)"
+
+
+def main():
+    cache = SynthesisCache()
+    command = sys.argv[1] if len(sys.argv) > 1 else "stats"
+
+    if command == "stats":
+        sizes = [entry.stat().st_size for entry in cache.entries()]
+        print(f"📦 TTS cache: {cache.cache_dir}")
+        print(f"   Entries: {len(sizes)}")
+        print(f"   Size: {sum(sizes) / 1024 / 1024:.1f} MB (limit {cache.max_bytes / 1024 / 1024:.0f} MB)")
+    elif command == "clear":
+        shutil.rmtree(cache.cache_dir)
+        print(f"🗑️  Cleared {cache.cache_dir}")
+    else:
+        print(f"❌ Unknown command: {command}")
+        print("   Usage: python tts_cache.py [stats|clear]")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
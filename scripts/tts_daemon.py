@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Long-lived local Coqui TTS server that keeps models warm between runs.
+
+Every generate_audio.py run re-imports TTS.api and reloads tacotron2-DDC plus
+its vocoder before producing a single file. The daemon loads each model once,
+keyed by model name, and serves synthesis requests over a Unix socket, so an
+incremental run that touches a handful of words starts instantly.
+
+Protocol: one JSON object per line in each direction.
+    {"op": "tts_to_file", "model": ..., "text": ..., "file_path": ...}
+    {"op": "batch_to_files", "model": ..., "texts": [...], "file_paths": [...]}
+    {"op": "load", "model": ...} / {"op": "ping"} / {"op": "shutdown"}
+Every response is {"ok": true, ...} or {"ok": false, "error": "..."}.
+
+Usage:
+    python tts_daemon.py serve [--preload MODEL]
+    python tts_daemon.py status
+    python tts_daemon.py stop
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+import time
+
+# Configuration
+SOCKET_PATH = os.environ.get("SPELLFLARE_TTS_SOCKET", "/tmp/spellflare-tts.sock")
+STARTUP_TIMEOUT_SECONDS = 30
+
+
+class SynthesisServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path):
+        super().__init__(socket_path, RequestHandler)
+        self.models = {}
+        self.model_locks = {}
+        self.registry_lock = threading.Lock()
+
+    def model(self, model_name):
+        """Return (tts, lock) for model_name, loading it on first use"""
+        with self.registry_lock:
+            if model_name not in self.models:
+                from TTS.api import TTS
+
+                print(f"🔧 Loading {model_name}...", flush=True)
+                self.models[model_name] = TTS(model_name=model_name, progress_bar=False)
+                self.model_locks[model_name] = threading.Lock()
+                print(f"   ✅ {model_name} ready", flush=True)
+            return self.models[model_name], self.model_locks[model_name]
+
+    def dispatch(self, request):
+        op = request.get("op")
+
+        if op == "ping":
+            return {"ok": True, "models": sorted(self.models)}
+
+        if op == "load":
+            self.model(request["model"])
+            return {"ok": True}
+
+        if op == "tts_to_file":
+            tts, lock = self.model(request["model"])
+            with lock:  # A model instance is not safe to run from two threads
+                tts.tts_to_file(text=request["text"], file_path=request["file_path"])
+            return {"ok": True}
+
+        if op == "batch_to_files":
+            from coqui_batch import batch_to_files
+
+            tts, lock = self.model(request["model"])
+            with lock:
+                batch_to_files(tts.synthesizer, request["texts"], request["file_paths"])
+            return {"ok": True}
+
+        if op == "shutdown":
+            # shutdown() blocks until serve_forever returns, so it can't run on this thread
+            threading.Thread(target=self.shutdown).start()
+            return {"ok": True}
+
+        return {"ok": False, "error": f"Unknown op: {op}"}
+
+
+class RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                response = self.server.dispatch(json.loads(line))
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class TTSClient:
+    """Thin stand-in for TTS.api.TTS that forwards synthesis to the daemon"""
+
+    def __init__(self, model_name, socket_path=SOCKET_PATH):
+        self.model_name = model_name
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(socket_path)
+        self.reader = self.sock.makefile("rb")
+
+    @classmethod
+    def connect(cls, model_name, socket_path=SOCKET_PATH, autostart=True):
+        """Connect to the daemon, starting one in the background if none is running"""
+        try:
+            client = cls(model_name, socket_path)
+        except OSError:
+            if not autostart:
+                raise
+            start_daemon(socket_path)
+            client = cls(model_name, socket_path)
+
+        client.call(op="load", model=model_name)
+        return client
+
+    def call(self, **request):
+        self.sock.sendall((json.dumps(request) + "\n").encode("utf-8"))
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("TTS daemon closed the connection")
+        response = json.loads(line)
+        if not response["ok"]:
+            raise RuntimeError(response["error"])
+        return response
+
+    def tts_to_file(self, text, file_path):
+        # The daemon has its own working directory, so always send absolute paths
+        self.call(op="tts_to_file", model=self.model_name, text=text,
+                  file_path=os.path.abspath(file_path))
+
+    def batch_to_files(self, texts, file_paths):
+        self.call(op="batch_to_files", model=self.model_name, texts=list(texts),
+                  file_paths=[os.path.abspath(path) for path in file_paths])
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+
+def start_daemon(socket_path=SOCKET_PATH):
+    """Launch `tts_daemon.py serve` detached and wait for its socket to accept connections"""
+    subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "serve", "--socket", socket_path],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+    deadline = time.time() + STARTUP_TIMEOUT_SECONDS
+    while time.time() < deadline:
+        if is_running(socket_path):
+            return
+        time.sleep(0.1)
+    raise TimeoutError(f"TTS daemon did not start within {STARTUP_TIMEOUT_SECONDS}s")
+
+
+def is_running(socket_path=SOCKET_PATH):
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def serve(socket_path, preload):
+    if os.path.exists(socket_path):
+        if is_running(socket_path):
+            print(f"❌ A TTS daemon is already listening on {socket_path}")
+            sys.exit(1)
+        os.unlink(socket_path)  # Stale socket from a daemon that didn't exit cleanly
+
+    server = SynthesisServer(socket_path)
+    print(f"🎙️  TTS daemon listening on {socket_path}", flush=True)
+    for model_name in preload:
+        server.model(model_name)
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        print("👋 TTS daemon stopped", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm Coqui TTS synthesis daemon")
+    parser.add_argument("command", choices=["serve", "status", "stop"])
+    parser.add_argument("--socket", default=SOCKET_PATH, help=f"Unix socket path (default: {SOCKET_PATH})")
+    parser.add_argument("--preload", action="append", default=[], metavar="MODEL",
+                        help="load MODEL at startup instead of on first request")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.socket, args.preload)
+        return
+
+    try:
+        client = TTSClient(None, args.socket)
+    except OSError:
+        print(f"⚪ No TTS daemon on {args.socket}")
+        sys.exit(1 if args.command == "status" else 0)
+
+    if args.command == "status":
+        models = client.call(op="ping")["models"]
+        print(f"🟢 TTS daemon on {args.socket}")
+        print(f"   Loaded models: {', '.join(models) if models else 'none'}")
+        client.close()
+    else:
+        client.call(op="shutdown")
+        client.close()
+        while is_running(args.socket):
+            time.sleep(0.1)
+        print(f"🛑 Stopped TTS daemon on {args.socket}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,116 +1,317 @@
 #!/usr/bin/env python3
 """
 Validate generated audio files meet technical specifications.
+
+Only headers are read: each file's first bytes are memory-mapped, the real
+container is sniffed from its magic bytes (PCM or IMA ADPCM WAV, or MP3 -
+including MP3 saved under a .wav name) and the RIFF chunks or first MP3
+frame header are parsed for rate, channels, bit depth and duration. Files
+are checked across a process pool.
+
+With --content the clips are also decoded and their signal measured - RMS,
+peak, DC offset, clipping ratio and the fraction of 10 ms frames with
+speech-level energy - so silent placeholders, clipped renders and mostly
+empty files fail too. Metrics are computed for a whole batch of clips at
+once and exported per file as JSON. MP3 clips decode only with pydub; a
+--content run that couldn't decode every clip fails rather than passing
+files it never listened to.
+
+Content verdicts are cached (validation_cache.py): files whose content
+hasn't changed since the last --content run are reported from the cache
+instead of being decoded again. Header checks aren't cached - reading 4 KB
+of a file is cheaper than hashing all of it.
+
+Files the compiled expected-asset manifest (asset_manifest.py) doesn't list -
+clips of removed words or renamed prompts - are reported per category.
+
+Usage:
+    python validate_audio.py [--content] [--metrics audio_metrics.json] [--no-cache] [--workers N] [--dir PATH]
 """
 
-import wave
+import argparse
+import json
+import mmap
+import multiprocessing
+import os
+import time
+from collections import defaultdict
 from pathlib import Path
 
+from asset_manifest import load_manifest
+from audio_io import HAS_PYDUB, CATEGORIES, category_of, iter_audio_files, probe_bytes, read_audio
+from audio_metrics import ACTIVITY_DB, ACTIVITY_FRAME_MS, CLIP_LEVEL, SILENT_PEAK_DB, signal_metrics
+from validation_cache import ValidationCache, config_key, file_hash
+
 OUTPUT_DIR = "../spelling-bee iOS App/Resources/Audio"
+PREFIX_BYTES = 4096  # Enough for RIFF chunk headers or an ID3 tag plus the first frame header
+SAMPLE_RATES = [22050, 24000, 44100]  # Coqui default, gTTS, CD rate
+MIN_DURATION = 0.1
+MAX_DURATION = 30.0
+BATCH_SIZE = 64  # Files per pool task
+
+# Content checks (--content) - the silence, clipping and speech levels live in audio_metrics.py
+METRICS_FILE = "audio_metrics.json"
+MAX_CLIP_RATIO = 0.001
+MAX_DC_OFFSET = 0.02
+MIN_ACTIVITY = 0.2  # Less speech than this and the clip is mostly empty
+
+CATEGORY_DESCRIPTIONS = {
+    'words': 'Word pronunciations',
+    'spelling': 'Letter-by-letter spelling',
+    'letters': 'Individual letters',
+    'feedback': 'Feedback messages',
+    'instructions': 'Instruction prompts',
+    'sentences': 'Example sentences',
+    'answers': 'Correct-spelling answers',
+    'other': 'Other clips',
+}
+
+def read_header(filepath, prefix_bytes=PREFIX_BYTES):
+    """Probe a file from a memory-mapped prefix"""
+    with open(filepath, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            raise ValueError("empty file")
+        try:
+            with mmap.mmap(f.fileno(), min(size, prefix_bytes), access=mmap.ACCESS_READ) as prefix:
+                return probe_bytes(prefix, size)
+        except ValueError:
+            if size <= prefix_bytes:
+                raise
+        # A large ID3 tag (cover art) pushes the first frame past the prefix
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return probe_bytes(data, size)
+
+def check_header(info):
+    """Specification issues for a probed file (empty list if it passes)"""
+    issues = []
+
+    if info["sample_rate"] not in SAMPLE_RATES:
+        issues.append(f"Sample rate: {info['sample_rate']} (expected {', '.join(map(str, SAMPLE_RATES))})")
+
+    # Should be mono
+    if info["channels"] != 1:
+        issues.append(f"Channels: {info['channels']} (expected 1 - mono)")
+
+    # PCM should be 16-bit (ADPCM is 4-bit by design, MP3 has no bit depth)
+    if info["format"] == "wav" and info["bits_per_sample"] != 16:
+        issues.append(f"Bit depth: {info['bits_per_sample']}-bit (expected 16-bit)")
+
+    if info["duration"] < MIN_DURATION:
+        issues.append(f"Duration too short: {info['duration']:.2f}s")
+    elif info["duration"] > MAX_DURATION:
+        issues.append(f"Duration too long: {info['duration']:.2f}s")
+
+    return issues
 
 def validate_audio_file(filepath):
-    """Check if audio file meets specifications"""
+    """(path, probed info or None, issues, note)"""
     try:
-        with wave.open(str(filepath), 'r') as wav:
-            sample_rate = wav.getframerate()
-            channels = wav.getnchannels()
-            sample_width = wav.getsampwidth()
-            frames = wav.getnframes()
-            duration = frames / float(sample_rate)
-
-            # Check specifications
-            issues = []
-
-            # Sample rate should be 22050 (TTS default) or 44100
-            if sample_rate not in [22050, 44100]:
-                issues.append(f"Sample rate: {sample_rate} (expected 22050 or 44100)")
-
-            # Should be mono
-            if channels != 1:
-                issues.append(f"Channels: {channels} (expected 1 - mono)")
-
-            # Should be 16-bit
-            if sample_width != 2:
-                issues.append(f"Bit depth: {sample_width * 8}-bit (expected 16-bit)")
-
-            # Check duration (should be > 0.1 seconds and < 30 seconds)
-            if duration < 0.1:
-                issues.append(f"Duration too short: {duration:.2f}s")
-            elif duration > 30:
-                issues.append(f"Duration too long: {duration:.2f}s")
+        info = read_header(filepath)
+    except (OSError, ValueError, IndexError) as e:
+        return filepath, None, [f"Unreadable: {e}"], None
 
-            if issues:
-                print(f"   ⚠️  {filepath.name}")
-                for issue in issues:
-                    print(f"      - {issue}")
-                return False
-            else:
-                return True
+    note = None
+    extension = Path(filepath).suffix.lower()
+    if extension == ".wav" and info["format"] == "mp3":
+        note = "MP3 data in a .wav file"
+    elif extension == ".mp3" and info["format"] != "mp3":
+        note = "WAV data in a .mp3 file"
+    return filepath, info, check_header(info), note
 
-    except Exception as e:
-        print(f"   ❌ {filepath.name}: {e}")
-        return False
+def check_content(metrics):
+    """Content issues for a clip's metrics (empty list if it passes)"""
+    if metrics["peak_db"] < SILENT_PEAK_DB:
+        return [f"Silent: peak {metrics['peak_db']:.0f} dBFS (placeholder?)"]
+
+    issues = []
+    if metrics["clipping_ratio"] > MAX_CLIP_RATIO:
+        issues.append(f"Clipped: {metrics['clipping_ratio'] * 100:.2f}% of samples at full scale")
+    if abs(metrics["dc_offset"]) > MAX_DC_OFFSET:
+        issues.append(f"DC offset: {metrics['dc_offset']:+.3f}")
+    if metrics["speech_fraction"] < MIN_ACTIVITY:
+        issues.append(f"Mostly empty: speech in {metrics['speech_fraction'] * 100:.0f}% of the clip")
+    return issues
+
+def clip_name(filepath):
+    """Manifest name of a clip: its path from the category folder on, without extension"""
+    parts = Path(filepath).with_suffix("").parts
+    return "/".join(parts[parts.index(category_of(filepath)):])
+
+def validate_batch(job):
+    """Worker: validate a batch of files. Returns [(path, info, issues, note, metrics)]."""
+    paths, content = job
+    results = [validate_audio_file(path) + (None,) for path in paths]
+    if not content:
+        return results
+
+    decodable = [i for i, (_, info, _, _, _) in enumerate(results)
+                 if info is not None and (info["format"] != "mp3" or HAS_PYDUB)]
+    clips = []
+    for i in list(decodable):
+        try:
+            samples, sample_rate, _ = read_audio(results[i][0])
+            clips.append((samples, sample_rate))
+        except Exception as e:
+            results[i][2].append(f"Undecodable: {e}")
+            decodable.remove(i)
+
+    if clips:
+        for i, metrics in zip(decodable, signal_metrics(clips)):
+            filepath, info, issues, note, _ = results[i]
+            results[i] = (filepath, info, issues + check_content(metrics), note, metrics)
+    return results
 
-def validate_all_audio():
-    audio_dir = Path(OUTPUT_DIR)
+def validate_cached_batch(job):
+    """
+    Worker for cached runs: hash each file first. A candidate whose hash still
+    matches keeps its cached verdict; the rest are validated.
+    Returns [(result, content hash, whether the verdict came from the cache)].
+    """
+    entries, content = job
+    hashes = {}
+    for path, _ in entries:
+        try:
+            hashes[path] = file_hash(path)
+        except OSError:
+            hashes[path] = None  # Gone or unreadable - validated (and reported) below, never cached
+    confirmed = {path: tuple(candidate[1]) for path, candidate in entries
+                 if candidate is not None and hashes[path] is not None and candidate[0] == hashes[path]}
+    validated = validate_batch(([path for path, _ in entries if path not in confirmed], content))
+    return ([((path,) + result, hashes[path], True) for path, result in confirmed.items()]
+            + [(result, hashes[result[0]], False) for result in validated])
+
+def checks_config(content=False):
+    """Cache key for the checks a run applies (a verdict is only reused under the same checks)"""
+    settings = {"sample_rates": SAMPLE_RATES, "duration": [MIN_DURATION, MAX_DURATION], "content": content}
+    if content:
+        settings.update(pydub=HAS_PYDUB, silent=SILENT_PEAK_DB, clip=[CLIP_LEVEL, MAX_CLIP_RATIO],
+                        dc=MAX_DC_OFFSET, activity=[ACTIVITY_FRAME_MS, ACTIVITY_DB, MIN_ACTIVITY])
+    return config_key(**settings)
+
+def validate_all_audio(audio_root=OUTPUT_DIR, workers=None, content=False, metrics_path=METRICS_FILE,
+                       use_cache=True):
+    audio_dir = Path(audio_root)
 
     if not audio_dir.exists():
-        print(f"❌ Audio directory not found: {OUTPUT_DIR}")
+        print(f"❌ Audio directory not found: {audio_root}")
         print("   Please run generate_audio.py first")
         return False
 
+    start_time = time.time()
+
     print("=" * 60)
     print("🔍 Audio File Validation")
     print("=" * 60)
     print()
 
-    categories = {
-        'words': 'Word pronunciations',
-        'spelling': 'Letter-by-letter spelling',
-        'letters': 'Individual letters',
-        'feedback': 'Feedback messages',
-        'instructions': 'Instruction prompts'
-    }
+    paths = list(iter_audio_files(audio_dir))
+    if not paths:
+        print("⚠️  No audio files found")
+        return False
 
-    total_files = 0
-    passed_files = 0
-    failed_files = []
+    if content and not HAS_PYDUB:
+        print("⚠️  pydub not installed - MP3 clips can't be decoded, so --content will fail on them")
+        print()
 
-    for category, description in categories.items():
-        category_path = audio_dir / category
-        if not category_path.exists():
-            print(f"⚠️  {description}: Directory not found")
-            continue
+    results = defaultdict(list)
+    cache = ValidationCache() if use_cache and content else None
+    config = checks_config(content)
+    pending = []
+    for path in paths:
+        cached, candidate = cache.lookup(path, config) if cache else (None, None)
+        if cached is None:
+            pending.append((path, candidate))
+        else:
+            results[category_of(path)].append((path,) + tuple(cached))
 
-        files = list(category_path.rglob("*.wav"))
-        if not files:
-            print(f"⚠️  {description}: No files found")
-            continue
+    if pending:
+        with multiprocessing.Pool(workers) as pool:
+            if cache:
+                batches = [(pending[i:i + BATCH_SIZE], content) for i in range(0, len(pending), BATCH_SIZE)]
+                for batch in pool.imap_unordered(validate_cached_batch, batches):
+                    for result, content_hash, hit in batch:
+                        results[category_of(result[0])].append(result)
+                        if content_hash is not None:
+                            cache.store(result[0], config, result[1:], content_hash, hit)
+            else:
+                pending = [path for path, _ in pending]
+                batches = [(pending[i:i + BATCH_SIZE], content) for i in range(0, len(pending), BATCH_SIZE)]
+                for batch in pool.imap_unordered(validate_batch, batches):
+                    for result in batch:
+                        results[category_of(result[0])].append(result)
+    if cache:
+        cache.close()
+
+    try:
+        expected = load_manifest()
+    except FileNotFoundError:
+        expected = None  # No word_bank.json yet - nothing to compare against
 
-        print(f"📁 {description}: {len(files)} files")
+    total_files = len(paths)
+    failed_files = []
+    mismatched = 0
+    undecoded = 0  # --content clips whose samples were never read (MP3 without pydub)
+    formats = defaultdict(int)
+    metrics_export = {}
+
+    for category in CATEGORIES + ['other']:
+        if category not in results:
+            continue
+        files = sorted(results[category])
+        print(f"📁 {CATEGORY_DESCRIPTIONS[category]}: {len(files)} files")
 
         category_passed = 0
-        for audio_file in files:
-            total_files += 1
-            if validate_audio_file(audio_file):
-                category_passed += 1
-                passed_files += 1
+        for filepath, info, issues, note, metrics in files:
+            if info is not None:
+                formats[info["format"]] += 1
+            if metrics is not None:
+                metrics_export[os.path.relpath(filepath, audio_dir)] = dict(
+                    metrics, duration=info["duration"], passed=not issues)
+            elif content and info is not None and not issues:
+                undecoded += 1
+            mismatched += note is not None
+            if issues:
+                print(f"   ⚠️  {os.path.relpath(filepath, audio_dir)}")
+                for issue in issues:
+                    print(f"      - {issue}")
+                failed_files.append(filepath)
             else:
-                failed_files.append(str(audio_file))
+                category_passed += 1
 
         if category_passed == len(files):
             print(f"   ✅ All {len(files)} files passed")
         else:
             print(f"   ⚠️  {category_passed}/{len(files)} files passed")
+        if expected is not None and category != 'other' and (category != 'sentences' or expected.has_sentences):
+            names = expected.names(category)
+            unexpected = [filepath for filepath, *_ in files if clip_name(filepath) not in names]
+            if unexpected:
+                print(f"   ℹ️  {len(unexpected)} files not in the expected-asset manifest (stale?): "
+                      f"{', '.join(clip_name(f) for f in unexpected[:3])}")
         print()
 
+    passed_files = total_files - len(failed_files)
+
     # Summary
     print("=" * 60)
     print("📊 Validation Summary")
     print("=" * 60)
     print(f"   Total files checked: {total_files}")
+    if cache:
+        print(f"   Re-validated: {cache.misses} (cached verdicts: {cache.summary()})")
+    print(f"   Formats: {', '.join(f'{fmt} × {count}' for fmt, count in sorted(formats.items()))}")
     print(f"   Passed: {passed_files} ({passed_files/total_files*100:.1f}%)")
     print(f"   Failed: {len(failed_files)} ({len(failed_files)/total_files*100:.1f}%)")
+    if mismatched:
+        print(f"   ℹ️  {mismatched} files' content doesn't match their extension (they still play)")
+    if content:
+        with open(metrics_path, 'w', encoding='utf-8') as f:
+            json.dump(metrics_export, f, indent=2, sort_keys=True)
+        print(f"   Signal metrics for {len(metrics_export)} files: {metrics_path}")
+        if undecoded:
+            print(f"   ⚠️  Not decoded: {undecoded} files - silence, clipping and activity checks didn't run on them")
+    print(f"   ⏱️  {time.time() - start_time:.2f}s")
     print()
 
     if failed_files:
@@ -121,11 +322,26 @@ def validate_all_audio():
             print(f"   ... and {len(failed_files) - 10} more")
         print()
         return False
+    elif undecoded:
+        print(f"❌ --content couldn't check {undecoded} of {total_files} files")
+        if not HAS_PYDUB:
+            print("   MP3 clips need pydub: pip install pydub && brew install ffmpeg")
+        print()
+        return False
     else:
         print("✅ All audio files passed validation!")
         print()
         return True
 
 if __name__ == "__main__":
-    success = validate_all_audio()
+    parser = argparse.ArgumentParser(description="Validate audio files against the bundle's specifications")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="processes (default: all cores)")
+    parser.add_argument("--dir", default=OUTPUT_DIR, help="audio root (default: the app's Resources/Audio)")
+    parser.add_argument("--content", action="store_true",
+                        help="also decode clips and fail silent, clipped or mostly empty ones")
+    parser.add_argument("--metrics", default=METRICS_FILE, help=f"per-file metrics JSON for --content (default: {METRICS_FILE})")
+    parser.add_argument("--no-cache", action="store_true", help="decode every file for --content, ignoring cached verdicts")
+    args = parser.parse_args()
+
+    success = validate_all_audio(args.dir, args.workers, args.content, args.metrics, not args.no_cache)
     exit(0 if success else 1)
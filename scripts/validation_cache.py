@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Persistent cache of per-file validation results (SQLite).
+
+Each row holds a file's last verdict together with its signature: size,
+mtime and SHA-256 of the content, keyed by the path relative to
+Resources/Audio and by the checker configuration that produced it. A file
+whose size and mtime are unchanged is a hit without being read. One whose
+mtime moved (a fresh git checkout touches everything) is only a candidate:
+the caller hashes it - in its pool workers, next to the work a miss costs -
+and it is still a hit if the content is the same. Only new or changed files
+are validated again, so a CI run costs what the change costs.
+
+Hashing costs more than reading a header, so only checks that decode the
+audio (validate_audio.py --content) are worth caching.
+
+Usage:
+    python validation_cache.py           # show what the cache holds
+    python validation_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+
+from sharding import shard_key
+
+# Configuration
+CACHE_FILE = "validation_cache.sqlite3"
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    path TEXT NOT NULL,
+    config TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    result TEXT NOT NULL,
+    PRIMARY KEY (path, config)
+)
+"""
+
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_key(**settings):
+    """Short stable id for a checker configuration - change any setting and old verdicts stop matching"""
+    return hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8")).hexdigest()[:16]
+
+
+class ValidationCache:
+    def __init__(self, path=CACHE_FILE):
+        self.path = path
+        self.db = sqlite3.connect(path)
+        self.db.execute(SCHEMA)
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, path, config):
+        """
+        What the cache knows about path, without reading it: (result, None)
+        when its size and mtime match, (None, (content_hash, result)) when only
+        the size does - a hit if the file still hashes to content_hash - and
+        (None, None) otherwise. Every file that isn't an outright hit should
+        be passed to store() once its hash (and verdict, if it changed) is known.
+        """
+        stat = os.stat(path)
+        row = self.db.execute(
+            "SELECT size, mtime_ns, content_hash, result FROM results WHERE path = ? AND config = ?",
+            (shard_key(path), config)).fetchone()
+        if row is None or row[0] != stat.st_size:
+            return None, None
+
+        size, mtime_ns, content_hash, result = row
+        if mtime_ns != stat.st_mtime_ns:
+            return None, (content_hash, json.loads(result))
+        self.hits += 1
+        return json.loads(result), None
+
+    def store(self, path, config, result, content_hash, hit=False):
+        """
+        Record result (anything JSON-serializable) as path's verdict under
+        config. hit: the verdict came from the cache (the content hash matched).
+        """
+        stat = os.stat(path)
+        self.db.execute(
+            "INSERT OR REPLACE INTO results (path, config, size, mtime_ns, content_hash, result) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (shard_key(path), config, stat.st_size, stat.st_mtime_ns, content_hash, json.dumps(result)))
+        if hit:
+            self.hits += 1
+        else:
+            self.misses += 1
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def summary(self):
+        return f"{self.hits} cached / {self.hits + self.misses} files"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect the validation cache")
+    parser.add_argument("--clear", action="store_true", help="delete every cached verdict")
+    args = parser.parse_args()
+
+    if not os.path.exists(CACHE_FILE):
+        print(f"📭 No validation cache yet ({CACHE_FILE})")
+        return
+
+    cache = ValidationCache()
+    if args.clear:
+        cache.db.execute("DELETE FROM results")
+        cache.close()
+        print(f"🗑️  Cleared {CACHE_FILE}")
+        return
+
+    print(f"🗄️  Validation cache: {CACHE_FILE} ({os.path.getsize(CACHE_FILE) / 1024:.1f} KB)")
+    for config, count in cache.db.execute("SELECT config, COUNT(*) FROM results GROUP BY config"):
+        print(f"   Configuration {config}: {count} files")
+    cache.close()
+
+
+if __name__ == "__main__":
+    main()